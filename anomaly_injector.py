@@ -1,12 +1,15 @@
 import numpy as np
 
 class AnomalyInjector:
-    def __init__(self, anomalies_config):
+    def __init__(self, anomalies_config, rng=None):
         """
         Inicializa el inyector con la configuración de anomalías.
         :param anomalies_config: Diccionario con las configuraciones de anomalías.
+        :param rng: numpy.random.Generator usado para elegir índices y signos de los outliers.
         """
         self.anomalies_config = anomalies_config
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self._outlier_plan = None
 
     def inject_anomalies(self, series):
         """
@@ -24,6 +27,108 @@ class AnomalyInjector:
                 self._inject_std_change(series, params)
         return series
 
+    def plan_outliers(self, n_points):
+        """
+        Sortea de una vez los índices globales y signos de los outliers de una simulación por bloques.
+        El generador del inyector debe ser distinto del de las series: así el plan no desplaza los
+        números del ruido y los bloques no dependen de su tamaño.
+        :param n_points: Longitud total de la simulación.
+        """
+        self._outlier_plan = {}
+        params = self.anomalies_config.get("anomaly_outliers")
+        if params:
+            for series_id in params.get("series", []):
+                indices = np.sort(self.rng.choice(n_points, params.get("count", 1), replace=False))
+                directions = self.rng.choice([-1, 1], size=len(indices))
+                self._outlier_plan[series_id] = (indices, directions)
+        return self._outlier_plan
+
+    def inject_anomalies_stream(self, chunk, offset, n_points, scales):
+        """
+        Aplica las anomalías a un bloque de una simulación por bloques, usando índices globales:
+        los outliers del plan (plan_outliers) se aplican al bloque que los contiene, y
+        drift/std_change empiezan en su start_point global.
+        :param chunk: DataFrame del bloque (índice desde 0), modificado in situ.
+        :param offset: Posición global de la primera fila del bloque.
+        :param n_points: Longitud total de la simulación.
+        :param scales: Desviación estándar de referencia por serie (sustituye a la de la muestra completa).
+        :return: El bloque con la columna "Anomaly".
+        """
+        if self._outlier_plan is None:
+            self.plan_outliers(n_points)
+
+        if "Anomaly" not in chunk.columns:
+            chunk["Anomaly"] = False
+        t = offset + np.arange(len(chunk))
+
+        for anomaly_type, params in self.anomalies_config.items():
+            if anomaly_type == "anomaly_outliers":
+                n_std = params.get("magnitude", 1)
+                for series_id, (indices, directions) in self._outlier_plan.items():
+                    lo, hi = np.searchsorted(indices, [offset, offset + len(chunk)])
+                    rows = indices[lo:hi] - offset
+                    chunk.iloc[rows, series_id] += directions[lo:hi] * n_std * scales[series_id]
+                    chunk.loc[rows, "Anomaly"] = True
+            elif anomaly_type in ("anomaly_drift", "anomaly_std_change"):
+                start = max(params.get("start_point", 0) - offset, 0)
+                if start >= len(chunk):
+                    continue
+                for series_id in params.get("series", []):
+                    if anomaly_type == "anomaly_drift":
+                        chunk.iloc[start:, series_id] += params.get("slope", 0) * (t[start:] - params.get("start_point", 0))
+                    else:
+                        chunk.iloc[start:, series_id] += params.get("n_std", 1) * scales[series_id]
+                    chunk.loc[start:, "Anomaly"] = True
+        return chunk
+
+    def inject_anomalies_batch(self, batch, rngs):
+        """
+        Versión por lotes de inject_anomalies sobre un array (n_plc, n_points, n_series), modificado in situ.
+        Cada PLC sortea sus índices y signos con su propio generador, en el mismo orden que inject_anomalies.
+        :param batch: Array con las series de todos los PLC del lote.
+        :param rngs: Lista con un numpy.random.Generator por PLC.
+        :return: Máscara booleana (n_plc, n_points) de filas con anomalía.
+        """
+        mask = np.zeros(batch.shape[:2], dtype=bool)
+        for anomaly_type, params in self.anomalies_config.items():
+            if anomaly_type == "anomaly_outliers":
+                self._inject_outliers_batch(batch, mask, params, rngs)
+            elif anomaly_type == "anomaly_drift":
+                self._inject_drift_batch(batch, mask, params)
+            elif anomaly_type == "anomaly_std_change":
+                self._inject_std_change_batch(batch, mask, params)
+        return mask
+
+    def _inject_outliers_batch(self, batch, mask, params, rngs):
+        n_points = batch.shape[1]
+        n_std = params.get("magnitude", 1)
+        count = params.get("count", 1)
+
+        for series_id in params.get("series", []):
+            std = batch[:, :, series_id].std(axis=1)
+            for k, rng in enumerate(rngs):
+                indices = rng.choice(n_points, count, replace=False)
+                directions = np.array([rng.choice([-1, 1]) for _ in indices])
+                batch[k, indices, series_id] += directions * n_std * std[k]
+                mask[k, indices] = True
+
+    def _inject_drift_batch(self, batch, mask, params):
+        slope = params.get("slope", 0)
+        start_point = params.get("start_point", 0)
+
+        for series_id in params.get("series", []):
+            batch[:, start_point:, series_id] += slope * np.arange(batch.shape[1] - start_point)
+            mask[:, start_point:] = True
+
+    def _inject_std_change_batch(self, batch, mask, params):
+        start_point = params.get("start_point", 0)
+        n_std = params.get("n_std", 1)
+
+        for series_id in params.get("series", []):
+            std = batch[:, :, series_id].std(axis=1)
+            batch[:, start_point:, series_id] += n_std * std[:, None]
+            mask[:, start_point:] = True
+
     def _inject_outliers(self, series, params):
         """
         Inyecta outliers en las series basándose en múltiplos de la desviación estándar.
@@ -44,11 +149,11 @@ class AnomalyInjector:
             std = np.std(series.iloc[:, series_id])
             
             # Seleccionar índices aleatorios
-            indices = np.random.choice(len(series), count, replace=False)
+            indices = self.rng.choice(len(series), count, replace=False)
 
             # Modificar las observaciones seleccionadas
             for idx in indices:
-                direction = np.random.choice([-1, 1])  # Decidir aleatoriamente si el outlier es positivo o negativo
+                direction = self.rng.choice([-1, 1])  # Decidir aleatoriamente si el outlier es positivo o negativo
                 series.iloc[idx, series_id] += direction * n_std * std
             
             # Marcar las filas afectadas como anomalías
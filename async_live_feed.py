@@ -0,0 +1,115 @@
+import asyncio
+import math
+import time
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from crud_operations import DatabaseOperations, TABLE_MODELS
+from models import Config, Simulacion, SimulacionPLC
+
+
+class AsyncLiveRuntime:
+    def __init__(self, url, feeds, generate, config_json, pool_size=5, interval=60, max_generations=4, batch_rows=5000):
+        """
+        Runtime alternativo del feed en vivo: cada LiveFeed es una corrutina en un único event loop
+        y todas comparten un pool pequeño y fijo de conexiones asíncronas.
+        :param url: URL SQLAlchemy con driver asíncrono (postgresql+asyncpg://...).
+        :param feeds: Lista de LiveFeed (sin refill; el runtime los recarga con load()).
+        :param generate: Función generate(feed) -> (timestamps, series_df, timestamp, seed, mode_sim).
+        :param config_json: Configuración serializada que se guarda en cada registro Config.
+        :param pool_size: Conexiones del pool (también el número de corrutinas escritoras).
+        :param interval: Segundos entre ticks.
+        :param max_generations: Simulaciones concurrentes como máximo (se ejecutan en hilos).
+        :param batch_rows: Filas máximas por INSERT multi-fila.
+        """
+        self.engine = create_async_engine(url, pool_size=pool_size, max_overflow=0, echo=False)
+        self.Session = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.feeds = feeds
+        self.generate = generate
+        self.config_json = config_json
+        self.pool_size = pool_size
+        self.interval = interval
+        self.max_generations = max_generations
+        self.batch_rows = batch_rows
+        self.queue = None
+        self.generation_slots = None
+
+    @staticmethod
+    def build_url(db):
+        """
+        Construye la URL asyncpg a partir de un DatabaseConnection.
+        """
+        return f"postgresql+asyncpg://{db.user}:{db.password}@{db.host}:{db.port}/{db.database}"
+
+    async def _refill(self, feed):
+        async with self.generation_slots:
+            loop = asyncio.get_running_loop()
+            timestamps, series, timestamp, seed, mode_sim = await loop.run_in_executor(None, self.generate, feed)
+
+        async with self.Session() as session:
+            new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=self.config_json)
+            session.add(new_config)
+            await session.flush()
+            session.add(Simulacion(
+                id_simulacion=feed.id_simulacion,
+                tipo_simulacion=mode_sim,
+                id_metadata=new_config.id_metadata,
+                table_name=feed.table_name
+            ))
+            session.add(SimulacionPLC(id_simulacion=feed.id_simulacion, id_plc=feed.id_plc, id_metadata=new_config.id_metadata))
+            await session.commit()
+
+        feed.load(timestamps, series)
+
+    async def _run_feed(self, feed):
+        next_tick = math.floor(time.time() / self.interval) * self.interval + self.interval
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - time.time()))
+            try:
+                if feed.exhausted:
+                    await self._refill(feed)
+                # Se valida por feed antes de encolar: una fila inválida solo descarta su feed, no el lote del escritor
+                _, values = DatabaseOperations.prepare_rows(feed.table_name, [feed.next_row()])
+                await self.queue.put((feed.table_name, values[0]))
+            except Exception as e:
+                print(f"Error al generar la fila de PLC {feed.id_plc} en {feed.table_name}: {e}")
+
+            next_tick += self.interval
+            if time.time() > next_tick:
+                next_tick = math.floor(time.time() / self.interval) * self.interval + self.interval
+
+    async def _writer(self):
+        while True:
+            table_name, row = await self.queue.get()
+            rows_by_table = {table_name: [row]}
+            n_rows = 1
+            while n_rows < self.batch_rows and not self.queue.empty():
+                table_name, row = self.queue.get_nowait()
+                rows_by_table.setdefault(table_name, []).append(row)
+                n_rows += 1
+
+            started = time.time()
+            try:
+                async with self.engine.begin() as conn:
+                    for table_name, rows in rows_by_table.items():
+                        await conn.execute(pg_insert(TABLE_MODELS[table_name]).on_conflict_do_nothing(index_elements=["id_plc", "timestamp"]), rows)
+                print(f"Escritos {n_rows} registros en {time.time() - started:.3f}s")
+            except Exception as e:
+                print(f"Error al escribir {n_rows} registros: {e}")
+            finally:
+                for _ in range(n_rows):
+                    self.queue.task_done()
+
+    async def run(self):
+        """
+        Arranca las corrutinas escritoras y una corrutina por feed; se ejecuta indefinidamente.
+        """
+        self.queue = asyncio.Queue(maxsize=max(1, 2 * len(self.feeds)))
+        self.generation_slots = asyncio.Semaphore(self.max_generations)
+        writers = [asyncio.create_task(self._writer()) for _ in range(self.pool_size)]
+        try:
+            print(f"Runtime asíncrono iniciado con {len(self.feeds)} feeds y {self.pool_size} conexiones.")
+            await asyncio.gather(*(self._run_feed(feed) for feed in self.feeds))
+        finally:
+            for writer in writers:
+                writer.cancel()
+            await self.engine.dispose()
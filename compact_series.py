@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from time_period_helper import TimePeriodHelper
+
+
+class CompactSeries:
+    def __init__(self, minutes, values, anomaly_bits=None):
+        """
+        Representación compacta de la simulación de un PLC: valores float32, timestamps como minutos
+        desde epoch (int64) y máscara de anomalías empaquetada en bits. Los timestamps solo se
+        formatean como texto en el destino que lo necesita (iter_batches).
+        :param minutes: Array int64 de minutos desde 1970-01-01 00:00.
+        :param values: Array (n, n_series) de valores; se guarda como float32.
+        :param anomaly_bits: Máscara de anomalías empaquetada con np.packbits, o None.
+        """
+        self.minutes = np.asarray(minutes, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.anomaly_bits = anomaly_bits
+        if len(self.minutes) != len(self.values):
+            raise ValueError("El número de valores no coincide con el número de timestamps.")
+
+    def __len__(self):
+        return len(self.minutes)
+
+    @staticmethod
+    def epoch_minute(date):
+        """
+        Minutos desde epoch de una fecha (str en los formatos de TimePeriodHelper o datetime).
+        """
+        date = TimePeriodHelper.parse_date(date) if isinstance(date, str) else date
+        return int(np.datetime64(date, "m").astype(np.int64))
+
+    @staticmethod
+    def from_arrays(start_date, values, anomaly_mask=None):
+        """
+        Construye la serie compacta de minutos consecutivos desde ``start_date``.
+        :param values: Array (n, n_series).
+        :param anomaly_mask: Array booleano de longitud n, o None.
+        """
+        start = CompactSeries.epoch_minute(start_date)
+        minutes = np.arange(start, start + len(values), dtype=np.int64)
+        anomaly_bits = np.packbits(np.asarray(anomaly_mask, dtype=bool)) if anomaly_mask is not None else None
+        return CompactSeries(minutes, values, anomaly_bits)
+
+    @staticmethod
+    def from_frame(start_date, series_df):
+        """
+        Convierte un DataFrame de simulación (Serie_i y opcionalmente Anomaly) a la forma compacta.
+        """
+        columns = [column for column in series_df.columns if column.startswith("Serie_")]
+        anomaly_mask = series_df["Anomaly"].fillna(False).to_numpy(dtype=bool) if "Anomaly" in series_df.columns else None
+        return CompactSeries.from_arrays(start_date, series_df[columns].to_numpy(dtype=np.float32), anomaly_mask)
+
+    @property
+    def nbytes(self):
+        return self.minutes.nbytes + self.values.nbytes + (self.anomaly_bits.nbytes if self.anomaly_bits is not None else 0)
+
+    def anomaly_mask(self, start=0, stop=None):
+        """
+        Máscara de anomalías desempaquetada para las filas [start, stop), o None si no hay.
+        """
+        if self.anomaly_bits is None:
+            return None
+        stop = len(self) if stop is None else stop
+        first_byte = start // 8
+        bits = np.unpackbits(self.anomaly_bits[first_byte:(stop + 7) // 8])
+        offset = start - first_byte * 8
+        return bits[offset:offset + stop - start].astype(bool)
+
+    def timestamps(self, start=0, stop=None):
+        """
+        Timestamps de las filas [start, stop) formateados como 'YYYY-MM-DD HH:MM:SS'.
+        """
+        return TimePeriodHelper.format_minutes(self.minutes[start:stop].astype("datetime64[m]"))
+
+    def to_frame(self, start=0, stop=None):
+        """
+        DataFrame (Serie_i float32 y Anomaly) de las filas [start, stop), para los consumidores existentes.
+        """
+        frame = pd.DataFrame(self.values[start:stop], columns=[f"Serie_{i+1}" for i in range(self.values.shape[1])])
+        mask = self.anomaly_mask(start, stop)
+        if mask is not None:
+            frame["Anomaly"] = mask
+        return frame
+
+    def iter_batches(self, chunk_rows=None):
+        """
+        Bloques (timestamps, DataFrame) para DatabaseOperations.insert_chunks; el texto de los
+        timestamps se genera bloque a bloque.
+        """
+        chunk_rows = chunk_rows or len(self) or 1
+        for start in range(0, len(self), chunk_rows):
+            stop = min(start + chunk_rows, len(self))
+            yield self.timestamps(start, stop).tolist(), self.to_frame(start, stop)
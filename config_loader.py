@@ -1,8 +1,111 @@
+import hashlib
+import io
+import os
 from datetime import datetime
+from threading import Lock
 import pandas as pd
 import numpy as np
 
+
+class FrozenConfig(dict):
+    """
+    Diccionario de solo lectura para configuraciones compartidas desde la caché de ConfigLoader.
+    Sigue siendo un dict (isinstance) para los consumidores existentes; dict(config) da una copia modificable.
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("La configuración en caché es inmutable; use dict(config) para obtener una copia modificable.")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenConfig, (dict(self),)
+
+
+class FrozenList(list):
+    """
+    Lista de solo lectura para los parámetros de una FrozenConfig.
+    """
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("La configuración en caché es inmutable; use list(valor) para obtener una copia modificable.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def freeze(value):
+    """
+    Copia recursiva de dicts y listas como FrozenConfig / FrozenList.
+    """
+    if isinstance(value, dict):
+        return FrozenConfig({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+# Caché por proceso: ruta absoluta -> (mtime_ns, tamaño, sha1, configuración, parámetros)
+_config_cache = {}
+_config_cache_lock = Lock()
+
+
 class ConfigLoader:
+    @staticmethod
+    def load_config(file_path):
+        """
+        Configuración validada e inmutable desde una caché por proceso. Cada llamada solo hace un
+        os.stat del archivo; si cambian mtime o tamaño se relee y, si cambia también el contenido
+        (sha1), se vuelve a interpretar y validar. Los hilos en vivo recogen así las ediciones de
+        config.csv sin coste de análisis en cada iteración.
+        :param file_path: Ruta al archivo CSV.
+        :return: FrozenConfig; dict(config) devuelve una copia modificable del primer nivel.
+        """
+        return ConfigLoader._cached_entry(file_path)[3]
+
+    @staticmethod
+    def load_parameters(file_path):
+        """
+        Parámetros crudos del CSV (parameter -> value, sin interpretar) desde la misma caché que load_config.
+        """
+        return ConfigLoader._cached_entry(file_path)[4]
+
+    @staticmethod
+    def _cached_entry(file_path):
+        path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise ValueError(f"Error al cargar la configuración desde CSV {path}: {e}")
+        with _config_cache_lock:
+            entry = _config_cache.get(path)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return entry
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            raise ValueError(f"Error al cargar la configuración desde CSV {path}: {e}")
+        digest = hashlib.sha1(data).hexdigest()
+        if entry is not None and entry[2] == digest:
+            entry = (stat.st_mtime_ns, stat.st_size) + entry[2:]
+        else:
+            try:
+                df = pd.read_csv(io.BytesIO(data), index_col=0)
+            except Exception as e:
+                raise ValueError(f"Error al cargar la configuración desde CSV {path}: {e}")
+            config = freeze(ConfigLoader.parse_config(df))
+            parameters = FrozenConfig(df["value"].to_dict())
+            if entry is not None:
+                print(f"Configuración recargada desde {path}")
+            entry = (stat.st_mtime_ns, stat.st_size, digest, config, parameters)
+        with _config_cache_lock:
+            _config_cache[path] = entry
+        return entry
+
     @staticmethod
     def load_config_from_csv(file_path):
         """
@@ -12,16 +115,35 @@ class ConfigLoader:
         """
         try:
             df = pd.read_csv(file_path, index_col=0)
+        except Exception as e:
+            raise ValueError(f"Error al cargar la configuración desde CSV: {e}")
+        return ConfigLoader.parse_config(df)
 
+    @staticmethod
+    def parse_config(df):
+        """
+        Interpreta y valida una configuración clave-valor ya leída.
+        :param df: DataFrame con los parámetros como índice y una columna 'value'.
+        :return: Diccionario con la configuración.
+        """
+        try:
             # Validar existencia y no nulidad de n_series
             if "n_series" not in df.index or pd.isna(df.loc["n_series"].values[0]):
                 raise ValueError("Error: El parámetro 'n_series' es obligatorio y no puede estar nulo o no definido.")
             n_series = int(df.loc["n_series"].values[0])
 
+            # Modelo de ruido de factores: con cargas explícitas 'corr_matrix' es opcional y, en
+            # cualquier caso, se omite la comprobación O(n^3) de definida positiva
+            has_loadings = "factor_loadings" in df.index and pd.notna(df.loc["factor_loadings"].values[0])
+            factor_model = has_loadings or ("n_factors" in df.index and pd.notna(df.loc["n_factors"].values[0]))
+            required_keys = ["tipo_simulacion", "n_points", "n_series", "ar_params", "ma_params", "means", "stds", "corr_matrix", "start_date", "end_date"]
+            if has_loadings and ("corr_matrix" not in df.index or pd.isna(df.loc["corr_matrix"].values[0])):
+                required_keys.remove("corr_matrix")
+
             # Validar nulos, tipo de datos y tamaño de listas
             config = {}
             anomalies = {}  # Nuevo diccionario para almacenar las anomalías
-            for key in ["tipo_simulacion", "n_points", "n_series", "ar_params", "ma_params", "means", "stds", "corr_matrix", "start_date", "end_date"]:
+            for key in required_keys:
                 if key not in df.index or pd.isna(df.loc[key].values[0]) and key not in ["end_date"]:
                     raise ValueError(f"Error: El parámetro '{key}' es obligatorio y no puede estar nulo o no definido.")
                 try:
@@ -60,7 +182,7 @@ class ConfigLoader:
                                 raise ValueError(f"Error: El parámetro '{key}' contiene valores fuera del rango [-1, 1].")
 
                             # Validar definida positiva
-                            if not np.all(np.linalg.eigvals(value_np) > 0):
+                            if not factor_model and not np.all(np.linalg.eigvals(value_np) > 0):
                                 raise ValueError(f"Error: El parámetro '{key}' debe ser una matriz definida positiva.")
                     if key in ["start_date","end_date"]:
                         value = df.loc[key].values[0]
@@ -84,6 +206,38 @@ class ConfigLoader:
                 else:
                     config[key] = None
 
+            # Validar y agregar el modelo de factores (opcional)
+            for key in ["factor_loadings", "idiosyncratic_vars", "n_factors"]:
+                if key in df.index and pd.notna(df.loc[key].values[0]):
+                    try:
+                        config[key] = eval(str(df.loc[key].values[0]))
+                    except (SyntaxError, NameError) as e:
+                        raise ValueError(f"Error: El parámetro opcional '{key}' contiene un valor inválido: {df.loc[key].values[0]}. Detalles: {e}")
+
+            if config.get("factor_loadings") is not None:
+                try:
+                    loadings = np.array(config["factor_loadings"], dtype=float)
+                except (TypeError, ValueError):
+                    raise ValueError("Error: El parámetro 'factor_loadings' debe ser una matriz numérica con filas de igual longitud.")
+                if loadings.ndim != 2 or loadings.shape[0] != n_series:
+                    raise ValueError(f"Error: El parámetro 'factor_loadings' debe ser una matriz de {n_series} filas (n_series x n_factores).")
+                communalities = np.sum(loadings ** 2, axis=1)
+                if config.get("idiosyncratic_vars") is None:
+                    if np.any(communalities > 1):
+                        raise ValueError("Error: Las filas de 'factor_loadings' deben tener suma de cuadrados <= 1 si no se define 'idiosyncratic_vars'.")
+                else:
+                    try:
+                        psi = np.array(config["idiosyncratic_vars"], dtype=float)
+                    except (TypeError, ValueError):
+                        raise ValueError(f"Error: El parámetro 'idiosyncratic_vars' debe ser una lista de {n_series} varianzas no negativas.")
+                    if psi.shape != (n_series,) or np.any(psi < 0):
+                        raise ValueError(f"Error: El parámetro 'idiosyncratic_vars' debe ser una lista de {n_series} varianzas no negativas.")
+                    if not np.allclose(communalities + psi, 1):
+                        raise ValueError("Error: 'factor_loadings' e 'idiosyncratic_vars' deben implicar una diagonal de correlación igual a 1.")
+            elif config.get("n_factors") is not None:
+                if not isinstance(config["n_factors"], int) or not 1 <= config["n_factors"] < n_series:
+                    raise ValueError(f"Error: El parámetro 'n_factors' debe ser un entero entre 1 y {n_series - 1}.")
+
             # Detectar y manejar configuraciones de anomalías
             for key in df.index:
                 if key.startswith("anomaly_"):
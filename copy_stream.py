@@ -0,0 +1,84 @@
+import io
+import numpy as np
+import pandas as pd
+
+
+class CsvCopyStream:
+    def __init__(self, chunks):
+        """
+        Objeto tipo archivo de solo lectura que alimenta un ``COPY ... FROM STDIN``
+        a partir de un iterador de bloques de texto CSV, sin materializar el total.
+        :param chunks: Iterador de cadenas CSV (cada una con filas completas).
+        """
+        self._chunks = iter(chunks)
+        self._current = ""
+        self._position = 0
+
+    def read(self, size=-1):
+        """
+        Devuelve hasta ``size`` caracteres del flujo (todo lo restante si ``size`` < 0).
+        """
+        parts = []
+        remaining = size
+        while size < 0 or remaining > 0:
+            if self._position >= len(self._current):
+                self._current = next(self._chunks, None)
+                self._position = 0
+                if self._current is None:
+                    self._current = ""
+                    break
+            end = len(self._current) if size < 0 else min(len(self._current), self._position + remaining)
+            parts.append(self._current[self._position:end])
+            remaining -= end - self._position
+            self._position = end
+        return "".join(parts)
+
+    @staticmethod
+    def from_columns(columns, chunk_rows=50000):
+        """
+        Construye el flujo CSV a partir de columnas ya validadas.
+        :param columns: Diccionario ordenado nombre_columna -> array/Series de igual longitud.
+        :param chunk_rows: Filas formateadas por bloque.
+        :return: CsvCopyStream.
+        """
+        frame = pd.DataFrame(columns, copy=False)
+
+        def chunks():
+            for start in range(0, len(frame), chunk_rows):
+                buffer = io.StringIO()
+                frame.iloc[start:start + chunk_rows].to_csv(buffer, header=False, index=False, na_rep="")
+                yield buffer.getvalue()
+
+        return CsvCopyStream(chunks())
+
+
+def validate_series_columns(model, timestamps, series_df):
+    """
+    Aplica sobre columnas completas las mismas reglas que los ``@validates`` del modelo.
+    :param model: Clase ORM destino (Historicos, HistoricosTesting o MonitoreoVW).
+    :param timestamps: Secuencia de timestamps.
+    :param series_df: DataFrame con 'Serie_1', 'Serie_2' y opcionalmente 'Anomaly'.
+    :return: Diccionario columna_tabla -> valores listos para COPY.
+    """
+    timestamps = pd.Series(timestamps, copy=False)
+    empty = timestamps.isna() | (timestamps.astype(str) == "")
+    if empty.any():
+        raise ValueError(f"El campo 'timestamp' no puede estar vacío (fila {int(np.argmax(empty.values))}).")
+
+    columns = {"timestamp": timestamps.values}
+    for source, target in (("Serie_1", "velocidad"), ("Serie_2", "temperatura")):
+        values = series_df[source].to_numpy()
+        if values.dtype.kind != "f":
+            values = values.astype(float)
+        invalid = np.isnan(values) | (values < 0)
+        if invalid.any():
+            raise ValueError(f"El campo '{target}' debe ser un número positivo (fila {int(np.argmax(invalid))}).")
+        columns[target] = values
+
+    if "anomalia" in model.__table__.columns:
+        if "Anomaly" in series_df.columns:
+            columns["anomalia"] = series_df["Anomaly"].fillna(False).to_numpy(dtype=bool)
+        else:
+            columns["anomalia"] = np.zeros(len(series_df), dtype=bool)
+
+    return columns
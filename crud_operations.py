@@ -1,8 +1,17 @@
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.exc import SQLAlchemyError
-from models import Historicos, Simulacion, PLC, HistoricosTesting, MonitoreoVW
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from models import Historicos, Simulacion, PLC, HistoricosTesting, MonitoreoVW, SimulacionPLC, EstadoSimulador
+from copy_stream import CsvCopyStream, validate_series_columns
 import time
 
+TABLE_MODELS = {
+    "historicos": Historicos,
+    "historicos_testing": HistoricosTesting,
+    "Monitoreo_vw": MonitoreoVW,
+}
+
 class DatabaseOperations:
     def __init__(self, session):
         self.session = session
@@ -48,13 +57,11 @@ class DatabaseOperations:
         except NoResultFound:
             raise ValueError(f"La llave foránea con ID {id_value} no existe en la tabla {model.__tablename__}.")    
 
-    def insert_historicos_from_dataframe(self, session, timestamps, series_df, id_plc, id_simulacion, ids_metadata):
+    def insert_historicos_from_dataframe(self, session, timestamps, series_df, id_plc, id_simulacion):
         historicos = []
         n_minutes = len(timestamps)
         if len(series_df) != n_minutes:
             raise ValueError("El número de filas en el DataFrame no coincide con el número de timestamps.")
-        
-        id_metadata_str = ",".join(map(str, ids_metadata))
 
         for i, timestamp in enumerate(timestamps):
             velocidad = series_df.loc[i, 'Serie_1']
@@ -66,7 +73,6 @@ class DatabaseOperations:
                 timestamp=timestamp,
                 velocidad=velocidad,
                 temperatura=temperatura,
-                id_metadata=id_metadata_str,
                 id_simulacion=id_simulacion,
                 anomalia=anomalia
             )
@@ -111,13 +117,11 @@ class DatabaseOperations:
                 print(f"Error al insertar registro en la posición {i}: {e}")
                 raise
 
-    def insert_historicos_testing_from_dataframe(self, session, timestamps, series_df, id_plc, id_simulacion, ids_metadata):
+    def insert_historicos_testing_from_dataframe(self, session, timestamps, series_df, id_plc, id_simulacion):
         historicos_testing = []
         n_minutes = len(timestamps)
         if len(series_df) != n_minutes:
             raise ValueError("El número de filas en el DataFrame no coincide con el número de timestamps.")
-        
-        id_metadata_str = ",".join(map(str, ids_metadata))
 
         for i, timestamp in enumerate(timestamps):
             velocidad = series_df.loc[i, 'Serie_1']
@@ -129,7 +133,6 @@ class DatabaseOperations:
                 timestamp=timestamp,
                 velocidad=velocidad,
                 temperatura=temperatura,
-                id_metadata=id_metadata_str,
                 id_simulacion=id_simulacion,
                 anomalia=anomalia
             )
@@ -174,13 +177,11 @@ class DatabaseOperations:
                 print(f"Error al insertar registro en la posición {i}: {e}")
                 raise
 
-    def insert_monitoreo_vw_from_dataframe(self, session, timestamps, series_df, id_plc, id_simulacion, ids_metadata):
+    def insert_monitoreo_vw_from_dataframe(self, session, timestamps, series_df, id_plc, id_simulacion):
         monitoreos_vw = []
         n_minutes = len(timestamps)
         if len(series_df) != n_minutes:
             raise ValueError("El número de filas en el DataFrame no coincide con el número de timestamps.")
-        
-        id_metadata_str = ",".join(map(str, ids_metadata))
 
         for i, timestamp in enumerate(timestamps):
             velocidad = series_df.loc[i, 'Serie_1']
@@ -191,7 +192,6 @@ class DatabaseOperations:
                 timestamp=timestamp,
                 velocidad=velocidad,
                 temperatura=temperatura,
-                id_metadata=id_metadata_str,
                 id_simulacion=id_simulacion
             )
             monitoreos_vw.append(monitoreoVW)
@@ -233,6 +233,243 @@ class DatabaseOperations:
                 print(f"Error al insertar registro en la posición {i}: {e}")
                 raise
 
+    def _row_columns(self, model, timestamps, series_df, id_plc, id_simulacion):
+        """
+        Valida un bloque con las mismas reglas que el ORM y lo devuelve como columnas de la tabla.
+        """
+        n_minutes = len(timestamps)
+        if len(series_df) != n_minutes:
+            raise ValueError("El número de filas en el DataFrame no coincide con el número de timestamps.")
+
+        values = validate_series_columns(model, timestamps, series_df)
+        columns = {
+            "id_plc": [id_plc] * n_minutes,
+            "timestamp": values["timestamp"],
+            "velocidad": values["velocidad"],
+            "temperatura": values["temperatura"],
+            "id_simulacion": [id_simulacion] * n_minutes,
+        }
+        if "anomalia" in values:
+            columns["anomalia"] = values["anomalia"]
+        return columns
+
+    def _copy_rows(self, session, model, timestamps, series_df, id_plc, id_simulacion, ignore_conflicts=False):
+        """
+        Envía un bloque de filas con ``COPY ... FROM STDIN`` (CSV) sin confirmar la transacción.
+        Con ``ignore_conflicts`` el COPY va a una tabla temporal y se inserta con
+        ``ON CONFLICT (id_plc, timestamp) DO NOTHING``.
+        :return: Número de filas escritas (con ``ignore_conflicts``, el rowcount del INSERT ... SELECT).
+        """
+        columns = self._row_columns(model, timestamps, series_df, id_plc, id_simulacion)
+        column_list = ", ".join(columns)
+        table_name = model.__tablename__
+        target = f"tmp_{table_name}" if ignore_conflicts else table_name
+
+        cursor = session.connection().connection.cursor()
+        if ignore_conflicts:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {target} ON COMMIT DROP "
+                f"AS SELECT {column_list} FROM {table_name} WITH NO DATA"
+            )
+        cursor.copy_expert(f"COPY {target} ({column_list}) FROM STDIN WITH (FORMAT csv)", CsvCopyStream.from_columns(columns), size=1 << 20)
+        if not ignore_conflicts:
+            return len(timestamps)
+        cursor.execute(
+            f"INSERT INTO {table_name} ({column_list}) SELECT {column_list} FROM {target} "
+            f"ON CONFLICT (id_plc, timestamp) DO NOTHING"
+        )
+        n_rows = cursor.rowcount
+        cursor.execute(f"TRUNCATE {target}")
+        return n_rows
+
+    def _insert_ignore_conflicts(self, session, model, timestamps, series_df, id_plc, id_simulacion):
+        """
+        INSERT multi-fila idempotente: las filas cuyo (id_plc, timestamp) ya existe se omiten.
+        :return: Número de filas escritas (las enviadas si el driver no informa el rowcount).
+        """
+        columns = self._row_columns(model, timestamps, series_df, id_plc, id_simulacion)
+        names = list(columns)
+        values = [dict(zip(names, row)) for row in zip(*(columns[name] for name in names))]
+        for row in values:
+            row["velocidad"] = float(row["velocidad"])
+            row["temperatura"] = float(row["temperatura"])
+            if "anomalia" in row:
+                row["anomalia"] = bool(row["anomalia"])
+        result = session.connection().execute(pg_insert(model).on_conflict_do_nothing(index_elements=["id_plc", "timestamp"]), values)
+        return result.rowcount if result.rowcount >= 0 else len(values)
+
+    def _build_orm_rows(self, model, timestamps, series_df, id_plc, id_simulacion):
+        """
+        Construye los objetos ORM de un bloque leyendo las columnas como arrays.
+        """
+        if len(series_df) != len(timestamps):
+            raise ValueError("El número de filas en el DataFrame no coincide con el número de timestamps.")
+
+        velocidades = series_df['Serie_1'].to_numpy()
+        temperaturas = series_df['Serie_2'].to_numpy()
+        with_anomalia = "anomalia" in model.__table__.columns
+        anomalias = series_df['Anomaly'].to_numpy() if with_anomalia and 'Anomaly' in series_df.columns else None
+
+        rows = []
+        for i, timestamp in enumerate(timestamps):
+            values = dict(
+                id_plc=id_plc,
+                timestamp=timestamp,
+                velocidad=float(velocidades[i]),
+                temperatura=float(temperaturas[i]),
+                id_simulacion=id_simulacion
+            )
+            if with_anomalia:
+                values["anomalia"] = bool(anomalias[i]) if anomalias is not None else False
+            rows.append(model(**values))
+        return rows
+
+    def copy_from_dataframe(self, session, model, timestamps, series_df, id_plc, id_simulacion, ignore_conflicts=False):
+        """
+        Carga masiva mediante ``COPY ... FROM STDIN`` (CSV) dentro de una sola transacción.
+        :param model: Clase ORM destino.
+        :return: Número de filas cargadas.
+        """
+        try:
+            n_rows = self._copy_rows(session, model, timestamps, series_df, id_plc, id_simulacion, ignore_conflicts)
+            session.commit()
+            print(f"Se copiaron {n_rows} registros en la tabla {model.__tablename__}.")
+            return n_rows
+        except ValueError:
+            session.rollback()
+            raise
+        except Exception as e:
+            session.rollback()
+            print(f"Error al copiar registros en {model.__tablename__}: {e}")
+            return 0
+
+    def insert_chunks(self, session, table_name, batches, id_plc, id_simulacion, method="orm", ignore_conflicts=False):
+        """
+        Escribe un iterador de bloques confirmando cada bloque por separado, de modo que la
+        memoria queda acotada al tamaño del bloque y un error solo revierte su propio bloque.
+        :param batches: Iterador de tuplas (timestamps, series_df) con índice desde 0.
+        :param method: 'orm' o 'copy'.
+        :param ignore_conflicts: Omite filas cuyo (id_plc, timestamp) ya existe (reintentos idempotentes);
+                                 las omitidas no se cuentan como confirmadas.
+        :return: Tupla (filas confirmadas, bloques fallidos).
+        """
+        model = TABLE_MODELS[table_name]
+        total_rows = 0
+        failed_chunks = 0
+        for n_chunk, (timestamps, series_df) in enumerate(batches, start=1):
+            try:
+                if method == "copy":
+                    n_rows = self._copy_rows(session, model, timestamps, series_df, id_plc, id_simulacion, ignore_conflicts)
+                elif ignore_conflicts:
+                    n_rows = self._insert_ignore_conflicts(session, model, timestamps, series_df, id_plc, id_simulacion)
+                else:
+                    rows = self._build_orm_rows(model, timestamps, series_df, id_plc, id_simulacion)
+                    session.add_all(rows)
+                    n_rows = len(rows)
+                session.commit()
+                total_rows += n_rows
+                print(f"Bloque {n_chunk}: {n_rows} registros confirmados en {table_name} para PLC {id_plc} (acumulado {total_rows}).")
+            except Exception as e:
+                session.rollback()
+                failed_chunks += 1
+                print(f"Error en el bloque {n_chunk} de {table_name} para PLC {id_plc}: {e}")
+        return total_rows, failed_chunks
+
+    @staticmethod
+    def prepare_rows(table_name, rows):
+        """
+        Valida filas (diccionarios) con las reglas del modelo y descarta las columnas que la
+        tabla no tiene (p. ej. 'anomalia' en monitoreo_vw).
+        :return: Tupla (modelo, lista de valores).
+        """
+        model = TABLE_MODELS[table_name]
+        table_columns = model.__table__.columns
+        values = []
+        for row in rows:
+            if not row.get("timestamp"):
+                raise ValueError("El campo 'timestamp' no puede estar vacío.")
+            for key in ("velocidad", "temperatura"):
+                if row.get(key) is None or row[key] < 0:
+                    raise ValueError(f"El campo '{key}' debe ser un número positivo.")
+            values.append({key: value for key, value in row.items() if key in table_columns})
+        return model, values
+
+    def insert_rows(self, session, table_name, rows, prepared=False):
+        """
+        Inserta una lista de filas (diccionarios) con un único INSERT multi-fila, sin confirmar.
+        Las filas cuyo (id_plc, timestamp) ya existe se omiten (p. ej. minutos ya escritos por una
+        carga histórica o un reinicio dentro del mismo minuto).
+        :param prepared: Las filas ya pasaron por prepare_rows y no se vuelven a validar.
+        :return: Número de filas enviadas.
+        """
+        if not rows:
+            return 0
+        model, values = (TABLE_MODELS[table_name], rows) if prepared else self.prepare_rows(table_name, rows)
+        session.execute(pg_insert(model).on_conflict_do_nothing(index_elements=["id_plc", "timestamp"]), values)
+        return len(values)
+
+    def get_estado_simulador(self, session, id_plc, table_name):
+        """
+        Último checkpoint del generador en línea de un PLC en una tabla, o None si no existe.
+        """
+        try:
+            return session.get(EstadoSimulador, (id_plc, table_name))
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"Error al obtener el estado del simulador de PLC {id_plc} en {table_name}: {e}")
+            return None
+
+    def save_estados_simulador(self, session, estados):
+        """
+        Guarda (upsert) checkpoints de generadores en línea, sin confirmar: quien llama confirma
+        junto con las filas del tick para que estado y datos queden consistentes.
+        :param estados: Lista de diccionarios con id_plc, table_name, id_simulacion, timestamp y estado.
+        :return: Número de checkpoints escritos.
+        """
+        if not estados:
+            return 0
+        stmt = pg_insert(EstadoSimulador).values(estados)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=["id_plc", "table_name"],
+            set_={column: stmt.excluded[column] for column in ("id_simulacion", "timestamp", "estado")}
+        ))
+        return len(estados)
+
+    @staticmethod
+    def iter_dataframe_batches(timestamp_chunks, series_df):
+        """
+        Recorre un DataFrame en bloques alineados con los bloques de timestamps.
+        :param timestamp_chunks: Iterador de listas de timestamps consecutivas.
+        :param series_df: DataFrame completo de la simulación.
+        :return: Generador de tuplas (timestamps, series_df del bloque).
+        """
+        start = 0
+        for timestamps in timestamp_chunks:
+            end = start + len(timestamps)
+            yield timestamps, series_df.iloc[start:end].reset_index(drop=True)
+            start = end
+
+    def insert_from_dataframe(self, session, table_name, timestamps, series_df, id_plc, id_simulacion, method="orm", ignore_conflicts=False):
+        """
+        Inserta un DataFrame simulado en la tabla indicada con el método seleccionado.
+        :param table_name: Clave de TABLE_MODELS.
+        :param method: 'orm' (objetos + add_all) o 'copy' (COPY FROM STDIN).
+        :param ignore_conflicts: Omite filas cuyo (id_plc, timestamp) ya existe.
+        """
+        if method == "copy":
+            return self.copy_from_dataframe(session, TABLE_MODELS[table_name], timestamps, series_df, id_plc, id_simulacion, ignore_conflicts)
+        if ignore_conflicts:
+            return self.insert_chunks(session, table_name, iter([(timestamps, series_df)]), id_plc, id_simulacion, method, ignore_conflicts)[0]
+        if method != "orm":
+            raise ValueError(f"Método de carga inválido: {method}. Usa 'orm' o 'copy'.")
+
+        insert_methods = {
+            "historicos": self.insert_historicos_from_dataframe,
+            "historicos_testing": self.insert_historicos_testing_from_dataframe,
+            "Monitoreo_vw": self.insert_monitoreo_vw_from_dataframe,
+        }
+        return insert_methods[table_name](session, timestamps, series_df, id_plc, id_simulacion)
+
     def insert_simulacion(self, session, next_id_simulacion, ids_metadata, tipo_simulacion, table_name):
         try:
             simulaciones = []
@@ -252,6 +489,69 @@ class DatabaseOperations:
             session.rollback()
             print(f"Error al insertar en Simulacion: {e}")
     
+    def insert_simulacion_plc(self, session, id_simulacion, id_plc, id_metadata):
+        """
+        Registra qué configuración (id_metadata) generó las filas de un PLC en una ejecución.
+        """
+        try:
+            session.add(SimulacionPLC(id_simulacion=id_simulacion, id_plc=id_plc, id_metadata=id_metadata))
+            session.commit()
+        except (SQLAlchemyError, ValueError) as e:
+            session.rollback()
+            print(f"Error al insertar en SimulacionPLC ({id_simulacion}, {id_plc}, {id_metadata}): {e}")
+
+    def get_last_timestamps(self, session, table_name):
+        """
+        Último timestamp almacenado por PLC en una tabla (usa el índice único (id_plc, timestamp)).
+        :return: Diccionario id_plc -> datetime.
+        """
+        model = TABLE_MODELS[table_name]
+        try:
+            rows = session.query(model.id_plc, func.max(model.timestamp)).group_by(model.id_plc).all()
+            return {id_plc: last_timestamp for id_plc, last_timestamp in rows if last_timestamp is not None}
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"Error al obtener los últimos timestamps de {table_name}: {e}")
+            return {}
+
+    def get_monthly_counts(self, session, table_name, id_plc, start, end):
+        """
+        Filas por mes natural de un PLC en [start, end), para detectar huecos interiores
+        (p. ej. bloques fallidos) que no se ven con el último timestamp.
+        :return: Diccionario inicio de mes (datetime) -> número de filas.
+        """
+        model = TABLE_MODELS[table_name]
+        month = func.date_trunc("month", model.timestamp)
+        try:
+            rows = (
+                session.query(month, func.count())
+                .filter(model.id_plc == id_plc, model.timestamp >= start, model.timestamp < end)
+                .group_by(month)
+                .all()
+            )
+            return {month_start: count for month_start, count in rows}
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"Error al contar las filas por mes de PLC {id_plc} en {table_name}: {e}")
+            return {}
+
+    def get_series_after(self, session, table_name, id_plc, after=None, limit=50000):
+        """
+        Filas (timestamp, velocidad, temperatura) de un PLC posteriores a ``after``, en orden de
+        timestamp y como máximo ``limit`` (usa el índice único (id_plc, timestamp)).
+        :return: Lista de tuplas; vacía si no hay filas nuevas o si la consulta falla.
+        """
+        model = TABLE_MODELS[table_name]
+        try:
+            query = session.query(model.timestamp, model.velocidad, model.temperatura).filter(model.id_plc == id_plc)
+            if after is not None:
+                query = query.filter(model.timestamp > after)
+            return query.order_by(model.timestamp).limit(limit).all()
+        except SQLAlchemyError as e:
+            session.rollback()
+            print(f"Error al obtener la serie de PLC {id_plc} en {table_name}: {e}")
+            return []
+
     def get_ids_plc(self, session):
         try:
             ids_plc = session.query(PLC.id_plc).all()
@@ -259,12 +559,3 @@ class DatabaseOperations:
         except Exception as e:
             print(f"Error al obtener los IDs de PLC: {e}")
             return []
-        
-    def clean_temp_simulacion(self, session, id_simulacion):
-        try:
-            session.query(Simulacion).filter_by(id_simulacion=id_simulacion, tipo_simulacion=None).delete()
-            session.commit()
-        except SQLAlchemyError as e:
-            session.rollback()
-            print(f"Error al eliminar registro temporal id_simulacion {id_simulacion}: {e}")
-        
\ No newline at end of file
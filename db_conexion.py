@@ -1,17 +1,55 @@
 import os
+import time
+from threading import Lock
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.sql import text
 
+DEFAULT_POOL_SIZE = 5
+MAX_POOL_SIZE = 50
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool que mide el tiempo de espera de cada checkout, para distinguir
+    esperas por el pool de esperas por la base de datos.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
 class DatabaseConnection:
-    def __init__(self):
+    def __init__(self, n_feeds=None):
+        """
+        :param n_feeds: Número de hilos/feeds que usarán conexiones a la vez; define el tamaño del pool.
+        """
         os.environ.pop("DB_HOST", None)
         os.environ.pop("DB_PORT", None)
         os.environ.pop("DB_NAME", None)
         os.environ.pop("DB_USER", None)
         os.environ.pop("DB_PASSWORD", None)
+        os.environ.pop("DB_ECHO", None)
+        os.environ.pop("DB_POOL_SIZE", None)
+        os.environ.pop("DB_MAX_OVERFLOW", None)
+        os.environ.pop("DB_POOL_TIMEOUT", None)
+        os.environ.pop("DB_POOL_RECYCLE", None)
         load_dotenv()
 
         self.host = os.getenv('DB_HOST')
@@ -19,21 +57,67 @@ class DatabaseConnection:
         self.database = os.getenv('DB_NAME')
         self.user = os.getenv('DB_USER')
         self.password = os.getenv('DB_PASSWORD')
+        self.n_feeds = n_feeds
 
         self.engine = None
         self.Session = None
 
         self.connect()
 
+    def engine_options(self):
+        """
+        Perfil del engine: pool dimensionado según n_feeds (o DB_POOL_SIZE), overflow, timeout,
+        pre-ping y log de sentencias desactivado salvo DB_ECHO=true.
+        """
+        if os.getenv('DB_POOL_SIZE'):
+            pool_size = int(os.getenv('DB_POOL_SIZE'))
+        else:
+            pool_size = min(max(DEFAULT_POOL_SIZE, (self.n_feeds or 0) + 1), MAX_POOL_SIZE)
+
+        return {
+            "echo": os.getenv('DB_ECHO', 'false').lower() == 'true',
+            "poolclass": TimedQueuePool,
+            "pool_size": pool_size,
+            "max_overflow": int(os.getenv('DB_MAX_OVERFLOW', pool_size // 2)),
+            "pool_timeout": float(os.getenv('DB_POOL_TIMEOUT', 30)),
+            "pool_recycle": int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            "pool_pre_ping": True,
+        }
+
     def connect(self):
         try:
             connection_string = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
-            self.engine = create_engine(connection_string, echo=True)
-            self.Session = sessionmaker(bind=self.engine)
+            options = self.engine_options()
+            self.engine = create_engine(connection_string, **options)
+            self.Session = scoped_session(sessionmaker(bind=self.engine))
             with self.engine.connect() as conn:
                 conn.execute(text("SELECT 1"))
-            print("Connection successful")
+            print(f"Connection successful (pool_size={options['pool_size']}, max_overflow={options['max_overflow']})")
         except SQLAlchemyError as e:
             print(f"Error connecting to database: {e}")
         except Exception as e:
             print(f"Unexpected error: {e}")
+
+    def pool_metrics(self):
+        """
+        Estado actual del pool y estadísticas acumuladas de espera en checkout.
+        :return: Diccionario con tamaño, conexiones en uso, overflow y tiempos de espera (s).
+        """
+        pool = self.engine.pool
+        checkouts = getattr(pool, "checkouts", 0)
+        wait_total = getattr(pool, "wait_total", 0.0)
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "checkouts": checkouts,
+            "wait_avg": wait_total / checkouts if checkouts else 0.0,
+            "wait_max": getattr(pool, "wait_max", 0.0),
+        }
+
+    def close_session(self):
+        """
+        Cierra y descarta la sesión del hilo actual.
+        """
+        self.Session.remove()
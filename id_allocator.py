@@ -0,0 +1,52 @@
+from threading import Lock
+from sqlalchemy.sql import text
+
+SEQUENCE_NAME = "simulacion_id_seq"
+
+class SimulacionIdAllocator:
+    def __init__(self, block_size=20):
+        """
+        Asigna id_simulacion desde una secuencia de PostgreSQL reservando bloques por proceso:
+        un solo nextval reserva ``block_size`` ids que luego se entregan en memoria.
+        Distintos procesos o hosts obtienen bloques disjuntos sin bloquearse entre sí.
+        El id solo se reserva: las filas de simulacion se insertan antes que las filas de datos que
+        lo referencian (historicos.id_simulacion).
+        Los ids de un bloque que no se llegan a entregar (fin del proceso, reinicio) se pierden:
+        los huecos en id_simulacion son esperados y no indican simulaciones borradas.
+        :param block_size: Tamaño del bloque al crear la secuencia (INCREMENT BY).
+        """
+        self.block_size = block_size
+        self._lock = Lock()
+        self._next = None
+        self._end = None
+        self._increment = None
+
+    def _ensure_sequence(self, conn):
+        max_id = conn.execute(text("SELECT COALESCE(MAX(id_simulacion), 0) FROM simulacion")).scalar()
+        conn.execute(text(
+            f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE_NAME} START WITH {max_id + 1} INCREMENT BY {self.block_size}"
+        ))
+        # Si la secuencia ya existía, el tamaño de bloque lo define su INCREMENT BY
+        return conn.execute(text(
+            "SELECT increment_by FROM pg_sequences WHERE schemaname = current_schema() AND sequencename = :name"
+        ), {"name": SEQUENCE_NAME}).scalar()
+
+    def _reserve_block(self, bind):
+        with bind.begin() as conn:
+            if self._increment is None:
+                self._increment = self._ensure_sequence(conn)
+            start = conn.execute(text(f"SELECT nextval('{SEQUENCE_NAME}')")).scalar()
+        print(f"Reservado bloque de id_simulacion [{start}, {start + self._increment})")
+        return start, start + self._increment
+
+    def next_id(self, session):
+        """
+        Devuelve el siguiente id_simulacion libre; solo consulta la base al agotar el bloque.
+        :param session: Sesión cuya conexión (bind) se usa para reservar bloques.
+        """
+        with self._lock:
+            if self._next is None or self._next >= self._end:
+                self._next, self._end = self._reserve_block(session.get_bind())
+            value = self._next
+            self._next += 1
+            return value
@@ -1,22 +1,29 @@
 import os
-import time
-import numpy as np
+import asyncio
 import pandas as pd
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
+from dateutil.relativedelta import relativedelta
 from process_simulator import ProcessSimulator
+from compact_series import CompactSeries
 from config_loader import ConfigLoader
 from series_visualizer import SeriesVisualizer
 from db_conexion import DatabaseConnection
-from models import Config,Simulacion
-from crud_operations import DatabaseOperations
+from models import Config
+from crud_operations import DatabaseOperations, TABLE_MODELS
+from id_allocator import SimulacionIdAllocator
+from partition_manager import PartitionManager
+from random_streams import new_root_seed, plc_generator, derived_seed, ANOMALY_STREAM
 from time_period_helper import TimePeriodHelper
-from sqlalchemy import func
+from tick_scheduler import LiveFeed, TickScheduler
+from time_series_from_scratch import OnlineStepper
+from time_series_analyzer import IncrementalDecomposer
+from async_live_feed import AsyncLiveRuntime
 from threading import Thread
 from typing import List
 from sqlalchemy.exc import SQLAlchemyError
-from threading import Lock
 
 logging.basicConfig(
     filename="error_log.log",
@@ -24,12 +31,42 @@ logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-simulacion_lock= Lock()
+simulacion_ids = SimulacionIdAllocator(block_size=20)
+
+# Método de carga por tabla: 'orm' (objetos ORM + add_all) o 'copy' (COPY FROM STDIN)
+LOAD_METHODS = {
+    "historicos": "copy",
+    "historicos_testing": "copy",
+    "Monitoreo_vw": "copy",
+}
+
+# Carga histórica: 'fan_out' (una simulación por PLC escrita en todas las tablas), 'incremental'
+# (solo los minutos faltantes por PLC y tabla, idempotente) o 'per_table'
+BACKFILL_MODE = "fan_out"
+
+# Filas por bloque confirmado en las cargas históricas (None: una sola transacción).
+# Solo acota el tamaño de cada transacción y del lote enviado a la base: la serie completa de cada
+# PLC se sigue simulando en memoria. Para acotar también la memoria de la simulación from_scratch
+# hay que activar SIM_STREAM (carga fan_out).
+CHUNK_ROWS = 50000
+
+# Procesos que simulan PLC en paralelo en la carga fan_out (1: simulación secuencial en el hilo)
+SIM_WORKERS = os.cpu_count() or 1
+
+# PLC simulados juntos como un único tensor (n_plc, n_points, n_series) en modo from_scratch
+SIM_BATCH_PLCS = 16
+
+# Carga fan_out generada por bloques de CHUNK_ROWS minutos (memoria constante para rangos de varios años).
+# Desactivada por defecto: escala con la varianza estacionaria analítica en lugar de la de la muestra
+# y no guarda el CSV de resultados por PLC
+SIM_STREAM = False
+
+# Resultados de la carga fan_out en forma compacta (float32, minutos epoch, anomalías en bits);
+# los timestamps solo se formatean como texto al escribir cada bloque
+COMPACT_SERIES = False
 
 def save_simulation_config(output_dir, config_file, timestamp, seed, mode_sim):
-    df_config = pd.read_csv(config_file)
-    config_dict = df_config.set_index('parameter')['value'].to_dict()
-    config_json = json.dumps(config_dict)
+    config_json = json.dumps(ConfigLoader.load_parameters(config_file))
     
     data = {
         "Tipo Simulacion": mode_sim,
@@ -49,10 +86,11 @@ def save_simulation_config(output_dir, config_file, timestamp, seed, mode_sim):
     updated_data.to_csv(output_csv_path, index=False)
     print(f"Configuración guardada en: {output_csv_path}")
 
-def prepare_simulation_data(config_file, timestamp, months_to_add=None):
-    config = ConfigLoader.load_config_from_csv(config_file)
+def prepare_simulation_data(config_file, timestamp, months_to_add=None, materialize_timestamps=True, start_date=None):
+    # Copia del primer nivel: la configuración en caché es compartida e inmutable
+    config = dict(ConfigLoader.load_config(config_file))
 
-    start_date = config.get("start_date", timestamp)
+    start_date = start_date or config.get("start_date", timestamp)
 
     if months_to_add:
         end_date = TimePeriodHelper.add_months(start_date, months_to_add)
@@ -62,22 +100,32 @@ def prepare_simulation_data(config_file, timestamp, months_to_add=None):
     tipo_simulacion = config.get("tipo_simulacion", None)
     total_minutes = TimePeriodHelper.calculate_minutes(start_date, end_date)
     config['n_points'] = total_minutes
-    timestamps = TimePeriodHelper.generate_timestamps(start_date, end_date)
+    config['start_date'], config['end_date'] = start_date, end_date
+    timestamps = TimePeriodHelper.generate_timestamps(start_date, end_date) if materialize_timestamps else None
 
     return config, timestamps, tipo_simulacion
 
-def process_simulation(simulator, mode_sim, config):
+def load_existing_series():
+    existing_series_file = "../Input/serie_existente.csv"
+    if not os.path.exists(existing_series_file):
+        raise FileNotFoundError(f"El archivo de series existentes no se encontró: {existing_series_file}")
+
+    # Solo se relee si el archivo cambia; el modelo ajustado se recupera del ModelStore por su contenido
+    return read_existing_series(existing_series_file, os.stat(existing_series_file).st_mtime_ns)
+
+@lru_cache(maxsize=4)
+def read_existing_series(existing_series_file, mtime_ns):
+    existing_series = pd.read_csv(existing_series_file)
+    print("Series existentes cargadas correctamente.")
+    return existing_series
+
+def process_simulation(simulator, mode_sim, config, rng=None):
     if mode_sim == "from_scratch":
-        return simulator.simulate(mode=mode_sim, config=config)
+        return simulator.simulate(mode=mode_sim, config=config, rng=rng)
 
     elif mode_sim == "analyze_and_simulate":
-        existing_series_file = "../Input/serie_existente.csv"
-        if not os.path.exists(existing_series_file):
-            raise FileNotFoundError(f"El archivo de series existentes no se encontró: {existing_series_file}")
-
-        existing_series = pd.read_csv(existing_series_file)
-        print("Series existentes cargadas correctamente.")
-        return simulator.simulate(mode=mode_sim, config=config, time_series=existing_series, period=12, steps=config.get("n_points"))
+        existing_series = load_existing_series()
+        return simulator.simulate(mode=mode_sim, config=config, time_series=existing_series, period=12, steps=config.get("n_points"), rng=rng)
 
 def save_simulation_results(output_dir, config_file, timestamp, seed, mode_sim, series, id_plc):
     os.makedirs(output_dir, exist_ok=True)
@@ -85,350 +133,557 @@ def save_simulation_results(output_dir, config_file, timestamp, seed, mode_sim,
     # Guardar las series en CSV
     filename = f"simulation_results_id_plc_{id_plc}.csv"
     series_csv_path = os.path.join(output_dir, filename)
+    series = series.to_frame() if isinstance(series, CompactSeries) else series
     series.to_csv(series_csv_path, index=False)
 
     # Guardar la configuración de la simulación
     save_simulation_config(output_dir, config_file, timestamp, seed, mode_sim)
 
 
-def load_historico(db, config_file, ids_plc, flags, config_json):
+# Las cargas omiten por defecto los (id_plc, timestamp) ya escritos, de modo que repetir una carga
+# sobre una base con datos no falla por la restricción única
+def write_series(db_ops, session, table_name, config, timestamps, series, id_plc, id_simulacion, load_method, chunk_rows, ignore_conflicts=True):
+    if isinstance(series, CompactSeries):
+        total_rows, failed_chunks = db_ops.insert_chunks(session, table_name, series.iter_batches(chunk_rows), id_plc, id_simulacion, method=load_method, ignore_conflicts=ignore_conflicts)
+        print(f"PLC {id_plc}: {total_rows} registros en {table_name}, {failed_chunks} bloques fallidos.")
+        return total_rows
+
+    if not chunk_rows:
+        return db_ops.insert_from_dataframe(session, table_name, timestamps, series, id_plc, id_simulacion, method=load_method, ignore_conflicts=ignore_conflicts)
+
+    timestamp_chunks = TimePeriodHelper.iter_timestamp_chunks(config['start_date'], config['end_date'], chunk_rows)
+    batches = DatabaseOperations.iter_dataframe_batches(timestamp_chunks, series)
+    total_rows, failed_chunks = db_ops.insert_chunks(session, table_name, batches, id_plc, id_simulacion, method=load_method, ignore_conflicts=ignore_conflicts)
+    print(f"PLC {id_plc}: {total_rows} registros en {table_name}, {failed_chunks} bloques fallidos.")
+    return total_rows
+
+def write_stream(db_ops, session, table_names, ids_simulacion, load_methods, config, chunks, id_plc, chunk_rows):
+    """
+    Escribe una simulación por bloques (ProcessSimulator.simulate_stream) en varias tablas: cada bloque
+    se genera, se escribe en todas las tablas y se descarta, así la memoria no depende del rango.
+    """
+    timestamp_chunks = TimePeriodHelper.iter_timestamp_chunks(config['start_date'], config['end_date'], chunk_rows)
+    totals = {table_name: [0, 0] for table_name in table_names}
+    for timestamps, chunk in zip(timestamp_chunks, chunks):
+        for table_name in table_names:
+            rows, failed = db_ops.insert_chunks(session, table_name, [(timestamps, chunk)], id_plc, ids_simulacion[table_name], method=load_methods[table_name], ignore_conflicts=True)
+            totals[table_name][0] += rows
+            totals[table_name][1] += failed
+    for table_name, (total_rows, failed_chunks) in totals.items():
+        print(f"PLC {id_plc}: {total_rows} registros en {table_name}, {failed_chunks} bloques fallidos.")
+
+
+def load_historico(db, config_file, ids_plc, flags, config_json, load_method="orm", chunk_rows=None):
     try:
         session = db.Session()
         db_ops = DatabaseOperations(session)
         simulator = ProcessSimulator()
-        ids_metadata = []
         table_name = 'historicos'
         next_id_simulacion = get_next_simulacion_id(session)
 
-        for id_plc in ids_plc:
-            seed = int(time.time() * 1000) % 10000
-            print(f"Semilla generada: {seed}")
+        root_seed = new_root_seed()
+        print(f"Semilla raíz de la ejecución: {root_seed}")
 
-            np.random.seed(seed)
+        for id_plc in ids_plc:
+            seed = root_seed
+            rng = plc_generator(seed, id_plc)
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             print(f"timestamp de la ejecución: {timestamp}")
 
-            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp)
+            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, materialize_timestamps=not chunk_rows)
 
             if tipo_simulacion not in [0, 1]:
                 raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
 
             mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
-            series = process_simulation(simulator, mode_sim, config)
+            series = process_simulation(simulator, mode_sim, config, rng)
 
             new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
             id_metadata = db_ops.insert(new_config)
             if id_metadata:
-                ids_metadata.append(id_metadata)
+                db_ops.insert_simulacion(session, next_id_simulacion, [id_metadata], mode_sim, table_name)
+                db_ops.insert_simulacion_plc(session, next_id_simulacion, id_plc, id_metadata)
 
-            db_ops.insert_historicos_from_dataframe(session, timestamps, series, id_plc, next_id_simulacion, ids_metadata)
+            write_series(db_ops, session, table_name, config, timestamps, series, id_plc, next_id_simulacion, load_method, chunk_rows)
             save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, id_plc)
 
-        db_ops.insert_simulacion(session, next_id_simulacion, ids_metadata, mode_sim, table_name)
-        db_ops.clean_temp_simulacion(session, next_id_simulacion)
-
         flags['load_historico'] = True
 
     except Exception as e:
         flags['load_historico'] = False
         logging.error(f"Error en load_historico: {e}")
         raise
+    finally:
+        db.close_session()
 
 
-def add_historico_periodic_record(db, config_file, id_plc, flags, config_json):
+def load_historico_testing(db, config_file, ids_plc, flags, config_json, load_method="orm", chunk_rows=None):
     try:
         session = db.Session()
         db_ops = DatabaseOperations(session)
         simulator = ProcessSimulator()
+        table_name = 'historicos_testing'
         next_id_simulacion = get_next_simulacion_id(session)
-        table_name = 'historicos'
-        print(f"start")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"Iniciando carga periódica a partir de: {timestamp}")
 
-        while True:
-            seed = int(time.time() * 1000) % 10000
-            print(f"Semilla generada: {seed}")
+        root_seed = new_root_seed()
+        print(f"Semilla raíz de la ejecución: {root_seed}")
 
-            np.random.seed(seed)
+        for id_plc in ids_plc:
+            seed = root_seed
+            rng = plc_generator(seed, id_plc)
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             print(f"timestamp de la ejecución: {timestamp}")
 
-            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, months_to_add=1)
+            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, materialize_timestamps=not chunk_rows)
 
             if tipo_simulacion not in [0, 1]:
                 raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
 
             mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
-            series = process_simulation(simulator, mode_sim, config)
+            series = process_simulation(simulator, mode_sim, config, rng)
 
             new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
             id_metadata = db_ops.insert(new_config)
+            if id_metadata:
+                db_ops.insert_simulacion(session, next_id_simulacion, [id_metadata], mode_sim, table_name)
+                db_ops.insert_simulacion_plc(session, next_id_simulacion, id_plc, id_metadata)
 
-            db_ops.insert_simulacion(session, next_id_simulacion, [id_metadata], mode_sim, table_name)
-            db_ops.clean_temp_simulacion(session, next_id_simulacion)
+            write_series(db_ops, session, table_name, config, timestamps, series, id_plc, next_id_simulacion, load_method, chunk_rows)
             save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, id_plc)
-            db_ops.insert_historicos_from_dataframe_delay(session, timestamps, series, id_plc, next_id_simulacion)
 
-            flags[f"add_periodic_records_plc_{id_plc}"] = True
+        flags['load_historico'] = True
 
     except Exception as e:
-        flags[f"add_periodic_records_plc_{id_plc}"] = False
-        logging.error(f"Error en el hilo de id_plc {id_plc}: {e}")
+        flags['load_historico'] = False
+        logging.error(f"Error en load_historico: {e}")
         raise
+    finally:
+        db.close_session()
 
 
-def load_historico_testing(db, config_file, ids_plc, flags, config_json):
+def load_monitoreo_vw(db, config_file, ids_plc, flags, config_json, load_method="orm", chunk_rows=None):
     try:
         session = db.Session()
         db_ops = DatabaseOperations(session)
         simulator = ProcessSimulator()
-        ids_metadata = []
-        table_name = 'historicos_testing'
+        table_name = 'Monitoreo_vw'
         next_id_simulacion = get_next_simulacion_id(session)
 
-        for id_plc in ids_plc:
-            seed = int(time.time() * 1000) % 10000
-            print(f"Semilla generada: {seed}")
+        root_seed = new_root_seed()
+        print(f"Semilla raíz de la ejecución: {root_seed}")
 
-            np.random.seed(seed)
+        for id_plc in ids_plc:
+            seed = root_seed
+            rng = plc_generator(seed, id_plc)
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             print(f"timestamp de la ejecución: {timestamp}")
 
-            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp)
+            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, materialize_timestamps=not chunk_rows)
 
             if tipo_simulacion not in [0, 1]:
                 raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
 
             mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
-            series = process_simulation(simulator, mode_sim, config)
+            series = process_simulation(simulator, mode_sim, config, rng)
 
             new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
             id_metadata = db_ops.insert(new_config)
             if id_metadata:
-                ids_metadata.append(id_metadata)
+                db_ops.insert_simulacion(session, next_id_simulacion, [id_metadata], mode_sim, table_name)
+                db_ops.insert_simulacion_plc(session, next_id_simulacion, id_plc, id_metadata)
 
-            db_ops.insert_historicos_testing_from_dataframe(session, timestamps, series, id_plc, next_id_simulacion, ids_metadata)
+            write_series(db_ops, session, table_name, config, timestamps, series, id_plc, next_id_simulacion, load_method, chunk_rows)
             save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, id_plc)
 
-        db_ops.insert_simulacion(session, next_id_simulacion, ids_metadata, mode_sim, table_name)
-        db_ops.clean_temp_simulacion(session, next_id_simulacion)
-
         flags['load_historico'] = True
 
     except Exception as e:
         flags['load_historico'] = False
         logging.error(f"Error en load_historico: {e}")
         raise
+    finally:
+        db.close_session()
 
 
-def add_historico_testing_periodic_record(db, config_file, id_plc, flags, config_json):
+def load_fan_out(db, config_file, ids_plc, flags, config_json, tables=None, per_table_seed=False, load_methods=LOAD_METHODS, chunk_rows=None, n_workers=1, batch_size=1, stream=False, compact=False):
     try:
         session = db.Session()
         db_ops = DatabaseOperations(session)
         simulator = ProcessSimulator()
-        next_id_simulacion = get_next_simulacion_id(session)
-        table_name = 'historicos_testing'
-        print(f"start")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"Iniciando carga periódica a partir de: {timestamp}")
-
-        while True:
-            seed = int(time.time() * 1000) % 10000
-            print(f"Semilla generada: {seed}")
-
-            np.random.seed(seed)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"timestamp de la ejecución: {timestamp}")
-
-            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, months_to_add=1)
-
-            if tipo_simulacion not in [0, 1]:
-                raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
-
-            mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
-            series = process_simulation(simulator, mode_sim, config)
-
-            new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
-            id_metadata = db_ops.insert(new_config)
+        tables = tables or list(TABLE_MODELS)
+        ids_simulacion = {table_name: get_next_simulacion_id(session) for table_name in tables}
 
-            db_ops.insert_simulacion(session, next_id_simulacion, [id_metadata], mode_sim, table_name)
-            db_ops.clean_temp_simulacion(session, next_id_simulacion)
-            save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, id_plc)
-            db_ops.insert_historicos_testing_from_dataframe_delay(session, timestamps, series, id_plc, next_id_simulacion)
+        # La configuración y los timestamps son comunes a todos los PLC y tablas
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, materialize_timestamps=not (chunk_rows or compact))
+
+        if tipo_simulacion not in [0, 1]:
+            raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
+
+        mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
+        existing_series = load_existing_series() if mode_sim == "analyze_and_simulate" else None
+        root_seed = new_root_seed()
+
+        # Una sola simulación por PLC salvo que se pida una semilla distinta por tabla
+        seeds = {table_name: derived_seed(root_seed, i) if per_table_seed else root_seed for i, table_name in enumerate(tables)}
+        unique_seeds = list(dict.fromkeys(seeds.values()))
+        # Orden por PLC: las simulaciones de un PLC terminan juntas y se escriben y liberan enseguida
+        jobs = [(seed, id_plc) for id_plc in ids_plc for seed in unique_seeds]
+
+        # Modo por bloques: cada simulación se genera y escribe bloque a bloque con memoria constante
+        if stream and mode_sim == "from_scratch" and chunk_rows:
+            print(f"Simulando {len(jobs)} series por bloques de {chunk_rows} minutos.")
+            for seed, id_plc in jobs:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
+                id_metadata = db_ops.insert(new_config)
+                save_simulation_config("../Output/", config_file, timestamp, seed, mode_sim)
+
+                table_names = [table_name for table_name in tables if seeds[table_name] == seed]
+                for table_name in table_names:
+                    if id_metadata:
+                        db_ops.insert_simulacion(session, ids_simulacion[table_name], [id_metadata], mode_sim, table_name)
+                        db_ops.insert_simulacion_plc(session, ids_simulacion[table_name], id_plc, id_metadata)
+                chunks = simulator.simulate_stream(config, chunk_rows, plc_generator(seed, id_plc), plc_generator(seed, id_plc, ANOMALY_STREAM))
+                write_stream(db_ops, session, table_names, ids_simulacion, load_methods, config, chunks, id_plc, chunk_rows)
+        else:
+            print(f"Simulando {len(jobs)} series con {n_workers} proceso(s).")
+
+            # Etapa de escritura: cada PLC se escribe en cuanto todas sus simulaciones están listas
+            simulated = {}
+            for (seed, id_plc), series in simulator.simulate_many(mode_sim, jobs, config, existing_series, 12, config.get("n_points"), n_workers, batch_size, compact):
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                print(f"PLC {id_plc} simulado (semilla {seed}) a las {timestamp}")
+                new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
+                simulated.setdefault(id_plc, {})[seed] = (series, db_ops.insert(new_config))
+                save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, id_plc)
+                if len(simulated[id_plc]) < len(unique_seeds):
+                    continue
+
+                plc_series = simulated.pop(id_plc)
+                for table_name in tables:
+                    series, id_metadata = plc_series[seeds[table_name]]
+                    if id_metadata:
+                        db_ops.insert_simulacion(session, ids_simulacion[table_name], [id_metadata], mode_sim, table_name)
+                        db_ops.insert_simulacion_plc(session, ids_simulacion[table_name], id_plc, id_metadata)
+                    write_series(db_ops, session, table_name, config, timestamps, series, id_plc, ids_simulacion[table_name], load_methods[table_name], chunk_rows)
 
-            flags[f"add_periodic_records_plc_{id_plc}"] = True
+        flags['load_historico'] = True
 
     except Exception as e:
-        flags[f"add_periodic_records_plc_{id_plc}"] = False
-        logging.error(f"Error en el hilo de id_plc {id_plc}: {e}")
+        flags['load_historico'] = False
+        logging.error(f"Error en load_fan_out: {e}")
         raise
-
-def load_monitoreo_vw(db, config_file, ids_plc, flags, config_json):
+    finally:
+        db.close_session()
+
+def find_interior_gap(db_ops, session, table_name, id_plc, range_start, covered_end):
+    """
+    Inicio del primer mes natural de [range_start, covered_end) con menos filas que minutos, o None
+    si el rango está completo. Detecta huecos interiores, p. ej. de bloques que fallaron en una carga.
+    """
+    counts = {pd.Timestamp(month).to_pydatetime(): count for month, count in db_ops.get_monthly_counts(session, table_name, id_plc, range_start, covered_end).items()}
+    month_start = range_start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while month_start < covered_end:
+        month_end = month_start + relativedelta(months=1)
+        low, high = max(month_start, range_start), min(month_end, covered_end)
+        expected = int((high - low).total_seconds() // 60)
+        if counts.get(month_start, 0) < expected:
+            print(f"PLC {id_plc}: {expected - counts.get(month_start, 0)} minutos faltantes en {table_name} en el mes {month_start:%Y-%m}.")
+            return low
+        month_start = month_end
+    return None
+
+def load_incremental(db, config_file, ids_plc, flags, config_json, tables=None, load_methods=LOAD_METHODS, chunk_rows=None):
     try:
         session = db.Session()
         db_ops = DatabaseOperations(session)
         simulator = ProcessSimulator()
-        ids_metadata = []
-        table_name = 'Monitoreo_vw'
-        next_id_simulacion = get_next_simulacion_id(session)
+        tables = tables or list(TABLE_MODELS)
+        ids_simulacion = {table_name: get_next_simulacion_id(session) for table_name in tables}
+        last_timestamps = {table_name: db_ops.get_last_timestamps(session, table_name) for table_name in tables}
 
-        for id_plc in ids_plc:
-            seed = int(time.time() * 1000) % 10000
-            print(f"Semilla generada: {seed}")
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        config, _, tipo_simulacion = prepare_simulation_data(config_file, timestamp, materialize_timestamps=False)
+        range_start = TimePeriodHelper.parse_date(config['start_date'])
+        range_end = TimePeriodHelper.parse_date(config['end_date'], "23:59:00")
 
-            np.random.seed(seed)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"timestamp de la ejecución: {timestamp}")
+        if tipo_simulacion not in [0, 1]:
+            raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
 
-            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp)
+        mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
 
-            if tipo_simulacion not in [0, 1]:
-                raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
+        for id_plc in ids_plc:
+            # Primer minuto faltante por tabla (hueco interior o tras el último timestamp); se simula
+            # una vez desde el menor de ellos y las filas ya existentes se omiten al escribir
+            starts = {}
+            for table_name in tables:
+                start = range_start
+                if id_plc in last_timestamps[table_name]:
+                    covered_end = min(range_end, last_timestamps[table_name][id_plc] + timedelta(minutes=1))
+                    interior_gap = find_interior_gap(db_ops, session, table_name, id_plc, range_start, covered_end)
+                    start = interior_gap if interior_gap is not None else max(range_start, covered_end)
+                starts[table_name] = start
+            gap_start = min(starts.values())
+            if gap_start >= range_end:
+                print(f"PLC {id_plc}: sin minutos faltantes.")
+                continue
+
+            seed = new_root_seed()
+            rng = plc_generator(seed, id_plc)
+            print(f"Semilla generada: {seed}")
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            print(f"PLC {id_plc}: generando desde {gap_start} hasta {range_end}")
 
-            mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
-            series = process_simulation(simulator, mode_sim, config)
+            gap_config, timestamps, _ = prepare_simulation_data(
+                config_file, timestamp, materialize_timestamps=not chunk_rows, start_date=gap_start.strftime("%Y-%m-%d %H:%M:%S")
+            )
+            series = process_simulation(simulator, mode_sim, gap_config, rng)
 
             new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
             id_metadata = db_ops.insert(new_config)
-            if id_metadata:
-                ids_metadata.append(id_metadata)
 
-            db_ops.insert_monitoreo_vw_from_dataframe(session, timestamps, series, id_plc, next_id_simulacion, ids_metadata)
-            save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, id_plc)
+            for table_name in tables:
+                offset = int((starts[table_name] - gap_start).total_seconds() // 60)
+                if offset >= len(series):
+                    continue
+                if id_metadata:
+                    db_ops.insert_simulacion(session, ids_simulacion[table_name], [id_metadata], mode_sim, table_name)
+                    db_ops.insert_simulacion_plc(session, ids_simulacion[table_name], id_plc, id_metadata)
 
-        db_ops.insert_simulacion(session, next_id_simulacion, ids_metadata, mode_sim, table_name)
-        db_ops.clean_temp_simulacion(session, next_id_simulacion)
+                table_config = dict(gap_config, start_date=starts[table_name].strftime("%Y-%m-%d %H:%M:%S"))
+                table_timestamps = timestamps[offset:] if timestamps is not None else None
+                table_series = series.iloc[offset:].reset_index(drop=True)
+                write_series(db_ops, session, table_name, table_config, table_timestamps, table_series, id_plc,
+                             ids_simulacion[table_name], load_methods[table_name], chunk_rows, ignore_conflicts=True)
 
         flags['load_historico'] = True
 
     except Exception as e:
         flags['load_historico'] = False
-        logging.error(f"Error en load_historico: {e}")
+        logging.error(f"Error en load_incremental: {e}")
         raise
+    finally:
+        db.close_session()
 
+LIVE_TABLES = ["historicos", "historicos_testing", "Monitoreo_vw"]
 
-def add_monitoreo_vw_periodic_record(db, config_file, id_plc, flags, config_json):
-    try:
-        session = db.Session()
-        db_ops = DatabaseOperations(session)
-        simulator = ProcessSimulator()
-        next_id_simulacion = get_next_simulacion_id(session)
-        table_name = 'Monitoreo_vw'
-        print(f"start")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"Iniciando carga periódica a partir de: {timestamp}")
+# Runtime del feed en vivo: 'scheduler' (hilo con TickScheduler) o 'asyncio' (AsyncLiveRuntime)
+LIVE_RUNTIME = "scheduler"
 
-        while True:
-            seed = int(time.time() * 1000) % 10000
-            print(f"Semilla generada: {seed}")
+# Feed en vivo from_scratch con generador en línea (O(1) por minuto, estado en estado_simulador)
+LIVE_STEPPER = True
 
-            np.random.seed(seed)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            print(f"timestamp de la ejecución: {timestamp}")
+# Feed en vivo analyze_and_simulate que aprende de forma incremental de las filas ya escritas en su tabla
+LIVE_LEARNING = False
 
-            config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, months_to_add=1)
+def generate_live_series(simulator, config_file, feed, decomposer=None):
+    seed = new_root_seed()
+    rng = plc_generator(seed, feed.id_plc)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"Regenerando serie de PLC {feed.id_plc} en {feed.table_name} (semilla {seed})")
 
-            if tipo_simulacion not in [0, 1]:
-                raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
+    # El tramo continúa tras el último minuto escrito del feed (o de la carga histórica), no en start_date
+    start_date = None
+    if feed.last_timestamp is not None:
+        start_date = (TimePeriodHelper.parse_date(str(feed.last_timestamp)) + timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M:%S")
+    config, timestamps, tipo_simulacion = prepare_simulation_data(config_file, timestamp, months_to_add=1, start_date=start_date)
 
-            mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
-            series = process_simulation(simulator, mode_sim, config)
+    if tipo_simulacion not in [0, 1]:
+        raise ValueError(f"Modo de simulación no válido: {tipo_simulacion}")
+
+    mode_sim = "from_scratch" if tipo_simulacion == 1 else "analyze_and_simulate"
+    if mode_sim == "analyze_and_simulate" and decomposer is not None and decomposer.ready:
+        print(f"Usando el modelo incremental de PLC {feed.id_plc} ({decomposer.n_points} puntos aprendidos)")
+        series = simulator.simulate_learned(decomposer, config, config.get("n_points"), rng)
+    else:
+        series = process_simulation(simulator, mode_sim, config, rng)
+    save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, feed.id_plc)
+    return timestamps, series, timestamp, seed, mode_sim
+
+def build_stepper_feed(db_ops, session, config, config_json, id_plc, table_name):
+    """
+    Crea el feed en línea de un PLC y tabla, continuando desde su último checkpoint si existe.
+    """
+    estado = db_ops.get_estado_simulador(session, id_plc, table_name)
+    if estado:
+        try:
+            stepper = OnlineStepper(config, state=json.loads(estado.estado))
+            print(f"Reanudando serie de PLC {id_plc} en {table_name} desde el minuto {stepper.t} ({estado.timestamp}).")
+            return LiveFeed(id_plc, table_name, estado.id_simulacion, None, stepper)
+        except ValueError as e:
+            print(f"No se puede reanudar la serie de PLC {id_plc} en {table_name}: {e}. Se inicia una nueva.")
+
+    seed = new_root_seed()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    id_simulacion = get_next_simulacion_id(session)
+    id_metadata = db_ops.insert(Config(timestamp=timestamp, tipo_simulacion="from_scratch", seed=seed, config=config_json))
+    db_ops.insert_simulacion(session, id_simulacion, [id_metadata], "from_scratch", table_name)
+    db_ops.insert_simulacion_plc(session, id_simulacion, id_plc, id_metadata)
+    print(f"Nueva serie en línea de PLC {id_plc} en {table_name} (semilla {seed}).")
+    return LiveFeed(id_plc, table_name, id_simulacion, None, OnlineStepper(config, plc_generator(seed, id_plc)))
+
+def ensure_table_partitions(db, config_file, months_ahead=2):
+    config = ConfigLoader.load_config(config_file)
+    start_date = config["start_date"]
+    end_date = str(config["end_date"]) if pd.notna(config["end_date"]) else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    # Las cargas usan ON CONFLICT (id_plc, timestamp), que requiere la restricción única que crea
+    # migrations/001: sin ella cada insert fallaría, así que se detiene el arranque en lugar de continuar
+    partitions = PartitionManager(db.engine)
+    try:
+        missing = sorted(set(partitions.tables) - set(partitions.partitioned_tables()))
+        if missing:
+            raise RuntimeError(f"las tablas {missing} no están particionadas")
+        partitions.ensure_partitions(start_date, max(
+            TimePeriodHelper.parse_date(end_date, "23:59:00"),
+            TimePeriodHelper.parse_date(TimePeriodHelper.add_months(start_date, 1))
+        ))
+        partitions.ensure_future_partitions(months_ahead)
+    except Exception as e:
+        logging.error(f"No se pudieron asegurar las particiones: {e}")
+        raise RuntimeError(
+            f"No se pudieron asegurar las particiones ({e}). Ejecute migrations/001_particiones_series.sql antes de cargar datos."
+        ) from e
+    return partitions
+
+def run_live_scheduler(db, config_file, ids_plc, flags, config_json, tables=LIVE_TABLES):
+    try:
+        session = db.Session()
+        db_ops = DatabaseOperations(session)
+        simulator = ProcessSimulator()
+        decomposers = {}
+
+        def refill(feed):
+            decomposer = None
+            if LIVE_LEARNING:
+                decomposer = decomposers.setdefault((feed.id_plc, feed.table_name), IncrementalDecomposer(["Serie_1", "Serie_2"], period=12))
+                decomposer.refresh(db_ops, session, feed.table_name, feed.id_plc)
+            timestamps, series, timestamp, seed, mode_sim = generate_live_series(simulator, config_file, feed, decomposer)
 
             new_config = Config(timestamp=timestamp, tipo_simulacion=mode_sim, seed=seed, config=config_json)
             id_metadata = db_ops.insert(new_config)
 
-            db_ops.insert_simulacion(session, next_id_simulacion, [id_metadata], mode_sim, table_name)
-            db_ops.clean_temp_simulacion(session, next_id_simulacion)
-            save_simulation_results("../Output/", config_file, timestamp, seed, mode_sim, series, id_plc)
-            db_ops.insert_monitoreo_vw_from_dataframe_delay(session, timestamps, series, id_plc, next_id_simulacion)
+            db_ops.insert_simulacion(session, feed.id_simulacion, [id_metadata], mode_sim, feed.table_name)
+            db_ops.insert_simulacion_plc(session, feed.id_simulacion, feed.id_plc, id_metadata)
+            return timestamps, series
 
-            flags[f"add_periodic_records_plc_{id_plc}"] = True
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        config, _, tipo_simulacion = prepare_simulation_data(config_file, timestamp, months_to_add=1, materialize_timestamps=False)
+        if LIVE_STEPPER and tipo_simulacion == 1:
+            feeds = [
+                build_stepper_feed(db_ops, session, config, config_json, id_plc, table_name)
+                for table_name in tables
+                for id_plc in ids_plc
+            ]
+        else:
+            last_timestamps = {table_name: db_ops.get_last_timestamps(session, table_name) for table_name in tables}
+            feeds = [
+                LiveFeed(id_plc, table_name, get_next_simulacion_id(session), refill, last_timestamp=last_timestamps[table_name].get(id_plc))
+                for table_name in tables
+                for id_plc in ids_plc
+            ]
+
+        def on_tick(tick_stats, feeds_ok):
+            for feed in feeds_ok:
+                flags[f"add_periodic_records_plc_{feed.id_plc}"] = True
+            if tick_stats["tick"] % 10 == 0:
+                print(f"Pool de conexiones: {db.pool_metrics()}")
+            if tick_stats["tick"] % 1440 == 0:
+                PartitionManager(db.engine).ensure_future_partitions()
+
+        scheduler = TickScheduler(db.Session, feeds, interval=60, on_tick=on_tick)
+        print(f"Iniciando planificador en vivo con {len(feeds)} feeds.")
+        scheduler.run()
 
     except Exception as e:
-        flags[f"add_periodic_records_plc_{id_plc}"] = False
-        logging.error(f"Error en el hilo de id_plc {id_plc}: {e}")
+        for id_plc in ids_plc:
+            flags[f"add_periodic_records_plc_{id_plc}"] = False
+        logging.error(f"Error en el planificador en vivo: {e}")
         raise
+    finally:
+        db.close_session()
 
-def get_next_simulacion_id(session):
-    with simulacion_lock:
-        try:
-            max_id_simulacion = session.query(func.max(Simulacion.id_simulacion)).scalar()
-            next_id_simulacion = 1 if max_id_simulacion is None else max_id_simulacion + 1
-
-            placeholder_id_metadata = session.query(Config.id_metadata).filter_by(tipo_simulacion="placeholder").scalar()
-
-            if placeholder_id_metadata is None:
-                new_config = Config(
-                    timestamp=datetime.now(),
-                    tipo_simulacion="placeholder",
-                    seed=0,
-                    config="{}"
-                )
-                session.add(new_config)
-                session.commit()
-                placeholder_id_metadata = new_config.id_metadata
-                print(f"Creado id_metadata temporal: {placeholder_id_metadata}")
-
-            new_simulacion = Simulacion(
-                id_simulacion=next_id_simulacion, 
-                tipo_simulacion=None, 
-                id_metadata=placeholder_id_metadata
-            )
-            session.add(new_simulacion)
-            session.commit()
-
-            print(f"Reservado id_simulacion: {next_id_simulacion} con id_metadata {placeholder_id_metadata}")
+def run_async_live_feed(db, config_file, ids_plc, flags, config_json, tables=LIVE_TABLES, pool_size=5):
+    try:
+        session = db.Session()
+        db_ops = DatabaseOperations(session)
+        last_timestamps = {table_name: db_ops.get_last_timestamps(session, table_name) for table_name in tables}
+        feeds = [
+            LiveFeed(id_plc, table_name, get_next_simulacion_id(session), None, last_timestamp=last_timestamps[table_name].get(id_plc))
+            for table_name in tables
+            for id_plc in ids_plc
+        ]
+        # El runtime usa su propio engine asíncrono: la sesión síncrona solo se necesita para preparar los feeds
+        db.close_session()
+
+        def generate(feed):
+            return generate_live_series(ProcessSimulator(), config_file, feed)
+
+        runtime = AsyncLiveRuntime(AsyncLiveRuntime.build_url(db), feeds, generate, config_json, pool_size=pool_size)
+        for id_plc in ids_plc:
+            flags[f"add_periodic_records_plc_{id_plc}"] = True
+        asyncio.run(runtime.run())
 
-            return next_id_simulacion
+    except Exception as e:
+        for id_plc in ids_plc:
+            flags[f"add_periodic_records_plc_{id_plc}"] = False
+        logging.error(f"Error en el runtime asíncrono: {e}")
+        raise
+    finally:
+        db.close_session()
 
-        except SQLAlchemyError as e:
-            session.rollback()
-            print(f"Error al obtener next_id_simulacion: {e}")
-            return None
+def get_next_simulacion_id(session):
+    try:
+        return simulacion_ids.next_id(session)
+    except SQLAlchemyError as e:
+        session.rollback()
+        print(f"Error al obtener next_id_simulacion: {e}")
+        return None
 
 def main():
 
-    db = DatabaseConnection()
+    # Hilos con sesión propia: las cargas históricas (un hilo por tabla, o uno solo en fan_out/incremental)
+    # y el runtime en vivo, que en modo asyncio solo la usa al preparar los feeds
+    n_backfill_threads = 1 if BACKFILL_MODE in ("fan_out", "incremental") else 3
+    db = DatabaseConnection(n_feeds=n_backfill_threads + 1)
     session = db.Session()
     db_ops = DatabaseOperations(session)
     config_file = "../Input/config.csv"
-    df_config = pd.read_csv(config_file)
-    config_dict = df_config.set_index('parameter')['value'].to_dict()
-    config_json = json.dumps(config_dict)
+    config_json = json.dumps(ConfigLoader.load_parameters(config_file))
     ids_plc = db_ops.get_ids_plc(session)
+    ensure_table_partitions(db, config_file)
     flags = {
         'load_historico': False,
         **{f"add_periodic_records_plc_{id_plc}": False for id_plc in ids_plc}
     }
 
     threads = []
-    thread_historico = Thread(target=load_historico, args=(db, config_file, ids_plc, flags, config_json))
-    thread_historico.start()
-    threads.append(thread_historico)
-
-    thread_historico_testing = Thread(target=load_historico_testing, args=(db, config_file, ids_plc, flags, config_json))
-    thread_historico_testing.start()
-    threads.append(thread_historico_testing)
-
-    thread_monitoreo_vw = Thread(target=load_monitoreo_vw, args=(db, config_file, ids_plc, flags, config_json))
-    thread_monitoreo_vw.start()
-    threads.append(thread_monitoreo_vw)
- 
-    for id_plc in ids_plc:
-        thread = Thread(target=add_historico_periodic_record, args=(db, config_file, id_plc, flags, config_json))
-        thread.start()
-        threads.append(thread)
-
-    for id_plc in ids_plc:
-        thread = Thread(target=add_historico_testing_periodic_record, args=(db, config_file, id_plc, flags, config_json))
-        thread.start()
-        threads.append(thread)
-    
-    for id_plc in ids_plc:
-        thread = Thread(target=add_monitoreo_vw_periodic_record, args=(db, config_file, id_plc, flags, config_json))
-        thread.start()
-        threads.append(thread)
+    if BACKFILL_MODE in ("fan_out", "incremental"):
+        if BACKFILL_MODE == "fan_out":
+            loader, loader_kwargs = load_fan_out, {"chunk_rows": CHUNK_ROWS, "n_workers": SIM_WORKERS, "batch_size": SIM_BATCH_PLCS, "stream": SIM_STREAM, "compact": COMPACT_SERIES}
+        else:
+            loader, loader_kwargs = load_incremental, {"chunk_rows": CHUNK_ROWS}
+        thread_backfill = Thread(target=loader, args=(db, config_file, ids_plc, flags, config_json), kwargs=loader_kwargs)
+        thread_backfill.start()
+        threads.append(thread_backfill)
+    else:
+        thread_historico = Thread(target=load_historico, args=(db, config_file, ids_plc, flags, config_json, LOAD_METHODS["historicos"], CHUNK_ROWS))
+        thread_historico.start()
+        threads.append(thread_historico)
+
+        thread_historico_testing = Thread(target=load_historico_testing, args=(db, config_file, ids_plc, flags, config_json, LOAD_METHODS["historicos_testing"], CHUNK_ROWS))
+        thread_historico_testing.start()
+        threads.append(thread_historico_testing)
+
+        thread_monitoreo_vw = Thread(target=load_monitoreo_vw, args=(db, config_file, ids_plc, flags, config_json, LOAD_METHODS["Monitoreo_vw"], CHUNK_ROWS))
+        thread_monitoreo_vw.start()
+        threads.append(thread_monitoreo_vw)
+
+    live_target = run_async_live_feed if LIVE_RUNTIME == "asyncio" else run_live_scheduler
+    thread_live = Thread(target=live_target, args=(db, config_file, ids_plc, flags, config_json))
+    thread_live.start()
+    threads.append(thread_live)
 
     for thread in threads:
         thread.join()
@@ -0,0 +1,110 @@
+-- Particiona por mes (RANGE sobre timestamp) las tablas de series, como declaran los modelos de models.py:
+-- clave primaria compuesta (id, timestamp), restricción única (id_plc, timestamp) e índice BRIN sobre timestamp.
+-- Las tablas existentes se renombran a <tabla>_sin_particion, sus filas se copian a las particiones
+-- mensuales <tabla>_pYYYYMM y después se eliminan. Ejecutar una sola vez, sin cargas en curso:
+--   psql -d <base> -f migrations/001_particiones_series.sql
+-- Nota: id_simulacion no lleva clave foránea porque la clave primaria de simulacion es
+-- (id_simulacion, id_metadata) y PostgreSQL no admite una referencia a una columna no única.
+
+BEGIN;
+
+-- historicos
+ALTER TABLE historicos RENAME TO historicos_sin_particion;
+CREATE SEQUENCE IF NOT EXISTS historicos_id_historico_seq;
+ALTER SEQUENCE historicos_id_historico_seq OWNED BY NONE;
+CREATE TABLE historicos (
+    id_historico INTEGER NOT NULL DEFAULT nextval('historicos_id_historico_seq'),
+    id_plc INTEGER REFERENCES plc (id_plc),
+    timestamp TIMESTAMP NOT NULL,
+    velocidad DOUBLE PRECISION NOT NULL,
+    temperatura DOUBLE PRECISION NOT NULL,
+    id_metadata VARCHAR(20),
+    id_simulacion INTEGER,
+    anomalia BOOLEAN NOT NULL DEFAULT FALSE,
+    CONSTRAINT pk_historicos PRIMARY KEY (id_historico, timestamp),
+    CONSTRAINT uq_historicos_plc_timestamp UNIQUE (id_plc, timestamp)
+) PARTITION BY RANGE (timestamp);
+ALTER SEQUENCE historicos_id_historico_seq OWNED BY historicos.id_historico;
+CREATE INDEX ix_historicos_timestamp_brin ON historicos USING brin (timestamp);
+
+-- historicos_test
+ALTER TABLE historicos_test RENAME TO historicos_test_sin_particion;
+CREATE SEQUENCE IF NOT EXISTS historicos_test_id_historico_seq;
+ALTER SEQUENCE historicos_test_id_historico_seq OWNED BY NONE;
+CREATE TABLE historicos_test (
+    id_historico INTEGER NOT NULL DEFAULT nextval('historicos_test_id_historico_seq'),
+    id_plc INTEGER REFERENCES plc (id_plc),
+    timestamp TIMESTAMP NOT NULL,
+    velocidad DOUBLE PRECISION NOT NULL,
+    temperatura DOUBLE PRECISION NOT NULL,
+    id_metadata VARCHAR(20),
+    id_simulacion INTEGER,
+    anomalia BOOLEAN NOT NULL DEFAULT FALSE,
+    CONSTRAINT pk_historicos_test PRIMARY KEY (id_historico, timestamp),
+    CONSTRAINT uq_historicos_test_plc_timestamp UNIQUE (id_plc, timestamp)
+) PARTITION BY RANGE (timestamp);
+ALTER SEQUENCE historicos_test_id_historico_seq OWNED BY historicos_test.id_historico;
+CREATE INDEX ix_historicos_test_timestamp_brin ON historicos_test USING brin (timestamp);
+
+-- monitoreo_vw
+ALTER TABLE monitoreo_vw RENAME TO monitoreo_vw_sin_particion;
+CREATE SEQUENCE IF NOT EXISTS monitoreo_vw_id_monitoreo_vw_seq;
+ALTER SEQUENCE monitoreo_vw_id_monitoreo_vw_seq OWNED BY NONE;
+CREATE TABLE monitoreo_vw (
+    id_monitoreo_vw INTEGER NOT NULL DEFAULT nextval('monitoreo_vw_id_monitoreo_vw_seq'),
+    id_plc INTEGER REFERENCES plc (id_plc),
+    timestamp TIMESTAMP NOT NULL,
+    velocidad DOUBLE PRECISION NOT NULL,
+    temperatura DOUBLE PRECISION NOT NULL,
+    id_metadata VARCHAR(20),
+    id_simulacion INTEGER,
+    CONSTRAINT pk_monitoreo_vw PRIMARY KEY (id_monitoreo_vw, timestamp),
+    CONSTRAINT uq_monitoreo_vw_plc_timestamp UNIQUE (id_plc, timestamp)
+) PARTITION BY RANGE (timestamp);
+ALTER SEQUENCE monitoreo_vw_id_monitoreo_vw_seq OWNED BY monitoreo_vw.id_monitoreo_vw;
+CREATE INDEX ix_monitoreo_vw_timestamp_brin ON monitoreo_vw USING brin (timestamp);
+
+-- Particiones mensuales que cubren las filas existentes (PartitionManager crea las siguientes)
+DO $$
+DECLARE
+    tabla TEXT;
+    mes DATE;
+    ultimo DATE;
+BEGIN
+    FOREACH tabla IN ARRAY ARRAY['historicos', 'historicos_test', 'monitoreo_vw'] LOOP
+        EXECUTE format('SELECT date_trunc(''month'', MIN(timestamp))::date, date_trunc(''month'', MAX(timestamp))::date FROM %I',
+                       tabla || '_sin_particion')
+            INTO mes, ultimo;
+        WHILE mes IS NOT NULL AND mes <= ultimo LOOP
+            EXECUTE format('CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                           tabla || '_p' || to_char(mes, 'YYYYMM'), tabla, mes, (mes + INTERVAL '1 month')::date);
+            mes := (mes + INTERVAL '1 month')::date;
+        END LOOP;
+    END LOOP;
+END $$;
+
+-- Copia de historicos: los duplicados (id_plc, timestamp) conservan la primera fila
+INSERT INTO historicos (id_historico, id_plc, timestamp, velocidad, temperatura, id_metadata, id_simulacion, anomalia)
+SELECT id_historico, id_plc, timestamp, velocidad, temperatura, id_metadata, id_simulacion, COALESCE(anomalia, FALSE) FROM historicos_sin_particion
+ORDER BY id_historico
+ON CONFLICT DO NOTHING;
+SELECT setval('historicos_id_historico_seq', COALESCE((SELECT MAX(id_historico) FROM historicos), 0) + 1, false);
+DROP TABLE historicos_sin_particion;
+
+-- Copia de historicos_test: los duplicados (id_plc, timestamp) conservan la primera fila
+INSERT INTO historicos_test (id_historico, id_plc, timestamp, velocidad, temperatura, id_metadata, id_simulacion, anomalia)
+SELECT id_historico, id_plc, timestamp, velocidad, temperatura, id_metadata, id_simulacion, COALESCE(anomalia, FALSE) FROM historicos_test_sin_particion
+ORDER BY id_historico
+ON CONFLICT DO NOTHING;
+SELECT setval('historicos_test_id_historico_seq', COALESCE((SELECT MAX(id_historico) FROM historicos_test), 0) + 1, false);
+DROP TABLE historicos_test_sin_particion;
+
+-- Copia de monitoreo_vw: los duplicados (id_plc, timestamp) conservan la primera fila
+INSERT INTO monitoreo_vw (id_monitoreo_vw, id_plc, timestamp, velocidad, temperatura, id_metadata, id_simulacion)
+SELECT id_monitoreo_vw, id_plc, timestamp, velocidad, temperatura, id_metadata, id_simulacion FROM monitoreo_vw_sin_particion
+ORDER BY id_monitoreo_vw
+ON CONFLICT DO NOTHING;
+SELECT setval('monitoreo_vw_id_monitoreo_vw_seq', COALESCE((SELECT MAX(id_monitoreo_vw) FROM monitoreo_vw), 0) + 1, false);
+DROP TABLE monitoreo_vw_sin_particion;
+
+COMMIT;
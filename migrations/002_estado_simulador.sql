@@ -0,0 +1,12 @@
+-- Tabla de checkpoints del generador en línea (models.EstadoSimulador): una fila por PLC y tabla
+-- del feed en vivo, reescrita en cada tick por TickScheduler en la misma transacción que los datos.
+--   psql -d <base> -f migrations/002_estado_simulador.sql
+
+CREATE TABLE IF NOT EXISTS estado_simulador (
+    id_plc INTEGER NOT NULL REFERENCES plc (id_plc),
+    table_name VARCHAR(50) NOT NULL,
+    id_simulacion INTEGER NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    estado TEXT NOT NULL,
+    CONSTRAINT pk_estado_simulador PRIMARY KEY (id_plc, table_name)
+);
@@ -0,0 +1,50 @@
+-- Tabla de relación ejecución -> configuración por PLC (models.SimulacionPLC), que sustituye a la
+-- columna id_metadata de las tablas de series. Los loaders insertan primero la fila de simulacion,
+-- después la de simulacion_plc y por último las filas de datos.
+--   psql -d <base> -f migrations/003_simulacion_plc.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS simulacion_plc (
+    id_simulacion INTEGER NOT NULL,
+    id_plc INTEGER NOT NULL REFERENCES plc (id_plc),
+    id_metadata INTEGER NOT NULL REFERENCES config (id_metadata),
+    CONSTRAINT pk_simulacion_plc PRIMARY KEY (id_simulacion, id_plc, id_metadata)
+);
+
+-- Relaciones de las cargas anteriores, tomadas de la columna obsoleta id_metadata. Las cargas
+-- anteriores guardaban en las filas del PLC N la lista acumulada "id_1,...,id_N" de la ejecución:
+-- la configuración propia del PLC es el último elemento de la lista
+INSERT INTO simulacion_plc (id_simulacion, id_plc, id_metadata)
+SELECT DISTINCT s.id_simulacion, s.id_plc, c.id_metadata
+FROM (
+    SELECT DISTINCT id_simulacion, id_plc, string_to_array(id_metadata, ',') AS ids FROM historicos
+    UNION
+    SELECT DISTINCT id_simulacion, id_plc, string_to_array(id_metadata, ',') AS ids FROM historicos_test
+    UNION
+    SELECT DISTINCT id_simulacion, id_plc, string_to_array(id_metadata, ',') AS ids FROM monitoreo_vw
+) s
+JOIN config c ON c.id_metadata = trim(s.ids[array_upper(s.ids, 1)])::int
+WHERE s.id_simulacion IS NOT NULL AND s.id_plc IS NOT NULL AND array_upper(s.ids, 1) IS NOT NULL
+ON CONFLICT DO NOTHING;
+
+-- Comprobación: toda fila de simulacion anterior (salvo las reservas 'placeholder' del antiguo
+-- asignador de ids) debe tener su relación en simulacion_plc; si no, se deshace la migración
+DO $$
+DECLARE
+    sin_relacion INTEGER;
+BEGIN
+    SELECT COUNT(*) INTO sin_relacion
+    FROM simulacion sim
+    JOIN config c ON c.id_metadata = sim.id_metadata
+    WHERE c.tipo_simulacion IS DISTINCT FROM 'placeholder'
+      AND NOT EXISTS (
+          SELECT 1 FROM simulacion_plc sp
+          WHERE sp.id_simulacion = sim.id_simulacion AND sp.id_metadata = sim.id_metadata
+      );
+    IF sin_relacion > 0 THEN
+        RAISE EXCEPTION 'Hay % filas de simulacion sin relación en simulacion_plc; revise la columna id_metadata de las tablas de series.', sin_relacion;
+    END IF;
+END $$;
+
+COMMIT;
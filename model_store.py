@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+from threading import Lock
+import pandas as pd
+
+# Directorio de los modelos ajustados por analyze_and_simulate
+MODEL_STORE_DIR = "../Models"
+
+# Versión del formato y del ajuste de los modelos: incrementarla al cambiar build_models o
+# ResidualFitter para que los modelos guardados con la versión anterior no se reutilicen
+MODEL_VERSION = 1
+
+
+class ModelStore:
+    def __init__(self, directory=MODEL_STORE_DIR):
+        """
+        Almacén de modelos ajustados (tendencia, perfil estacional y distribución de residuos) en
+        archivos JSON, con una copia en memoria por proceso. Los modelos se indexan por el hash de
+        las series de entrada y el periodo, así que solo se ajustan una vez por entrada.
+        :param directory: Directorio de los archivos JSON (se crea al guardar el primer modelo).
+        """
+        self.directory = directory
+        self._models = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def model_key(time_series, period):
+        """
+        Clave del modelo: versión, sha1 del contenido y las columnas de las series de entrada y periodo.
+        """
+        data = pd.DataFrame(time_series)
+        digest = hashlib.sha1()
+        digest.update(json.dumps([str(column) for column in data.columns]).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        return f"v{MODEL_VERSION}_{digest.hexdigest()}_p{period}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"model_{key}.json")
+
+    def load(self, key):
+        """
+        Modelo guardado para la clave, o None si todavía no se ha ajustado.
+        """
+        with self._lock:
+            model = self._models.get(key)
+        if model is not None:
+            return model
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                model = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Advertencia: No se pudo leer el modelo {path}: {e}")
+            return None
+        with self._lock:
+            self._models[key] = model
+        return model
+
+    def save(self, key, model):
+        """
+        Guarda el modelo de forma atómica (archivo temporal y os.replace), de modo que procesos
+        concurrentes nunca lean un archivo a medio escribir.
+        """
+        with self._lock:
+            self._models[key] = model
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(model, f)
+            os.replace(tmp_path, path)
+            print(f"Modelo ajustado guardado en: {path}")
+        except OSError as e:
+            print(f"Advertencia: No se pudo guardar el modelo {key}: {e}")
+
+
+# Almacén compartido por los simuladores de un proceso
+default_store = ModelStore()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, TIMESTAMP, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import validates, relationship
 
@@ -43,17 +43,21 @@ class PLC(Base):
 # Modelo: Historicos
 class Historicos(Base):
     __tablename__ = "historicos"
-    id_historico = Column(Integer, primary_key=True)
+    __table_args__ = (
+        UniqueConstraint("id_plc", "timestamp", name="uq_historicos_plc_timestamp"),
+        Index("ix_historicos_timestamp_brin", "timestamp", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    id_historico = Column(Integer, primary_key=True, autoincrement=True)
     id_plc = Column(Integer, ForeignKey("plc.id_plc"), nullable=True)
-    timestamp = Column(TIMESTAMP, nullable=False)
+    timestamp = Column(TIMESTAMP, primary_key=True, nullable=False)  # Clave de partición mensual
     velocidad = Column(Float, nullable=False)
     temperatura = Column(Float, nullable=False)
-    id_metadata = Column(String(20), nullable=True)
-    id_simulacion = Column(Integer, ForeignKey("simulacion.id_simulacion"), nullable=True)
+    id_metadata = Column(String(20), nullable=True)  # Obsoleto: la relación con Config está en simulacion_plc
+    id_simulacion = Column(Integer, nullable=True)  # Sin clave foránea: la clave primaria de simulacion es compuesta (ver migrations/001)
     anomalia = Column(Boolean, nullable=False, default=False)
 
     plc = relationship("PLC")
-    simulacion = relationship("Simulacion")
 
     @validates("timestamp")
     def validate_timestamp(self, key, value):
@@ -82,17 +86,21 @@ class Historicos(Base):
 # Modelo: Historicos_Testing
 class HistoricosTesting(Base):
     __tablename__ = "historicos_test"
-    id_historico = Column(Integer, primary_key=True)
+    __table_args__ = (
+        UniqueConstraint("id_plc", "timestamp", name="uq_historicos_test_plc_timestamp"),
+        Index("ix_historicos_test_timestamp_brin", "timestamp", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    id_historico = Column(Integer, primary_key=True, autoincrement=True)
     id_plc = Column(Integer, ForeignKey("plc.id_plc"), nullable=True)
-    timestamp = Column(TIMESTAMP, nullable=False)
+    timestamp = Column(TIMESTAMP, primary_key=True, nullable=False)  # Clave de partición mensual
     velocidad = Column(Float, nullable=False)
     temperatura = Column(Float, nullable=False)
-    id_metadata = Column(String(20), nullable=True)
-    id_simulacion = Column(Integer, ForeignKey("simulacion.id_simulacion"), nullable=True)
+    id_metadata = Column(String(20), nullable=True)  # Obsoleto: la relación con Config está en simulacion_plc
+    id_simulacion = Column(Integer, nullable=True)  # Sin clave foránea: la clave primaria de simulacion es compuesta (ver migrations/001)
     anomalia = Column(Boolean, nullable=False, default=False)
 
     plc = relationship("PLC")
-    simulacion = relationship("Simulacion")
 
     @validates("timestamp")
     def validate_timestamp(self, key, value):
@@ -121,16 +129,20 @@ class HistoricosTesting(Base):
 # Modelo: Monitoreo_VW
 class MonitoreoVW(Base):
     __tablename__ = "monitoreo_vw"
-    id_monitoreo_vw = Column(Integer, primary_key=True)
+    __table_args__ = (
+        UniqueConstraint("id_plc", "timestamp", name="uq_monitoreo_vw_plc_timestamp"),
+        Index("ix_monitoreo_vw_timestamp_brin", "timestamp", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    id_monitoreo_vw = Column(Integer, primary_key=True, autoincrement=True)
     id_plc = Column(Integer, ForeignKey("plc.id_plc"), nullable=True)
-    timestamp = Column(TIMESTAMP, nullable=False)
+    timestamp = Column(TIMESTAMP, primary_key=True, nullable=False)  # Clave de partición mensual
     velocidad = Column(Float, nullable=False)
     temperatura = Column(Float, nullable=False)
-    id_metadata = Column(String(20), nullable=True)
-    id_simulacion = Column(Integer, ForeignKey("simulacion.id_simulacion"), nullable=True)
+    id_metadata = Column(String(20), nullable=True)  # Obsoleto: la relación con Config está en simulacion_plc
+    id_simulacion = Column(Integer, nullable=True)  # Sin clave foránea: la clave primaria de simulacion es compuesta (ver migrations/001)
 
     plc = relationship("PLC")
-    simulacion = relationship("Simulacion")
 
     @validates("timestamp")
     def validate_timestamp(self, key, value):
@@ -171,3 +183,36 @@ class Simulacion(Base):
         if value and len(value) > 255:
             raise ValueError("El campo 'tipo_simulacion' debe tener menos de 255 caracteres.")
         return value
+
+# Modelo: Simulacion_PLC (relación ejecución -> configuración por PLC)
+class SimulacionPLC(Base):
+    __tablename__ = "simulacion_plc"
+    id_simulacion = Column(Integer, primary_key=True)
+    id_plc = Column(Integer, ForeignKey("plc.id_plc"), primary_key=True)
+    id_metadata = Column(Integer, ForeignKey("config.id_metadata"), primary_key=True)
+
+    plc = relationship("PLC")
+    config = relationship("Config")
+
+    @validates("id_metadata")
+    def validate_id_metadata(self, key, value):
+        if not value:
+            raise ValueError("El campo 'id_metadata' es obligatorio.")
+        return value
+
+# Modelo: EstadoSimulador (checkpoint del generador en línea por PLC y tabla del feed en vivo)
+class EstadoSimulador(Base):
+    __tablename__ = "estado_simulador"
+    id_plc = Column(Integer, ForeignKey("plc.id_plc"), primary_key=True)
+    table_name = Column(String(50), primary_key=True)
+    id_simulacion = Column(Integer, nullable=False)
+    timestamp = Column(TIMESTAMP, nullable=False)
+    estado = Column(Text, nullable=False)
+
+    plc = relationship("PLC")
+
+    @validates("estado")
+    def validate_estado(self, key, value):
+        if not value:
+            raise ValueError("El campo 'estado' no puede estar vacío.")
+        return value
@@ -0,0 +1,117 @@
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+from sqlalchemy.sql import text
+from time_period_helper import TimePeriodHelper
+
+PARTITIONED_TABLES = ["historicos", "historicos_test", "monitoreo_vw"]
+
+class PartitionManager:
+    def __init__(self, engine, tables=PARTITIONED_TABLES):
+        """
+        Administra las particiones mensuales por rango de 'timestamp' de las tablas de series.
+        Las tablas padre se particionan con migrations/001_particiones_series.sql y los índices
+        (id_plc, timestamp) y BRIN se propagan a cada partición. Las tablas que todavía no están
+        particionadas se omiten con un aviso.
+        :param engine: Engine de SQLAlchemy.
+        :param tables: Nombres de las tablas padre particionadas.
+        """
+        self.engine = engine
+        self.tables = tables
+
+    @staticmethod
+    def month_start(date):
+        return datetime(date.year, date.month, 1)
+
+    @staticmethod
+    def partition_name(table_name, month_start):
+        return f"{table_name}_p{month_start:%Y%m}"
+
+    def partitioned_tables(self):
+        """
+        Tablas de ``self.tables`` que están particionadas en el esquema actual (pg_partitioned_table).
+        """
+        with self.engine.connect() as conn:
+            partitioned = set(conn.execute(text(
+                "SELECT c.relname FROM pg_partitioned_table pt "
+                "JOIN pg_class c ON c.oid = pt.partrelid "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = current_schema()"
+            )).scalars().all())
+
+        missing = [table_name for table_name in self.tables if table_name not in partitioned]
+        if missing:
+            print(f"Advertencia: Las tablas {missing} no están particionadas; no se crean sus particiones. "
+                  f"Aplique migrations/001_particiones_series.sql.")
+        return [table_name for table_name in self.tables if table_name in partitioned]
+
+    def ensure_partitions(self, start_date, end_date):
+        """
+        Crea (si no existen) las particiones mensuales que cubren [start_date, end_date].
+        :param start_date: Fecha inicial (str o datetime).
+        :param end_date: Fecha final (str o datetime).
+        """
+        start = TimePeriodHelper.parse_date(start_date) if isinstance(start_date, str) else start_date
+        end = TimePeriodHelper.parse_date(end_date, "23:59:00") if isinstance(end_date, str) else end_date
+        tables = self.partitioned_tables()
+        if not tables:
+            return
+
+        with self.engine.begin() as conn:
+            month = self.month_start(start)
+            while month <= end:
+                next_month = month + relativedelta(months=1)
+                for table_name in tables:
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {self.partition_name(table_name, month)} "
+                        f"PARTITION OF {table_name} "
+                        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+                    ))
+                month = next_month
+        print(f"Particiones de {tables} aseguradas desde {self.month_start(start):%Y-%m} hasta {self.month_start(end):%Y-%m}.")
+
+    def ensure_future_partitions(self, months_ahead=2):
+        """
+        Pre-crea las particiones del mes actual y de los ``months_ahead`` meses siguientes,
+        para que el feed en vivo nunca escriba fuera de rango.
+        """
+        now = datetime.now()
+        self.ensure_partitions(now, self.month_start(now) + relativedelta(months=months_ahead))
+
+    def list_partitions(self, table_name):
+        """
+        :return: Lista ordenada de tuplas (nombre_partición, inicio_de_mes).
+        """
+        with self.engine.connect() as conn:
+            names = conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table_name"
+            ), {"table_name": table_name}).scalars().all()
+
+        partitions = []
+        prefix = f"{table_name}_p"
+        for name in names:
+            if name.startswith(prefix):
+                try:
+                    partitions.append((name, datetime.strptime(name[len(prefix):], "%Y%m")))
+                except ValueError:
+                    continue
+        return sorted(partitions, key=lambda item: item[1])
+
+    def drop_partitions_before(self, before_date):
+        """
+        Retención: elimina las particiones cuyo mes termina antes de ``before_date``.
+        Borrar un mes antiguo pasa a ser un DROP TABLE en lugar de un DELETE masivo.
+        :return: Lista de particiones eliminadas.
+        """
+        before = TimePeriodHelper.parse_date(before_date) if isinstance(before_date, str) else before_date
+        dropped = []
+        for table_name in self.tables:
+            for name, month in self.list_partitions(table_name):
+                if month + relativedelta(months=1) <= before:
+                    with self.engine.begin() as conn:
+                        conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                    dropped.append(name)
+        print(f"Particiones eliminadas: {dropped}")
+        return dropped
@@ -1,14 +1,81 @@
+import multiprocessing
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
 from time_series_from_scratch import TimeSeriesSimulator
 from time_series_analyzer import TimeSeriesAnalyzer
 from anomaly_injector import AnomalyInjector  # Asegúrate de importar la clase que gestiona anomalías
+from model_store import ModelStore, default_store
+from random_streams import plc_generator
+from compact_series import CompactSeries
+
+# Parámetros comunes a todos los trabajos de un pool, fijados una vez por proceso en el initializer
+_worker_params = None
+
+def _init_worker(params):
+    global _worker_params
+    _worker_params = params
+
+def _job_batches(jobs, batch_size):
+    """
+    Agrupa trabajos consecutivos en lotes de hasta ``batch_size``; cada trabajo conserva su propio
+    generador, así que un lote puede mezclar semillas.
+    """
+    jobs = iter(jobs)
+    while True:
+        batch = list(islice(jobs, batch_size))
+        if not batch:
+            break
+        yield batch
+
+def _run_batch(simulator, batch, params):
+    """
+    Simula un lote de trabajos (seed, id_plc). En modo from_scratch el lote se genera como un único
+    tensor con el generador propio de cada PLC, plc_generator(seed, id_plc), así que la serie de un PLC
+    no depende de con qué otros PLC comparte lote; en otro caso, trabajo a trabajo.
+    :return: Lista de (job, dict columna -> ndarray), o de (job, CompactSeries) en modo compacto.
+    """
+    mode, config, time_series, period, steps, compact = params
+    if mode == "from_scratch" and len(batch) > 1:
+        values, mask = simulator.simulate_batch(config, [plc_generator(*job) for job in batch])
+        results = []
+        for k, job in enumerate(batch):
+            if compact:
+                results.append((job, CompactSeries.from_arrays(config["start_date"], values[k], mask[k] if mask is not None else None)))
+                continue
+            columns = {f"Serie_{i+1}": values[k, :, i] for i in range(values.shape[2])}
+            if mask is not None:
+                columns["Anomaly"] = mask[k]
+            results.append((job, columns))
+        return results
+
+    results = []
+    for job in batch:
+        series = simulator.simulate(mode, config, time_series, period, steps, plc_generator(*job))
+        if compact:
+            results.append((job, CompactSeries.from_frame(config["start_date"], series)))
+        else:
+            results.append((job, {column: series[column].to_numpy() for column in series.columns}))
+    return results
+
+def _simulate_job(batch):
+    """
+    Ejecuta un lote de simulaciones en un proceso del pool.
+    :param batch: Lista de tuplas (seed, id_plc).
+    :return: Lista de resultados de _run_batch, que se serializan como arrays NumPy y no como DataFrame.
+    """
+    return _run_batch(ProcessSimulator(), batch, _worker_params)
 
 class ProcessSimulator:
-    def __init__(self):
+    def __init__(self, model_store=None):
         """
         Inicializa el simulador con las clases generadoras y analíticas.
+        :param model_store: ModelStore de los modelos ajustados (por defecto el compartido del proceso).
         """
         self.generator = None
         self.analyzer = None
+        self.model_store = model_store if model_store is not None else default_store
 
     def validate_config(self, config, mode):
         """
@@ -20,15 +87,16 @@ class ProcessSimulator:
             if missing_keys:
                 raise ValueError(f"Faltan las siguientes claves en la configuración: {missing_keys}")
 
-    def simulate_from_scratch(self, config):
+    def simulate_from_scratch(self, config, rng=None):
         """
         Genera datos sintéticos desde cero con los parámetros definidos en la configuración.
         
         :param config: Diccionario con los parámetros para generar las series.
+        :param rng: numpy.random.Generator de esta simulación.
         :return: DataFrame con las series generadas.
         """
         # Crear instancia del generador
-        self.generator = TimeSeriesSimulator(config)
+        self.generator = TimeSeriesSimulator(config, rng)
         
         # Generar series ARMA
         series = self.generator.generate_arma_series()
@@ -43,54 +111,103 @@ class ProcessSimulator:
         
         return series
 
-    def analyze_and_simulate(self, time_series, period=12, steps=500):
+    def analyze_and_simulate(self, time_series, period=12, steps=500, rng=None):
         """
         Analiza series de tiempo existentes y genera datos simulados basados en las características detectadas.
+        El modelo ajustado se guarda en el ModelStore, indexado por el hash de las series y el periodo;
+        las simulaciones siguientes con la misma entrada lo cargan y solo ejecutan simulate_forward.
         
         :param time_series: DataFrame con las series de tiempo originales.
         :param period: Periodo estacional para la descomposición.
         :param steps: Número de pasos hacia adelante a simular.
+        :param rng: numpy.random.Generator de esta simulación.
         :return: DataFrame con las series extendidas simuladas.
         """
-        # Crear instancia del analizador
-        self.analyzer = TimeSeriesAnalyzer(time_series, period)
-        
-        # Descomponer las series
-        self.analyzer.decompose()
-        
-        # Ajustar distribuciones a los residuos
-        self.analyzer.fit_residual_distributions()
+        self.analyzer = self.load_analyzer(time_series, period)
         
         # Generar extensión hacia adelante
-        extended_series = self.analyzer.simulate_forward(steps)
+        extended_series = self.analyzer.simulate_forward(steps, rng)
         
         return extended_series
 
-    def apply_anomalies(self, series, anomalies):
+    def load_analyzer(self, time_series, period=12):
+        """
+        Analizador con el modelo ajustado de las series, desde el ModelStore o ajustándolo si no existe.
+        """
+        key = ModelStore.model_key(time_series, period)
+        model = self.model_store.load(key)
+        if model is None:
+            # Crear instancia del analizador
+            analyzer = TimeSeriesAnalyzer(time_series, period)
+
+            # Descomponer las series
+            analyzer.decompose()
+
+            # Ajustar distribuciones a los residuos
+            analyzer.fit_residual_distributions()
+
+            model = analyzer.to_model()
+            self.model_store.save(key, model)
+        return TimeSeriesAnalyzer.from_model(model)
+
+    def simulate_learned(self, decomposer, config, steps, rng=None):
+        """
+        Simula hacia adelante con el modelo actual de un IncrementalDecomposer (aprendido de la base
+        de datos) y aplica las anomalías de la configuración, sin reajustar el histórico.
+        :param decomposer: IncrementalDecomposer con decomposer.ready.
+        :param steps: Número de pasos hacia adelante a simular.
+        :param rng: numpy.random.Generator de esta simulación.
+        :return: DataFrame con las series simuladas.
+        """
+        self.analyzer = decomposer.analyzer()
+        series = self.analyzer.simulate_forward(steps, rng)
+
+        anomalies_config = config.get("anomalies", {})
+        if not isinstance(anomalies_config, dict):
+            print("Advertencia: No se proporcionaron anomalías válidas en la configuración.")
+            anomalies_config = {}
+        return self.apply_anomalies(series, anomalies_config, rng)
+
+    def simulate_ensemble(self, time_series, n_paths, period=12, steps=500, rng=None, dtype=np.float64):
+        """
+        Escenarios Monte Carlo de las series analizadas para pruebas de estrés de los detectores.
+        :param time_series: DataFrame con las series de tiempo originales.
+        :param n_paths: Número de escenarios.
+        :param rng: numpy.random.Generator raíz; cada escenario usa uno de sus generadores derivados con spawn.
+        :param dtype: Tipo del resultado (np.float32 para reducir la memoria).
+        :return: Array (n_paths, steps, n_series); sin anomalías inyectadas.
+        """
+        self.analyzer = self.load_analyzer(time_series, period)
+        return self.analyzer.simulate_ensemble(n_paths, steps, rng, dtype)
+
+    def apply_anomalies(self, series, anomalies, rng=None):
         """
         Aplica anomalías automáticamente según la configuración.
         
         :param series: DataFrame con las series generadas o analizadas.
         :param anomalies: Diccionario con la configuración de anomalías.
+        :param rng: numpy.random.Generator de esta simulación.
         :return: DataFrame con las series con anomalías aplicadas.
         """
         if anomalies:
-            injector = AnomalyInjector(anomalies)
+            injector = AnomalyInjector(anomalies, rng)
             series = injector.inject_anomalies(series)
         return series
 
-    def simulate(self, mode, config=None, time_series=None, period=12, steps=500):
+    def simulate(self, mode, config=None, time_series=None, period=12, steps=500, rng=None):
         """
         Punto de entrada principal para la simulación.
+        :param rng: numpy.random.Generator compartido por ruido, residuos y anomalías; cada hilo o PLC
+                    debe recibir el suyo para que las simulaciones sean reproducibles e independientes.
         """
         if mode == "from_scratch":
             if not config:
                 raise ValueError("Se requiere un diccionario de configuración para generar datos desde cero.")
-            series = self.simulate_from_scratch(config)
+            series = self.simulate_from_scratch(config, rng)
         elif mode == "analyze_and_simulate":
             if time_series is None:
                 raise ValueError("Se requiere un DataFrame con series de tiempo para analizar y simular.")
-            series = self.analyze_and_simulate(time_series, period, steps)
+            series = self.analyze_and_simulate(time_series, period, steps, rng)
         else:
             raise ValueError("Modo inválido. Usa 'from_scratch' o 'analyze_and_simulate'.")
 
@@ -100,6 +217,100 @@ class ProcessSimulator:
             print("Advertencia: No se proporcionaron anomalías válidas en la configuración.")
             anomalies_config = {}
 
-        series = self.apply_anomalies(series, anomalies_config)
+        series = self.apply_anomalies(series, anomalies_config, rng)
         return series
 
+    def simulate_batch(self, config, rngs):
+        """
+        Genera las series de varios PLC que comparten configuración en una sola pasada vectorizada:
+        innovaciones y outliers sorteados con el generador de cada PLC, y filtrado, tendencia y
+        estacionalidad por broadcasting.
+        :param config: Diccionario con los parámetros para generar las series.
+        :param rngs: Lista con un numpy.random.Generator por PLC.
+        :return: Tupla (array (n_plc, n_points, n_series), máscara de anomalías (n_plc, n_points) o None).
+        """
+        self.generator = TimeSeriesSimulator(config, rngs[0])
+        batch = self.generator.generate_arma_batch(rngs)
+
+        if "trend_slopes" in config:
+            batch = self.generator.add_trend_batch(config["trend_slopes"])
+
+        if "seasonality_periods" in config and "seasonality_amplitudes" in config:
+            batch = self.generator.add_seasonality_batch(config["seasonality_periods"], config["seasonality_amplitudes"])
+
+        anomalies_config = config.get("anomalies", {})
+        if not isinstance(anomalies_config, dict):
+            print("Advertencia: No se proporcionaron anomalías válidas en la configuración.")
+            anomalies_config = {}
+
+        mask = AnomalyInjector(anomalies_config).inject_anomalies_batch(batch, rngs) if anomalies_config else None
+        return batch, mask
+
+    def simulate_stream(self, config, chunk_minutes, rng=None, anomaly_rng=None):
+        """
+        Simulación desde cero por bloques de ``chunk_minutes`` filas, con memoria constante para
+        rangos arbitrariamente largos (ver TimeSeriesSimulator.generate_stream). El plan de outliers
+        se sortea antes del primer bloque con su propio generador, así que el resultado no depende
+        de ``chunk_minutes`` (salvo redondeo del filtrado por bloques).
+        :param config: Diccionario con los parámetros para generar las series.
+        :param chunk_minutes: Filas por bloque.
+        :param rng: numpy.random.Generator de las series.
+        :param anomaly_rng: numpy.random.Generator del plan de outliers, p. ej.
+                            plc_generator(seed, id_plc, ANOMALY_STREAM); por defecto se deriva de ``rng`` con spawn.
+        :return: Generador de DataFrames consecutivos.
+        """
+        self.generator = TimeSeriesSimulator(config, rng)
+
+        anomalies_config = config.get("anomalies", {})
+        if not isinstance(anomalies_config, dict):
+            print("Advertencia: No se proporcionaron anomalías válidas en la configuración.")
+            anomalies_config = {}
+        injector = None
+        if anomalies_config:
+            injector = AnomalyInjector(anomalies_config, anomaly_rng if anomaly_rng is not None else self.generator.rng.spawn(1)[0])
+            injector.plan_outliers(self.generator.n_points)
+        scales = config.get("stds", [1] * self.generator.n_series)
+
+        offset = 0
+        for chunk in self.generator.generate_stream(chunk_minutes):
+            if injector:
+                injector.inject_anomalies_stream(chunk, offset, self.generator.n_points, scales)
+            offset += len(chunk)
+            yield chunk
+
+    def simulate_many(self, mode, jobs, config=None, time_series=None, period=12, steps=500, n_workers=1, batch_size=1, compact=False):
+        """
+        Ejecuta varias simulaciones (p. ej. una por PLC) en un pool de procesos, evitando el GIL.
+        Los resultados se entregan a medida que terminan, para que la etapa de escritura avance
+        mientras otros procesos siguen simulando; como máximo hay 2 * n_workers lotes en vuelo.
+        :param mode: Modo de simulación ('from_scratch' o 'analyze_and_simulate').
+        :param jobs: Iterable de tuplas (seed, id_plc).
+        :param n_workers: Número de procesos; con 1 se simula en el proceso actual.
+        :param batch_size: Trabajos consecutivos simulados juntos con simulate_batch (solo from_scratch).
+        :param compact: Devuelve CompactSeries (float32, minutos epoch, anomalías en bits) en lugar de DataFrames;
+                        requiere config['start_date'].
+        :return: Generador de ((seed, id_plc), DataFrame o CompactSeries) en orden de finalización.
+        """
+        params = (mode, config, time_series, period, steps, compact)
+        batches = _job_batches(jobs, batch_size)
+        if n_workers <= 1:
+            for batch in batches:
+                for job, result in _run_batch(self, batch, params):
+                    yield job, result if compact else pd.DataFrame(result)
+            return
+
+        # 'spawn' evita heredar por fork el estado de hilos y conexiones del proceso principal
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=context, initializer=_init_worker, initargs=(params,)) as executor:
+            pending = set()
+            while True:
+                for batch in batches:
+                    pending.add(executor.submit(_simulate_job, batch))
+                    if len(pending) >= 2 * n_workers:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for job, result in future.result():
+                        yield job, result if compact else pd.DataFrame(result)
@@ -0,0 +1,31 @@
+import secrets
+import numpy as np
+
+# Sub-flujo del plan de anomalías de las simulaciones por bloques: plc_generator(seed, id_plc, ANOMALY_STREAM)
+ANOMALY_STREAM = 1
+
+
+def new_root_seed():
+    """
+    Genera una semilla raíz de 31 bits (cabe en Config.seed) para una ejecución.
+    """
+    return secrets.randbits(31)
+
+
+def plc_generator(root_seed, id_plc, *stream):
+    """
+    Generador independiente para un PLC, derivado de la SeedSequence raíz con spawn_key.
+    Con la semilla guardada en Config y el id_plc la simulación se reproduce exactamente.
+    :param root_seed: Semilla raíz registrada en Config.seed.
+    :param id_plc: Identificador del PLC.
+    :param stream: Claves adicionales opcionales para sub-flujos (p. ej. índice de tabla).
+    :return: numpy.random.Generator.
+    """
+    return np.random.default_rng(np.random.SeedSequence(root_seed, spawn_key=(id_plc, *stream)))
+
+
+def derived_seed(root_seed, *key):
+    """
+    Semilla raíz derivada y reproducible de 31 bits, p. ej. una por tabla dentro de una ejecución.
+    """
+    return int(np.random.SeedSequence(root_seed, spawn_key=key).generate_state(1)[0] & 0x7FFFFFFF)
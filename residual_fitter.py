@@ -0,0 +1,127 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from scipy.optimize import brentq, minimize_scalar
+from scipy.stats import norm, lognorm, expon, uniform
+
+# Familias soportadas por TimeSeriesAnalyzer.simulate_forward
+DISTRIBUTIONS = {"norm": norm, "lognorm": lognorm, "expon": expon, "uniform": uniform}
+
+
+class ResidualFitter:
+    """
+    Ajuste de residuos por máxima verosimilitud para norm, lognorm, expon y uniform, con el mismo
+    criterio que Fitter: histograma de densidad de 100 intervalos y menor suma de errores al cuadrado
+    (SSE) entre la densidad ajustada y el histograma.
+    """
+
+    @staticmethod
+    def fit_norm(data):
+        return {"loc": float(np.mean(data)), "scale": float(np.std(data))}
+
+    @staticmethod
+    def fit_expon(data):
+        data_min = float(np.min(data))
+        return {"loc": data_min, "scale": float(np.mean(data)) - data_min}
+
+    @staticmethod
+    def fit_uniform(data):
+        data_min = float(np.min(data))
+        return {"loc": data_min, "scale": float(np.max(data)) - data_min}
+
+    @staticmethod
+    def fit_lognorm(data):
+        """
+        Lognormal de tres parámetros: para cada loc, forma y escala tienen expresión cerrada, así que
+        la verosimilitud se reduce a una función de loc. loc se obtiene anulando su derivada
+        (Cohen y Whitten, 1980, como scipy.stats.lognorm.fit) y, si no hay máximo interior (residuos
+        casi simétricos), con una minimización acotada en una dimensión.
+        """
+        data_min = float(np.min(data))
+        if np.ptp(data) == 0:
+            # Datos constantes: no hay forma que ajustar; escala 0 hace que fit_best la descarte (SSE infinito)
+            return {"s": 0.0, "loc": data_min, "scale": 0.0}
+        spacing = abs(np.spacing(data_min))
+        max_offset = 1e3 * float(np.ptp(data))
+
+        def profile(loc):
+            shifted = data - loc
+            log_shifted = np.log(shifted)
+            mu = log_shifted.mean()
+            return shifted, log_shifted, mu, np.sqrt(np.mean((log_shifted - mu) ** 2))
+
+        def neg_loglik(loc):
+            # -log L / n salvo constantes: log(forma) + media de log(x - loc)
+            _, _, mu, shape = profile(loc)
+            return np.log(shape) + mu
+
+        def dl_dloc(loc):
+            shifted, log_shifted, mu, shape = profile(loc)
+            return np.sum((1 + (log_shifted - mu) / shape ** 2) / shifted)
+
+        # Extremo derecho: el más cercano al mínimo con pendiente negativa; extremo izquierdo: cambio de signo
+        right, delta, slope = data_min - spacing, 2 * spacing, dl_dloc(data_min - spacing)
+        while np.isfinite(slope) and slope >= -1e-6 and delta <= max_offset:
+            right, delta = data_min - delta, delta * 2
+            slope = dl_dloc(right)
+        left, slope_left = right - 1, None
+        if np.isfinite(slope) and slope < -1e-6:
+            delta = 2 * (right - left)
+            slope_left = dl_dloc(left)
+            while np.isfinite(slope_left) and slope_left < 0 and delta <= 2 * max_offset:
+                left, delta = right - delta, delta * 2
+                slope_left = dl_dloc(left)
+
+        edge = data_min - spacing
+        if slope_left is not None and np.isfinite(slope_left) and slope_left > 0:
+            loc = brentq(dl_dloc, left, right)
+        else:
+            loc = minimize_scalar(neg_loglik, bounds=(data_min - max_offset, edge), method="bounded").x
+        loc = loc if neg_loglik(loc) < neg_loglik(edge) else edge
+        _, _, mu, shape = profile(loc)
+        return {"s": float(shape), "loc": float(loc), "scale": float(np.exp(mu))}
+
+    @staticmethod
+    def sum_square_error(name, params, centers, density):
+        """
+        SSE entre la densidad ajustada en los centros del histograma y la densidad observada.
+        """
+        if params["scale"] <= 0 or params.get("s", 1) <= 0:
+            return np.inf
+        fitted = DISTRIBUTIONS[name].pdf(centers, **params)
+        sse = float(np.sum((fitted - density) ** 2))
+        return sse if np.isfinite(sse) else np.inf
+
+    @staticmethod
+    def fit_best(data, bins=100, distributions=tuple(DISTRIBUTIONS)):
+        """
+        Ajusta las distribuciones a una serie de residuos y devuelve la de menor SSE.
+        :param data: Residuos (array o Series).
+        :param bins: Intervalos del histograma compartido por todas las distribuciones.
+        :return: Diccionario {nombre: parámetros}, en el formato de Fitter.get_best().
+        """
+        data = np.asarray(data, dtype=float)
+        density, edges = np.histogram(data, bins=bins, density=True)
+        centers = (edges[:-1] + edges[1:]) / 2
+
+        best_name, best_params, best_error = None, None, np.inf
+        for name in distributions:
+            params = getattr(ResidualFitter, f"fit_{name}")(data)
+            error = ResidualFitter.sum_square_error(name, params, centers, density)
+            if best_name is None or error < best_error:
+                best_name, best_params, best_error = name, params, error
+        return {best_name: best_params}
+
+    @staticmethod
+    def fit_columns(residuals, bins=100, max_workers=None):
+        """
+        Ajusta varias series de residuos en paralelo (un hilo por columna; NumPy libera el GIL).
+        :param residuals: Diccionario columna -> residuos.
+        :return: Diccionario columna -> {nombre: parámetros}.
+        """
+        max_workers = max_workers or min(len(residuals), os.cpu_count() or 1) or 1
+        if max_workers == 1:
+            return {column: ResidualFitter.fit_best(data, bins) for column, data in residuals.items()}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fits = executor.map(lambda data: ResidualFitter.fit_best(data, bins), residuals.values())
+            return dict(zip(residuals, fits))
@@ -0,0 +1,47 @@
+import numpy as np
+from scipy.signal import lfilter
+from time_series_from_scratch import ArmaFilterBank
+
+AR_PARAMS = [[0.5, -0.2], [0.5, -0.2], [0.9], [0]]
+MA_PARAMS = [[0.3], [0.3], [0], [0]]
+
+
+def innovations(shape, seed=0):
+    return np.random.default_rng(seed).standard_normal(shape)
+
+
+def test_filter_matches_lfilter_per_series():
+    bank = ArmaFilterBank(AR_PARAMS, MA_PARAMS)
+    noise = innovations((500, len(AR_PARAMS)))
+    filtered, _ = bank.filter(noise)
+    for i, (ar, ma) in enumerate(zip(AR_PARAMS, MA_PARAMS)):
+        expected = lfilter(np.r_[1, ma], np.r_[1, -np.array(ar, dtype=float)], noise[:, i])
+        np.testing.assert_allclose(filtered[:, i], expected, rtol=0, atol=1e-12)
+
+
+def test_series_with_same_coefficients_share_a_filter():
+    bank = ArmaFilterBank(AR_PARAMS, MA_PARAMS)
+    assert len(bank.filters) == 3
+    assert sorted(bank.filters[0][2]) == [0, 1]
+
+
+def test_state_carry_matches_single_pass():
+    bank = ArmaFilterBank(AR_PARAMS, MA_PARAMS)
+    noise = innovations((1000, len(AR_PARAMS)))
+    whole, _ = bank.filter(noise)
+
+    parts, state = [], None
+    for start in range(0, len(noise), 137):
+        part, state = bank.filter(noise[start:start + 137], state=state)
+        parts.append(part)
+    np.testing.assert_array_equal(np.concatenate(parts), whole)
+
+
+def test_state_carry_along_batch_axis():
+    bank = ArmaFilterBank(AR_PARAMS, MA_PARAMS)
+    noise = innovations((3, 400, len(AR_PARAMS)), seed=1)
+    whole, _ = bank.filter(noise, axis=1)
+
+    first, state = bank.filter(noise[:, :150], axis=1)
+    second, _ = bank.filter(noise[:, 150:], axis=1, state=state)
+    np.testing.assert_array_equal(np.concatenate([first, second], axis=1), whole)
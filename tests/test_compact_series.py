@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from compact_series import CompactSeries
+
+N = 1003
+
+
+@pytest.fixture
+def mask():
+    return np.random.default_rng(0).random(N) < 0.3
+
+
+@pytest.fixture
+def series(mask):
+    values = np.random.default_rng(1).standard_normal((N, 2))
+    return CompactSeries.from_arrays("2024-02-28 23:55:00", values, mask)
+
+
+@pytest.mark.parametrize("start,stop", [(0, None), (0, 8), (3, 5), (7, 9), (8, 16), (5, 1003), (1000, 1003), (999, 1001), (17, 17)])
+def test_anomaly_mask_slices(series, mask, start, stop):
+    np.testing.assert_array_equal(series.anomaly_mask(start, stop), mask[start:stop])
+
+
+def test_anomaly_mask_every_window(series, mask):
+    for start in range(0, 40):
+        for stop in range(start, 40):
+            np.testing.assert_array_equal(series.anomaly_mask(start, stop), mask[start:stop])
+
+
+def test_anomaly_mask_without_anomalies():
+    assert CompactSeries.from_arrays("2024-01-01", np.zeros((10, 2))).anomaly_mask(2, 5) is None
+
+
+def test_timestamps_cross_month_and_leap_day(series):
+    assert series.timestamps(0, 7).tolist() == [
+        "2024-02-28 23:55:00", "2024-02-28 23:56:00", "2024-02-28 23:57:00", "2024-02-28 23:58:00",
+        "2024-02-28 23:59:00", "2024-02-29 00:00:00", "2024-02-29 00:01:00",
+    ]
+
+
+def test_iter_batches_round_trip(series, mask):
+    batches = list(series.iter_batches(100))
+    assert [len(timestamps) for timestamps, _ in batches] == [100] * 10 + [3]
+    frame = pd.concat([frame for _, frame in batches], ignore_index=True)
+    np.testing.assert_array_equal(frame["Anomaly"].to_numpy(), mask)
+    np.testing.assert_array_equal(frame[["Serie_1", "Serie_2"]].to_numpy(), series.values)
+
+
+def test_from_frame_keeps_values_as_float32(mask):
+    frame = pd.DataFrame({"Serie_1": np.arange(N, dtype=float), "Anomaly": mask})
+    compact = CompactSeries.from_frame("2024-01-01 00:00:00", frame)
+    assert compact.values.dtype == np.float32
+    np.testing.assert_array_equal(compact.anomaly_mask(), mask)
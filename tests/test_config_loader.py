@@ -0,0 +1,91 @@
+import copy
+import os
+import pickle
+import pytest
+from config_loader import ConfigLoader, FrozenConfig, FrozenList, freeze
+
+CONFIG_CSV = """parameter,value
+tipo_simulacion,1
+n_points,100
+n_series,2
+ar_params,"[[0.5], [0.3]]"
+ma_params,"[[0.2], [0.1]]"
+means,"[50, 20]"
+stds,"[5, 2]"
+corr_matrix,"[[1, 0.3], [0.3, 1]]"
+start_date,2025-01-01
+end_date,2025-01-03
+anomaly_outliers,"{'series': [0], 'magnitude': 4, 'count': 5}"
+"""
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.csv"
+    path.write_text(CONFIG_CSV)
+    return str(path)
+
+
+def test_frozen_config_pickles_as_frozen():
+    config = freeze({"means": [50, 20], "corr_matrix": [[1, 0.3], [0.3, 1]], "anomalies": {"series": [0]}})
+    restored = pickle.loads(pickle.dumps(config))
+    assert restored == config
+    assert isinstance(restored, FrozenConfig)
+    assert isinstance(restored["corr_matrix"], FrozenList) and isinstance(restored["corr_matrix"][0], FrozenList)
+    assert isinstance(restored["anomalies"], FrozenConfig)
+    with pytest.raises(TypeError):
+        restored["means"] = [0, 0]
+    with pytest.raises(TypeError):
+        restored["corr_matrix"][0].append(1)
+
+
+def test_deepcopy_keeps_values():
+    config = freeze({"stds": [5, 2]})
+    assert copy.deepcopy(config) == config
+
+
+def test_loaded_config_is_read_only_and_copyable(config_file):
+    config = ConfigLoader.load_config(config_file)
+    assert isinstance(config, FrozenConfig)
+    with pytest.raises(TypeError):
+        config["n_points"] = 5
+    with pytest.raises(TypeError):
+        config.update(n_points=5)
+
+    editable = dict(config)
+    editable["n_points"] = 5
+    assert ConfigLoader.load_config(config_file)["n_points"] != 5
+
+
+def test_cache_returns_the_same_object_until_the_file_changes(config_file):
+    first = ConfigLoader.load_config(config_file)
+    assert ConfigLoader.load_config(config_file) is first
+
+    with open(config_file, "w") as f:
+        f.write(CONFIG_CSV.replace("n_points,100", "n_points,250"))
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    reloaded = ConfigLoader.load_config(config_file)
+    assert reloaded is not first
+    assert reloaded["n_points"] == 250
+
+
+def test_load_parameters_shares_the_cache(config_file):
+    parameters = ConfigLoader.load_parameters(config_file)
+    assert parameters["means"] == "[50, 20]"
+    assert ConfigLoader.load_parameters(config_file) is parameters
+
+
+def test_missing_file_raises_value_error(tmp_path):
+    missing = tmp_path / "no_existe.csv"
+    with pytest.raises(ValueError, match="no_existe.csv"):
+        ConfigLoader.load_config(str(missing))
+    with pytest.raises(ValueError, match="no_existe.csv"):
+        ConfigLoader.load_parameters(str(missing))
+
+
+def test_unreadable_csv_raises_value_error(tmp_path):
+    path = tmp_path / "vacio.csv"
+    path.write_text("")
+    with pytest.raises(ValueError, match="Error al cargar la configuración desde CSV"):
+        ConfigLoader.load_config(str(path))
@@ -0,0 +1,67 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from config_loader import ConfigLoader
+from time_series_from_scratch import compile_plan
+
+LOADINGS = [[0.8, 0.1], [0.6, -0.3], [0.2, 0.7]]
+UNIQUENESS = [0.35, 0.55, 0.47]
+
+BASE_CSV = """parameter,value
+tipo_simulacion,1
+n_points,100
+n_series,3
+ar_params,"[[0.5], [0.3], [0]]"
+ma_params,"[[0.2], [0.1], [0]]"
+means,"[50, 20, 10]"
+stds,"[5, 2, 1]"
+start_date,2025-01-01
+end_date,2025-01-03
+"""
+
+
+def parse(extra):
+    return ConfigLoader.parse_config(pd.read_csv(io.StringIO(BASE_CSV + extra), index_col=0))
+
+
+def test_factor_draw_covariance_matches_model():
+    plan = compile_plan({"n_series": 3, "factor_loadings": LOADINGS, "idiosyncratic_vars": UNIQUENESS})
+    noise = plan.draw_noise(np.random.default_rng(0), (400_000,))
+
+    loadings = np.array(LOADINGS)
+    expected = loadings @ loadings.T + np.diag(UNIQUENESS)
+    np.testing.assert_allclose(np.cov(noise, rowvar=False), expected, atol=0.01)
+
+
+def test_factor_draw_covariance_is_scaled_by_stds():
+    stds = np.array([5.0, 2.0, 1.0])
+    plan = compile_plan({"n_series": 3, "stds": stds.tolist(), "factor_loadings": LOADINGS, "idiosyncratic_vars": UNIQUENESS})
+    noise = plan.draw_noise(np.random.default_rng(1), (400_000,))
+
+    loadings = np.array(LOADINGS)
+    corr = loadings @ loadings.T + np.diag(UNIQUENESS)
+    np.testing.assert_allclose(np.cov(noise, rowvar=False), corr * np.outer(stds, stds), rtol=0.02, atol=0.01)
+
+
+def test_parse_config_accepts_consistent_factor_model():
+    config = parse(f'factor_loadings,"{LOADINGS}"\nidiosyncratic_vars,"{UNIQUENESS}"\n')
+    assert config["factor_loadings"] == LOADINGS
+    assert config["idiosyncratic_vars"] == UNIQUENESS
+
+
+@pytest.mark.parametrize("extra", [
+    'factor_loadings,"[0.8, 0.6, 0.2]"\n',                              # no es una matriz
+    'factor_loadings,"[[0.8], [0.6]]"\n',                               # faltan filas
+    'factor_loadings,"[[0.8, 0.1], [0.6], [0.2, 0.7]]"\n',              # filas de distinta longitud
+    "factor_loadings,\"[['a'], [0.6], [0.2]]\"\n",                      # no numérica
+    'factor_loadings,"[[1.2], [0.6], [0.2]]"\n',                        # comunalidad > 1 sin idiosyncratic_vars
+    'factor_loadings,"[[0.8, 0.1], [0.6, -0.3], [0.2, 0.7"\n',          # sintaxis inválida
+    f'factor_loadings,"{LOADINGS}"\nidiosyncratic_vars,"[0.35, 0.55]"\n',
+    f'factor_loadings,"{LOADINGS}"\nidiosyncratic_vars,"[0.35, -0.55, 0.47]"\n',
+    f'factor_loadings,"{LOADINGS}"\nidiosyncratic_vars,"[[0.35], 0.55, 0.47]"\n',
+    f'factor_loadings,"{LOADINGS}"\nidiosyncratic_vars,"[0.1, 0.1, 0.1]"\n',  # diagonal distinta de 1
+])
+def test_parse_config_rejects_malformed_factor_model(extra):
+    with pytest.raises(ValueError, match="factor_loadings|idiosyncratic_vars"):
+        parse(extra)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from process_simulator import ProcessSimulator
+from random_streams import plc_generator, ANOMALY_STREAM
+from time_series_from_scratch import TimeSeriesSimulator
+
+CONFIG = {
+    "n_points": 3000,
+    "n_series": 2,
+    "ar_params": [[0.6, -0.2], [0.8]],
+    "ma_params": [[0.3], [0]],
+    "means": [50, 20],
+    "stds": [5, 2],
+    "corr_matrix": [[1, 0.5], [0.5, 1]],
+    "trend_slopes": [0.001, 0],
+    "seasonality_periods": [1440, 60],
+    "seasonality_amplitudes": [3, 1],
+    "anomalies": {
+        "anomaly_outliers": {"series": [0], "magnitude": 4, "count": 7},
+        "anomaly_drift": {"series": [1], "slope": 0.01, "start_point": 2000},
+    },
+}
+
+
+def stream(chunk_minutes, seed=3, id_plc=1):
+    generator = TimeSeriesSimulator(CONFIG, plc_generator(seed, id_plc))
+    return pd.concat(generator.generate_stream(chunk_minutes), ignore_index=True)
+
+
+@pytest.mark.parametrize("chunk_minutes", [1, 97, 1000])
+def test_generate_stream_is_chunk_invariant(chunk_minutes):
+    pd.testing.assert_frame_equal(stream(chunk_minutes), stream(CONFIG["n_points"]))
+
+
+def test_generate_stream_length_and_columns():
+    series = stream(700)
+    assert len(series) == CONFIG["n_points"]
+    assert list(series.columns) == ["Serie_1", "Serie_2"]
+
+
+@pytest.mark.parametrize("chunk_minutes", [97, 1000])
+def test_simulate_stream_with_anomalies_is_chunk_invariant(chunk_minutes):
+    def simulate(chunk):
+        chunks = ProcessSimulator().simulate_stream(CONFIG, chunk, plc_generator(3, 1), plc_generator(3, 1, ANOMALY_STREAM))
+        return pd.concat(chunks, ignore_index=True)
+
+    expected = simulate(CONFIG["n_points"])
+    pd.testing.assert_frame_equal(simulate(chunk_minutes), expected)
+    assert expected["Anomaly"].sum() >= CONFIG["n_points"] - 2000
+
+
+def test_simulate_stream_places_every_outlier():
+    outliers = CONFIG["anomalies"]["anomaly_outliers"]
+    config = dict(CONFIG, anomalies={"anomaly_outliers": outliers})
+    chunks = ProcessSimulator().simulate_stream(config, 128, plc_generator(3, 1), plc_generator(3, 1, ANOMALY_STREAM))
+    series = pd.concat(chunks, ignore_index=True)
+
+    assert series["Anomaly"].sum() == outliers["count"]
+    # El plan de outliers no consume números del generador de las series
+    np.testing.assert_array_equal(series["Serie_2"], stream(128)["Serie_2"])
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from time_series_analyzer import IncrementalDecomposer, TimeSeriesAnalyzer
+
+PERIOD = 12
+COLUMNS = ["Serie_1", "Serie_2"]
+
+
+def observations(n=2000, seed=0, drop=0.1):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    # Minutos faltantes: el modelo no debe suponer un muestreo completo
+    t = t[rng.random(n) >= drop]
+    seasonal = np.array([np.sin(2 * np.pi * t / PERIOD), np.cos(2 * np.pi * t / PERIOD)]).T
+    values = np.array([50.0, 20.0]) + np.outer(t, [0.01, -0.002]) + seasonal * [3.0, 1.0] + rng.normal(0, [1.0, 0.5], (len(t), 2))
+    return 27_000_000 + t, values
+
+
+def batch_ols(minutes, values):
+    """
+    MCO de y sobre t y una variable ficticia por fase estacional.
+    """
+    t = (minutes - minutes[0]).astype(float)
+    dummies = np.eye(PERIOD)[(minutes - minutes[0]) % PERIOD]
+    design = np.column_stack([t, dummies])
+    coefs, _, _, _ = np.linalg.lstsq(design, values, rcond=None)
+    residuals = values - design @ coefs
+    return coefs[0], coefs[1:], np.sqrt((residuals ** 2).mean(axis=0)), t[-1]
+
+
+def decomposer_from(minutes, values, block):
+    decomposer = IncrementalDecomposer(COLUMNS, PERIOD)
+    for start in range(0, len(minutes), block):
+        decomposer.update(minutes[start:start + block], values[start:start + block])
+    return decomposer
+
+
+@pytest.mark.parametrize("block", [1, 7, 500, 10 ** 6])
+def test_model_matches_batch_ols(block):
+    minutes, values = observations()
+    slope, levels, scale, last_t = batch_ols(minutes, values)
+    model = decomposer_from(minutes, values, block).to_model()
+
+    intercept = levels.mean(axis=0)
+    profile = np.roll(levels - intercept, -int(last_t + 1) % PERIOD, axis=0)
+    for j, column in enumerate(COLUMNS):
+        series = model["series"][column]
+        assert series["trend_slope"] == pytest.approx(slope[j], rel=1e-8)
+        assert series["trend_last"] == pytest.approx(intercept[j] + slope[j] * last_t, rel=1e-8)
+        np.testing.assert_allclose(series["seasonal_profile"], profile[:, j], atol=1e-8)
+        assert series["distribution"]["norm"]["scale"] == pytest.approx(scale[j], rel=1e-6)
+
+
+def test_block_size_does_not_change_the_model():
+    minutes, values = observations(seed=1)
+    first = decomposer_from(minutes, values, 13).to_model()
+    second = decomposer_from(minutes, values, 900).to_model()
+    for column in COLUMNS:
+        np.testing.assert_allclose(first["series"][column]["seasonal_profile"], second["series"][column]["seasonal_profile"], atol=1e-9)
+        assert first["series"][column]["trend_slope"] == pytest.approx(second["series"][column]["trend_slope"], rel=1e-10)
+
+
+def test_ready_and_n_points():
+    minutes, values = observations(n=30, drop=0)
+    decomposer = IncrementalDecomposer(COLUMNS, PERIOD)
+    decomposer.update(minutes[:PERIOD], values[:PERIOD])
+    assert not decomposer.ready
+    decomposer.update(minutes[PERIOD:], values[PERIOD:])
+    assert decomposer.ready and decomposer.n_points == 30
+
+
+def test_to_model_requires_data():
+    with pytest.raises(ValueError):
+        IncrementalDecomposer(COLUMNS, PERIOD).to_model()
+
+
+def test_analyzer_round_trips_the_model():
+    minutes, values = observations(seed=2)
+    decomposer = decomposer_from(minutes, values, 250)
+    analyzer = decomposer.analyzer()
+    assert isinstance(analyzer, TimeSeriesAnalyzer)
+    assert analyzer.to_model() == decomposer.to_model()
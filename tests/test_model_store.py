@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+from model_store import ModelStore
+from process_simulator import ProcessSimulator
+from time_series_analyzer import TimeSeriesAnalyzer
+
+PERIOD = 12
+
+
+@pytest.fixture(scope="module")
+def time_series():
+    rng = np.random.default_rng(0)
+    t = np.arange(480)
+    return pd.DataFrame({
+        "Serie_1": 50 + 0.01 * t + 3 * np.sin(2 * np.pi * t / PERIOD) + rng.normal(0, 1.0, len(t)),
+        "Serie_2": 20 - 0.002 * t + np.cos(2 * np.pi * t / PERIOD) + rng.normal(0, 0.5, len(t)),
+    })
+
+
+@pytest.fixture(scope="module")
+def fitted(time_series):
+    analyzer = TimeSeriesAnalyzer(time_series, PERIOD)
+    analyzer.decompose()
+    analyzer.fit_residual_distributions()
+    return analyzer
+
+
+def test_saved_model_loads_equal_from_a_fresh_store(tmp_path, time_series, fitted):
+    key = ModelStore.model_key(time_series, PERIOD)
+    model = fitted.to_model()
+    ModelStore(tmp_path).save(key, model)
+
+    assert ModelStore(tmp_path).load(key) == model
+
+
+def test_missing_model_returns_none(tmp_path, time_series):
+    assert ModelStore(tmp_path).load(ModelStore.model_key(time_series, PERIOD)) is None
+
+
+def test_unreadable_model_returns_none(tmp_path, time_series):
+    key = ModelStore.model_key(time_series, PERIOD)
+    store = ModelStore(tmp_path)
+    with open(store._path(key), "w") as f:
+        f.write('{"period": 12, "columns": [')
+
+    assert store.load(key) is None
+
+
+def test_model_key_depends_on_data_and_period(time_series):
+    key = ModelStore.model_key(time_series, PERIOD)
+    assert ModelStore.model_key(time_series.copy(), PERIOD) == key
+    assert ModelStore.model_key(time_series, PERIOD + 1) != key
+    assert ModelStore.model_key(time_series + 1e-9, PERIOD) != key
+
+
+def test_stored_model_simulates_like_the_fresh_fit(tmp_path, time_series, fitted):
+    key = ModelStore.model_key(time_series, PERIOD)
+    ModelStore(tmp_path).save(key, fitted.to_model())
+    restored = TimeSeriesAnalyzer.from_model(ModelStore(tmp_path).load(key))
+
+    expected = fitted.simulate_forward(200, np.random.default_rng(7))
+    pd.testing.assert_frame_equal(restored.simulate_forward(200, np.random.default_rng(7)), expected)
+
+
+def test_analyze_and_simulate_reuses_the_stored_model(tmp_path, time_series):
+    first = ProcessSimulator(ModelStore(tmp_path)).analyze_and_simulate(time_series, PERIOD, 100, np.random.default_rng(3))
+    assert len(list(tmp_path.glob("model_*.json"))) == 1
+
+    # Almacén nuevo sobre el mismo directorio: carga el modelo del archivo sin volver a ajustarlo
+    second = ProcessSimulator(ModelStore(tmp_path)).analyze_and_simulate(time_series, PERIOD, 100, np.random.default_rng(3))
+    pd.testing.assert_frame_equal(second, first)
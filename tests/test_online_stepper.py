@@ -0,0 +1,56 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from random_streams import plc_generator
+from time_series_from_scratch import OnlineStepper, TimeSeriesSimulator
+
+CONFIG = {
+    "n_points": 2000,
+    "n_series": 2,
+    "ar_params": [[0.6, -0.2], [0]],
+    "ma_params": [[0.3], [0]],
+    "means": [50, 20],
+    "stds": [5, 2],
+    "corr_matrix": [[1, 0.5], [0.5, 1]],
+    "trend_slopes": [0.001, 0],
+    "seasonality_periods": [1440, 60],
+    "seasonality_amplitudes": [3, 1],
+}
+
+
+def steps(stepper, n):
+    return np.array([stepper.step()[0] for _ in range(n)])
+
+
+def test_stepper_follows_generate_stream():
+    stream = pd.concat(TimeSeriesSimulator(CONFIG, plc_generator(5, 1)).generate_stream(500), ignore_index=True)
+    values = steps(OnlineStepper(CONFIG, plc_generator(5, 1)), CONFIG["n_points"])
+    # Misma recursión que lfilter, pero minuto a minuto: solo difiere el redondeo
+    np.testing.assert_allclose(values, stream.to_numpy(), rtol=0, atol=1e-9)
+
+
+def test_state_round_trip_continues_the_series():
+    reference = OnlineStepper(CONFIG, plc_generator(5, 1))
+    expected = steps(reference, 300)
+
+    stepper = OnlineStepper(CONFIG, plc_generator(5, 1))
+    first = steps(stepper, 120)
+    state = json.loads(json.dumps(stepper.state()))
+    resumed = OnlineStepper(CONFIG, state=state)
+    assert resumed.t == 120
+    np.testing.assert_array_equal(np.vstack([first, steps(resumed, 180)]), expected)
+
+
+def test_restore_rejects_state_of_another_configuration():
+    state = OnlineStepper(CONFIG, plc_generator(5, 1)).state()
+    other = dict(CONFIG, ar_params=[[0.6, -0.2, 0.1], [0]])
+    with pytest.raises(ValueError):
+        OnlineStepper(other, state=state)
+
+
+def test_drift_anomaly_repeats_every_cycle():
+    config = dict(CONFIG, n_points=50, anomalies={"anomaly_drift": {"series": [1], "slope": 1, "start_point": 40}})
+    stepper = OnlineStepper(config, plc_generator(5, 1))
+    flags = [stepper.step()[1] for _ in range(100)]
+    assert flags == ([False] * 40 + [True] * 10) * 2
@@ -0,0 +1,93 @@
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+from config_loader import freeze
+from process_simulator import ProcessSimulator
+from random_streams import plc_generator
+from time_series_from_scratch import TimeSeriesSimulator, compile_plan, config_hash
+from test_generate_stream import CONFIG
+
+
+def changed(path, value):
+    """
+    Copia de CONFIG con el valor anidado en ``path`` (tupla de claves e índices) reemplazado.
+    """
+    config = copy.deepcopy(CONFIG)
+    target = config
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = value
+    return config
+
+
+def test_equal_configs_share_the_plan():
+    plan = compile_plan(CONFIG)
+    assert compile_plan(copy.deepcopy(CONFIG)) is plan
+    assert compile_plan(freeze(CONFIG)) is plan
+    # n_points no forma parte del plan
+    assert compile_plan(dict(CONFIG, n_points=10)) is plan
+
+
+@pytest.mark.parametrize("path, value", [
+    (("ar_params", 0, 1), -0.21),
+    (("ma_params", 1, 0), 0.1),
+    (("means", 1), 21),
+    (("stds", 0), 5.5),
+    (("corr_matrix", 0, 1), 0.4),
+    (("corr_matrix", 1, 0), 0.4),
+    (("trend_slopes", 1), 0.002),
+    (("seasonality_periods", 0), 720),
+    (("seasonality_amplitudes", 1), 1.5),
+    (("n_factors",), 1),
+])
+def test_any_plan_field_change_misses_the_cache(path, value):
+    plan = compile_plan(CONFIG)
+    config = changed(path, value)
+
+    assert config_hash(config) != config_hash(CONFIG)
+    assert compile_plan(config) is not plan
+
+
+def test_anomaly_change_shares_the_plan_but_not_the_result():
+    # Las anomalías no forman parte del plan: se aplican en cada simulación con la configuración recibida
+    config = changed(("anomalies", "anomaly_outliers", "magnitude"), 8)
+    assert compile_plan(config) is compile_plan(CONFIG)
+
+    def simulate(config):
+        return ProcessSimulator().simulate("from_scratch", config, rng=plc_generator(3, 1))
+
+    base, other = simulate(CONFIG), simulate(config)
+    pd.testing.assert_series_equal(base["Anomaly"], other["Anomaly"])
+    assert not base["Serie_1"].equals(other["Serie_1"])
+
+
+def plan_arrays(plan):
+    arrays = {name: value.copy() for name, value in vars(plan).items() if isinstance(value, np.ndarray)}
+    arrays.update({("table", key): table.copy() for key, table in plan._seasonal_tables.items()})
+    arrays.update({("filter", n, part): array.copy() for n, (b, a, _) in enumerate(plan.bank.filters) for part, array in (("b", b), ("a", a))})
+    return arrays
+
+
+def test_generation_does_not_mutate_the_plan():
+    plan = compile_plan(CONFIG)
+    before = plan_arrays(plan)
+
+    for _ in TimeSeriesSimulator(CONFIG, plc_generator(3, 1)).generate_stream(700):
+        pass
+    ProcessSimulator().simulate_batch(CONFIG, [plc_generator(3, id_plc) for id_plc in range(4)])
+
+    after = plan_arrays(plan)
+    assert after.keys() == before.keys()
+    for key, array in before.items():
+        np.testing.assert_array_equal(after[key], array, err_msg=str(key))
+
+
+def test_plan_is_read_only():
+    plan = compile_plan(CONFIG)
+    with pytest.raises(AttributeError):
+        plan.means = np.zeros(2)
+    with pytest.raises(ValueError):
+        plan.means[0] = 0
+    with pytest.raises(ValueError):
+        next(iter(plan._seasonal_tables.values()))[0] = 0
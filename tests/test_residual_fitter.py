@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from scipy import stats
+from residual_fitter import ResidualFitter
+
+N = 5000
+
+
+def sample(name, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "norm": lambda: rng.normal(2.0, 3.0, N),
+        "expon": lambda: rng.exponential(1.5, N) - 4.0,
+        "uniform": lambda: rng.uniform(-1.0, 5.0, N),
+        "lognorm": lambda: rng.lognormal(0.3, 0.6, N) - 2.0,
+    }[name]()
+
+
+def loglik(name, data, params):
+    return getattr(stats, name).logpdf(data, **params).sum()
+
+
+@pytest.mark.parametrize("name", ["norm", "expon", "uniform"])
+def test_closed_form_fits_match_scipy(name):
+    data = sample(name)
+    fitted = getattr(ResidualFitter, f"fit_{name}")(data)
+    loc, scale = getattr(stats, name).fit(data)
+    assert fitted["loc"] == pytest.approx(loc, rel=1e-9, abs=1e-9)
+    assert fitted["scale"] == pytest.approx(scale, rel=1e-9)
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_lognorm_likelihood_at_least_scipy(seed):
+    data = sample("lognorm", seed)
+    fitted = ResidualFitter.fit_lognorm(data)
+    s, loc, scale = stats.lognorm.fit(data)
+    assert loc < data.min()
+    assert loglik("lognorm", data, fitted) >= loglik("lognorm", data, {"s": s, "loc": loc, "scale": scale}) - 1e-6 * N
+
+
+def test_lognorm_on_symmetric_residuals_is_finite():
+    fitted = ResidualFitter.fit_lognorm(sample("norm"))
+    assert all(np.isfinite(value) for value in fitted.values())
+    assert fitted["loc"] < sample("norm").min()
+
+
+def test_lognorm_on_constant_residuals_does_not_warn():
+    with np.errstate(all="raise"):
+        fitted = ResidualFitter.fit_lognorm(np.full(100, 3.0))
+    assert fitted == {"s": 0.0, "loc": 3.0, "scale": 0.0}
+    assert ResidualFitter.fit_best(np.full(100, 3.0)) == {"norm": {"loc": 3.0, "scale": 0.0}}
+
+
+# Sin "norm": con residuos normales una lognormal casi simétrica empata en SSE (igual que con Fitter)
+@pytest.mark.parametrize("name", ["expon", "uniform", "lognorm"])
+def test_fit_best_selects_the_generating_family(name):
+    assert list(ResidualFitter.fit_best(sample(name))) == [name]
+
+
+def test_fit_columns_matches_fit_best():
+    residuals = {"Serie_1": sample("norm"), "Serie_2": sample("expon")}
+    fits = ResidualFitter.fit_columns(residuals, max_workers=2)
+    assert fits == {column: ResidualFitter.fit_best(data) for column, data in residuals.items()}
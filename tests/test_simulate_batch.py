@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from process_simulator import ProcessSimulator, _run_batch
+from random_streams import plc_generator
+from test_generate_stream import CONFIG
+
+PARAMS = ("from_scratch", CONFIG, None, 12, 500, False)
+SEED = 11
+
+
+def run_batch(ids_plc):
+    return dict(_run_batch(ProcessSimulator(), [(SEED, id_plc) for id_plc in ids_plc], PARAMS))
+
+
+def test_batch_of_one_matches_batch_of_sixteen():
+    single = run_batch([5])[(SEED, 5)]
+    batched = run_batch(range(16))
+
+    # Lote de 1: simulate(); lote de 16: simulate_batch(). Deben coincidir bit a bit
+    for column in ("Serie_1", "Serie_2", "Anomaly"):
+        np.testing.assert_array_equal(batched[(SEED, 5)][column], single[column])
+    assert batched[(SEED, 5)]["Anomaly"].any()
+
+
+def test_simulate_batch_matches_simulate_per_plc():
+    ids_plc = [1, 2, 7]
+    values, mask = ProcessSimulator().simulate_batch(CONFIG, [plc_generator(SEED, id_plc) for id_plc in ids_plc])
+
+    for k, id_plc in enumerate(ids_plc):
+        series = ProcessSimulator().simulate("from_scratch", CONFIG, rng=plc_generator(SEED, id_plc))
+        np.testing.assert_array_equal(values[k], series[["Serie_1", "Serie_2"]].to_numpy())
+        np.testing.assert_array_equal(mask[k], series["Anomaly"].to_numpy())
+
+
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_simulate_many_pool_matches_in_process(batch_size):
+    jobs = [(SEED, id_plc) for id_plc in range(1, 6)]
+
+    def simulate(n_workers):
+        results = ProcessSimulator().simulate_many("from_scratch", jobs, CONFIG, n_workers=n_workers, batch_size=batch_size)
+        return dict(results)
+
+    in_process = simulate(1)
+    pooled = simulate(2)
+    assert sorted(pooled) == sorted(in_process) == jobs
+    for job in jobs:
+        pd.testing.assert_frame_equal(pooled[job], in_process[job])
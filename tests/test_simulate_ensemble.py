@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from model_store import ModelStore
+from process_simulator import ProcessSimulator
+from time_series_analyzer import TimeSeriesAnalyzer
+
+MODEL = {
+    "period": 4,
+    "columns": ["Serie_1", "Serie_2"],
+    "series": {
+        "Serie_1": {"trend_last": 50.0, "trend_slope": 0.01, "seasonal_profile": [1.0, -1.0, 0.5, -0.5],
+                    "distribution": {"norm": {"loc": 0.0, "scale": 1.0}}},
+        "Serie_2": {"trend_last": 20.0, "trend_slope": 0.0, "seasonal_profile": [0.2, 0.0, -0.2, 0.0],
+                    "distribution": {"lognorm": {"s": 0.5, "loc": -1.0, "scale": 1.0}}},
+    },
+}
+N_PATHS, STEPS = 6, 300
+
+
+def ensemble(seed, n_paths=N_PATHS):
+    return TimeSeriesAnalyzer.from_model(MODEL).simulate_ensemble(n_paths, STEPS, np.random.default_rng(seed))
+
+
+def test_ensemble_shape():
+    assert ensemble(1).shape == (N_PATHS, STEPS, len(MODEL["columns"]))
+    assert ensemble(1, n_paths=1).shape == (1, STEPS, len(MODEL["columns"]))
+
+
+def test_ensemble_is_reproducible_for_a_root_seed():
+    np.testing.assert_array_equal(ensemble(1), ensemble(1))
+    assert not np.array_equal(ensemble(1), ensemble(2))
+
+
+def test_members_are_independent():
+    paths = ensemble(1)
+    residuals = paths[:, :, 0] - TimeSeriesAnalyzer.extend_components(MODEL["series"]["Serie_1"], STEPS)
+    corr = np.corrcoef(residuals)
+    off_diagonal = corr[~np.eye(N_PATHS, dtype=bool)]
+    # Con 300 pasos, |r| de dos escenarios independientes supera 0.25 con probabilidad < 1e-5
+    assert np.all(np.abs(off_diagonal) < 0.25)
+
+
+@pytest.mark.parametrize("member", [0, N_PATHS - 1])
+def test_member_matches_simulate_forward_with_its_spawned_generator(member):
+    generator = np.random.default_rng(1).spawn(N_PATHS)[member]
+    expected = TimeSeriesAnalyzer.from_model(MODEL).simulate_forward(STEPS, generator)
+    np.testing.assert_array_equal(ensemble(1)[member], expected.to_numpy())
+
+
+def test_process_simulator_ensemble_uses_the_stored_model(tmp_path):
+    time_series = np.zeros((48, 2))
+    store = ModelStore(tmp_path)
+    store.save(ModelStore.model_key(time_series, MODEL["period"]), MODEL)
+
+    paths = ProcessSimulator(store).simulate_ensemble(time_series, N_PATHS, MODEL["period"], STEPS, np.random.default_rng(1), np.float32)
+    assert paths.shape == (N_PATHS, STEPS, 2) and paths.dtype == np.float32
+    np.testing.assert_allclose(paths, ensemble(1), rtol=1e-6)
@@ -0,0 +1,66 @@
+from datetime import timedelta
+import numpy as np
+import pytest
+from time_period_helper import TimePeriodHelper, TimestampView
+
+START, END = "2024-02-28", "2024-03-01 01:30:00"
+
+
+def timestamps_by_loop(start_date, end_date):
+    # Implementación anterior de generate_timestamps, minuto a minuto
+    current = TimePeriodHelper.parse_date(start_date, "00:00:00")
+    end = TimePeriodHelper.parse_date(end_date, "23:59:00")
+    timestamps = []
+    while current < end:
+        timestamps.append(current.strftime("%Y-%m-%d %H:%M:%S"))
+        current += timedelta(minutes=1)
+    return timestamps
+
+
+@pytest.fixture
+def view():
+    return TimePeriodHelper.generate_timestamps(START, END)
+
+
+def test_view_matches_loop(view):
+    expected = timestamps_by_loop(START, END)
+    assert isinstance(view, TimestampView)
+    assert len(view) == len(expected) == TimePeriodHelper.calculate_minutes(START, END)
+    assert list(view) == expected
+    assert view == expected
+
+
+def test_indexing(view):
+    expected = timestamps_by_loop(START, END)
+    for index in (0, 1, 1439, 1440, -1, -1441):
+        assert view[index] == expected[index]
+        assert isinstance(view[index], str)
+
+
+def test_slices_are_views(view):
+    expected = timestamps_by_loop(START, END)
+    for part in (slice(10, 20), slice(1430, 1450), slice(None, None, 60), slice(-5, None)):
+        sliced = view[part]
+        assert isinstance(sliced, TimestampView)
+        assert list(sliced) == expected[part]
+
+
+def test_iteration_across_blocks(view):
+    assert list(view.__iter__(block_rows=7)) == timestamps_by_loop(START, END)
+
+
+def test_as_array(view):
+    array = np.asarray(view)
+    assert array.shape == (len(view),)
+    assert array[0] == "2024-02-28 00:00:00" and array[-1] == "2024-03-01 01:29:00"
+
+
+def test_iter_timestamp_chunks_covers_the_range():
+    chunks = list(TimePeriodHelper.iter_timestamp_chunks(START, END, 1000))
+    assert [len(chunk) for chunk in chunks[:-1]] == [1000] * (len(chunks) - 1)
+    assert sum(chunks, []) == timestamps_by_loop(START, END)
+
+
+def test_parse_date_day_first_and_slashes():
+    assert TimePeriodHelper.parse_date("29/02/2024") == TimePeriodHelper.parse_date("2024-02-29")
+    assert TimePeriodHelper.parse_date("2024-02-29", "23:59:00").strftime("%H:%M") == "23:59"
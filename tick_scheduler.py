@@ -0,0 +1,213 @@
+import json
+import math
+import time
+from collections import deque
+from datetime import datetime
+from crud_operations import DatabaseOperations
+
+
+class LiveFeed:
+    def __init__(self, id_plc, table_name, id_simulacion, refill, stepper=None, last_timestamp=None):
+        """
+        Fuente de filas de un PLC para una tabla del feed en vivo.
+        :param id_plc: Identificador del PLC.
+        :param table_name: Clave de TABLE_MODELS donde se escriben las filas.
+        :param id_simulacion: id_simulacion reservado para este feed.
+        :param refill: Función refill(feed) -> (timestamps, series_df) que genera el siguiente tramo,
+                       o None si quien consume el feed lo recarga con load().
+        :param stepper: OnlineStepper opcional; si se indica, cada fila se genera en el momento con el
+                        minuto actual como timestamp y no se precalcula ningún tramo.
+        :param last_timestamp: Último minuto ya escrito para este PLC y tabla; el siguiente tramo
+                               generado empieza en el minuto posterior.
+        """
+        self.id_plc = id_plc
+        self.table_name = table_name
+        self.id_simulacion = id_simulacion
+        self.refill = refill
+        self.stepper = stepper
+        self.last_timestamp = last_timestamp
+        self._timestamps = []
+        self._velocidades = None
+        self._temperaturas = None
+        self._anomalias = None
+        self._position = 0
+
+    @property
+    def exhausted(self):
+        return self.stepper is None and self._position >= len(self._timestamps)
+
+    def load(self, timestamps, series_df, stop=None):
+        """
+        Carga un nuevo tramo de serie y reinicia la posición de lectura.
+        :param stop: Número de filas del tramo que se usan (None = todas). El siguiente tramo empieza
+                     tras la última fila entregada, así que recortar no deja huecos.
+        """
+        if len(series_df) != len(timestamps):
+            raise ValueError("El número de filas en el DataFrame no coincide con el número de timestamps.")
+        if stop is not None:
+            timestamps, series_df = timestamps[:stop], series_df.iloc[:stop]
+        self._timestamps = timestamps
+        self._velocidades = series_df['Serie_1'].to_numpy()
+        self._temperaturas = series_df['Serie_2'].to_numpy()
+        self._anomalias = series_df['Anomaly'].to_numpy() if 'Anomaly' in series_df.columns else None
+        self._position = 0
+
+    def next_row(self):
+        """
+        Devuelve la siguiente fila como diccionario de columnas, regenerando la serie si se agotó.
+        """
+        if self.stepper is not None:
+            values, anomaly = self.stepper.step()
+            self.last_timestamp = datetime.now().replace(second=0, microsecond=0).strftime("%Y-%m-%d %H:%M:%S")
+            return {
+                "id_plc": self.id_plc,
+                "timestamp": self.last_timestamp,
+                "velocidad": float(values[0]),
+                "temperatura": float(values[1]),
+                "id_simulacion": self.id_simulacion,
+                "anomalia": anomaly,
+            }
+
+        if self.exhausted:
+            self.load(*self.refill(self))
+
+        i = self._position
+        self._position += 1
+        self.last_timestamp = self._timestamps[i]
+        return {
+            "id_plc": self.id_plc,
+            "timestamp": self.last_timestamp,
+            "velocidad": float(self._velocidades[i]),
+            "temperatura": float(self._temperaturas[i]),
+            "id_simulacion": self.id_simulacion,
+            "anomalia": bool(self._anomalias[i]) if self._anomalias is not None else False,
+        }
+
+    def checkpoint(self):
+        """
+        Checkpoint del generador en línea para la tabla estado_simulador (None si el feed no tiene stepper).
+        """
+        if self.stepper is None or self.last_timestamp is None:
+            return None
+        return {
+            "id_plc": self.id_plc,
+            "table_name": self.table_name,
+            "id_simulacion": self.id_simulacion,
+            "timestamp": self.last_timestamp,
+            "estado": json.dumps(self.stepper.state()),
+        }
+
+
+class TickScheduler:
+    def __init__(self, session_factory, feeds, interval=60, on_tick=None, checkpoint_every=1):
+        """
+        Planificador único del feed en vivo: en cada tick alineado al reloj reúne la siguiente
+        fila de cada feed y escribe un insert multi-fila por tabla en una sola transacción.
+        :param session_factory: Callable que devuelve una sesión de base de datos.
+        :param feeds: Lista de LiveFeed.
+        :param interval: Segundos entre ticks (60 = alineado al minuto).
+        :param on_tick: Callback opcional on_tick(stats, feeds_ok) tras cada tick.
+        :param checkpoint_every: Cada cuántos ticks se guarda el estado de los feeds con stepper. Con 1 (por
+                                 defecto) un reinicio continúa en el minuto siguiente al último escrito;
+                                 con N > 1 se repiten hasta N - 1 valores ya escritos.
+        """
+        self.session_factory = session_factory
+        self.feeds = feeds
+        self.interval = interval
+        self.on_tick = on_tick
+        self.checkpoint_every = checkpoint_every
+        self.stats = deque(maxlen=1440)
+
+    def _next_boundary(self, now):
+        return math.floor(now / self.interval) * self.interval + self.interval
+
+    def run_tick(self, session, db_ops, checkpoint=False):
+        """
+        Ejecuta un tick: recolecta las filas y las escribe agrupadas por tabla.
+        :param checkpoint: Si es True, guarda el estado de los feeds en la misma transacción que las filas.
+        :return: Tupla (filas escritas, lista de feeds que produjeron fila).
+        """
+        rows_by_table = {}
+        feeds_ok = []
+        for feed in self.feeds:
+            try:
+                # Se valida por feed: una fila inválida solo descarta su feed, no el insert de su tabla
+                _, values = DatabaseOperations.prepare_rows(feed.table_name, [feed.next_row()])
+                rows_by_table.setdefault(feed.table_name, []).extend(values)
+                feeds_ok.append(feed)
+            except Exception as e:
+                print(f"Error al generar la fila de PLC {feed.id_plc} en {feed.table_name}: {e}")
+
+        try:
+            n_rows = 0
+            for table_name, rows in rows_by_table.items():
+                n_rows += db_ops.insert_rows(session, table_name, rows, prepared=True)
+            if checkpoint:
+                estados = [estado for estado in (feed.checkpoint() for feed in feeds_ok) if estado]
+                try:
+                    # SAVEPOINT: un fallo del checkpoint no descarta las filas del tick
+                    with session.begin_nested():
+                        db_ops.save_estados_simulador(session, estados)
+                except Exception as e:
+                    print(f"Advertencia: No se pudo guardar el checkpoint del tick: {e}")
+            session.commit()
+            return n_rows, feeds_ok
+        except Exception as e:
+            session.rollback()
+            print(f"Error al escribir el tick: {e}")
+            return 0, []
+
+    def prefill(self):
+        """
+        Genera el primer tramo de los feeds sin stepper antes del primer tick, para que las
+        simulaciones iniciales no se ejecuten dentro de él y retrasen la escritura.
+        Los tramos tienen el mismo horizonte, así que sin más se agotarían todos en el mismo tick y
+        ese tick ejecutaría todas las regeneraciones a la vez. Por eso el primer tramo del feed k de n
+        se recorta en k/n de su longitud: las regeneraciones quedan repartidas a lo largo del horizonte.
+        :return: Número de feeds cargados.
+        """
+        pending = [feed for feed in self.feeds if feed.exhausted]
+        n_loaded = 0
+        for k, feed in enumerate(pending):
+            try:
+                timestamps, series_df = feed.refill(feed)
+                feed.load(timestamps, series_df, stop=len(timestamps) - k * len(timestamps) // len(pending))
+                n_loaded += 1
+            except Exception as e:
+                print(f"Error al precargar el feed de PLC {feed.id_plc} en {feed.table_name}: {e}")
+        print(f"Feeds precargados: {n_loaded}")
+        return n_loaded
+
+    def run(self, max_ticks=None):
+        """
+        Bucle principal. Precarga los feeds y duerme hasta el siguiente límite de intervalo, de
+        modo que el tiempo de escritura no se acumula como deriva; los ticks perdidos se reportan
+        y se saltan.
+        :param max_ticks: Número máximo de ticks (None = indefinido).
+        """
+        self.prefill()
+        session = self.session_factory()
+        db_ops = DatabaseOperations(session)
+        next_tick = self._next_boundary(time.time())
+        n_tick = 0
+
+        while max_ticks is None or n_tick < max_ticks:
+            time.sleep(max(0.0, next_tick - time.time()))
+            started = time.time()
+            drift = started - next_tick
+
+            n_tick += 1
+            n_rows, feeds_ok = self.run_tick(session, db_ops, checkpoint=n_tick % self.checkpoint_every == 0)
+            latency = time.time() - started
+
+            tick_stats = {"tick": n_tick, "rows": n_rows, "latency": latency, "drift": drift}
+            self.stats.append(tick_stats)
+            print(f"Tick {n_tick}: {n_rows} registros, latencia {latency:.3f}s, deriva {drift:.3f}s")
+            if self.on_tick:
+                self.on_tick(tick_stats, feeds_ok)
+
+            next_tick += self.interval
+            skipped = max(0, math.ceil((time.time() - next_tick) / self.interval))
+            if skipped:
+                print(f"Advertencia: el tick {n_tick} excedió el intervalo; se omiten {skipped} ticks.")
+                next_tick += skipped * self.interval
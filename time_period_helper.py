@@ -1,6 +1,44 @@
-from datetime import datetime, timedelta
+from collections.abc import Sequence
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+import pandas as pd
 from dateutil.relativedelta import relativedelta
 
+
+class TimestampView(Sequence):
+    def __init__(self, minutes):
+        """
+        Vista perezosa de solo lectura de un rango de minutos como textos 'YYYY-MM-DD HH:MM:SS'.
+        Se comporta como la lista que devolvía generate_timestamps, pero cada texto se formatea
+        solo cuando se accede a él.
+        :param minutes: Array datetime64[m].
+        """
+        self.minutes = minutes
+
+    def __len__(self):
+        return len(self.minutes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TimestampView(self.minutes[index])
+        return str(TimePeriodHelper.format_minutes(self.minutes[index]))
+
+    def __iter__(self, block_rows=65536):
+        for start in range(0, len(self.minutes), block_rows):
+            yield from TimePeriodHelper.format_minutes(self.minutes[start:start + block_rows]).tolist()
+
+    def __array__(self, dtype=None, copy=None):
+        text = TimePeriodHelper.format_minutes(self.minutes)
+        return text.astype(dtype) if dtype is not None else text
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"TimestampView({len(self)} minutos)"
+
+
 class TimePeriodHelper:
     @staticmethod
     def calculate_minutes(start_date: str, end_date: str = None) -> int:
@@ -12,39 +50,69 @@ class TimePeriodHelper:
         return int(sub.total_seconds() // 60)
 
     @staticmethod
-    def generate_timestamps(start_date: str, end_date: str = None) -> list:
+    def minute_range(start_date: str, end_date: str = None) -> np.ndarray:
+        """
+        Rango [start_date, end_date) minuto a minuto como array datetime64[m], construido en una sola llamada.
+        """
         start = TimePeriodHelper.parse_date(start_date, "00:00:00")
         end = TimePeriodHelper.parse_date(end_date, "23:59:00")
+        return np.arange(np.datetime64(start, "m"), np.datetime64(end, "m"), dtype="datetime64[m]")
 
-        timestamps = []
-        current = start
-        while current < end:
-            timestamps.append(current.strftime("%Y-%m-%d %H:%M:%S"))
-            current += timedelta(minutes=1)
+    @staticmethod
+    def timestamp_index(start_date: str, end_date: str = None) -> pd.DatetimeIndex:
+        """
+        Mismo rango que minute_range como DatetimeIndex.
+        """
+        return pd.DatetimeIndex(TimePeriodHelper.minute_range(start_date, end_date))
+
+    @staticmethod
+    def format_minutes(minutes: np.ndarray) -> np.ndarray:
+        """
+        Formatea un array datetime64[m] como textos 'YYYY-MM-DD HH:MM:SS' de forma vectorizada.
+        """
+        return np.char.replace(np.datetime_as_string(minutes, unit="s"), "T", " ")
+
+    @staticmethod
+    def generate_timestamps(start_date: str, end_date: str = None) -> TimestampView:
+        timestamps = TimestampView(TimePeriodHelper.minute_range(start_date, end_date))
         print(f"timestamps: '{end_date, len(timestamps)}'")
         return timestamps
 
+    @staticmethod
+    def iter_timestamp_chunks(start_date: str, end_date: str = None, chunk_rows: int = 50000):
+        minutes = TimePeriodHelper.minute_range(start_date, end_date)
+        for start in range(0, len(minutes), chunk_rows):
+            yield TimePeriodHelper.format_minutes(minutes[start:start + chunk_rows]).tolist()
+
     @staticmethod
     def parse_date(date_str: str, default_time: str = "00:00:00") -> datetime:
         if not date_str or isinstance(date_str, float):
             current_time = datetime.now().strftime("%Y-%m-%d")
-            date_obj = datetime.strptime(f"{current_time} {default_time}", "%Y-%m-%d %H:%M:%S")
-        else:
+            return datetime.strptime(f"{current_time} {default_time}", "%Y-%m-%d %H:%M:%S")
+        return TimePeriodHelper._parse_date_cached(date_str, default_time)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_date_cached(date_str: str, default_time: str) -> datetime:
+        """
+        Conversión de texto a fecha; cacheada porque las mismas fechas de la configuración se
+        interpretan en cada PLC y tabla. datetime es inmutable, así que compartir el resultado es seguro.
+        """
+        try:
+            date_str = date_str.replace("/", "-")
+            if len(date_str.split()) == 2:
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+            else:
+                date_obj = datetime.strptime(f"{date_str} {default_time}", "%Y-%m-%d %H:%M:%S")
+        except ValueError:
             try:
-                date_str = date_str.replace("/", "-")
-                if len(date_str.split()) == 2:
-                    date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+                reordered_date = TimePeriodHelper.reorder_date_dd_mm_yyyy(date_str)
+                if len(reordered_date.split()) == 2:
+                    date_obj = datetime.strptime(reordered_date, "%Y-%m-%d %H:%M:%S")
                 else:
-                    date_obj = datetime.strptime(f"{date_str} {default_time}", "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                try:
-                    reordered_date = TimePeriodHelper.reorder_date_dd_mm_yyyy(date_str)
-                    if len(reordered_date.split()) == 2:
-                        date_obj = datetime.strptime(reordered_date, "%Y-%m-%d %H:%M:%S")
-                    else:
-                        date_obj = datetime.strptime(f"{reordered_date} {default_time}", "%Y-%m-%d %H:%M:%S")
-                except Exception as e:
-                    raise ValueError(f"Error al procesar la fecha '{date_str}': {e}")
+                    date_obj = datetime.strptime(f"{reordered_date} {default_time}", "%Y-%m-%d %H:%M:%S")
+            except Exception as e:
+                raise ValueError(f"Error al procesar la fecha '{date_str}': {e}")
 
         return date_obj.replace(second=0)
 
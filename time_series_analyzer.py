@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 from statsmodels.tsa.seasonal import seasonal_decompose
-from fitter import Fitter
+from residual_fitter import ResidualFitter
 from scipy.stats import norm, lognorm, expon, uniform
 
 class TimeSeriesAnalyzer:
@@ -18,6 +18,7 @@ class TimeSeriesAnalyzer:
         self.seasonals = {}
         self.residuals = {}
         self.best_distributions = {}
+        self.models = {}
 
     def decompose(self):
         """
@@ -37,60 +38,254 @@ class TimeSeriesAnalyzer:
 
     def fit_residual_distributions(self):
         """
-        Ajusta distribuciones estadísticas para los residuos de cada serie.
+        Ajusta distribuciones estadísticas para los residuos de cada serie (en paralelo por columna).
         """
-        for column, residual in self.residuals.items():
-            fitter = Fitter(residual, distributions=['norm', 'lognorm', 'expon', 'uniform'])
-            fitter.fit()
-            self.best_distributions[column] = fitter.get_best()
+        self.best_distributions.update(ResidualFitter.fit_columns(self.residuals))
+        for column in self.residuals:
             print(f"Mejor distribución ajustada para {column}: {self.best_distributions[column]}")
 
-    def simulate_forward(self, steps=500):
+    def build_models(self):
+        """
+        Resume cada serie descompuesta y ajustada en lo que necesita simulate_forward: último valor y
+        pendiente de la tendencia, un periodo del perfil estacional y la distribución de los residuos.
+        """
+        for column in self.data.columns:
+            trend = self.trends[column]
+            distribution_name, distribution_params = next(iter(self.best_distributions[column].items()))
+            self.models[str(column)] = {
+                "trend_last": float(trend.iloc[-1]),
+                "trend_slope": float((trend.iloc[-1] - trend.iloc[0]) / len(trend)),
+                "seasonal_profile": [float(value) for value in self.seasonals[column].values[:self.period]],
+                "distribution": {distribution_name: {name: float(value) for name, value in distribution_params.items()}},
+            }
+
+    def to_model(self):
+        """
+        Modelo ajustado serializable (JSON) de todas las series.
+        """
+        if not self.models:
+            self.build_models()
+        return {"period": self.period, "columns": list(self.models), "series": self.models}
+
+    @staticmethod
+    def from_model(model):
+        """
+        Analizador listo para simulate_forward a partir de un modelo guardado, sin descomponer ni ajustar.
+        """
+        analyzer = TimeSeriesAnalyzer(pd.DataFrame(columns=model["columns"]), model["period"])
+        analyzer.models = {column: model["series"][column] for column in model["columns"]}
+        return analyzer
+
+    @staticmethod
+    def extend_components(model, steps):
+        """
+        Tendencia y estacionalidad extendidas ``steps`` pasos para el modelo de una serie (vectorizado).
+        """
+        # Extender tendencia
+        extended_trend = model["trend_last"] + model["trend_slope"] * np.arange(1, steps + 1)
+
+        # Extender estacionalidad repitiendo el perfil de un periodo
+        extended_seasonal = np.resize(model["seasonal_profile"], steps)
+        return extended_trend + extended_seasonal
+
+    @staticmethod
+    def draw_residuals(distribution, size, rng):
+        """
+        Residuos de la distribución ajustada, en una sola muestra de forma ``size`` (int o tupla).
+        """
+        distribution_name = list(distribution.keys())[0]
+        distribution_params = distribution[distribution_name]
+        if distribution_name == "norm":
+            return norm.rvs(
+                loc=distribution_params["loc"], scale=distribution_params["scale"], size=size, random_state=rng
+            )
+        elif distribution_name == "lognorm":
+            return lognorm.rvs(
+                s=distribution_params["s"], loc=distribution_params["loc"], scale=distribution_params["scale"], size=size, random_state=rng
+            )
+        elif distribution_name == "expon":
+            return expon.rvs(
+                loc=distribution_params["loc"], scale=distribution_params["scale"], size=size, random_state=rng
+            )
+        elif distribution_name == "uniform":
+            return uniform.rvs(
+                loc=distribution_params["loc"], scale=distribution_params["scale"], size=size, random_state=rng
+            )
+        raise ValueError(f"Distribución '{distribution_name}' no soportada para simulación.")
+
+    def simulate_forward(self, steps=500, rng=None):
         """
         Genera una extensión hacia adelante para cada serie de tiempo.
         :param steps: Número de pasos a generar hacia adelante.
+        :param rng: numpy.random.Generator para los residuos (por defecto uno nuevo sin semilla).
         """
+        rng = rng if rng is not None else np.random.default_rng()
+        if not self.models:
+            self.build_models()
         simulated_series = {}
 
-        for column in self.data.columns:
-            trend = self.trends[column]
-            seasonal = self.seasonals[column]
-            residual = self.residuals[column]
-            distribution = self.best_distributions[column]
-
-            # Extender tendencia
-            trend_slope = (trend.iloc[-1] - trend.iloc[0]) / len(trend)
-            extended_trend = [trend.iloc[-1] + i * trend_slope for i in range(1, steps + 1)]
-
-            # Extender estacionalidad
-            extended_seasonal = list(seasonal.values) * (steps // self.period) + list(seasonal.values[:steps % self.period])
-            extended_seasonal = extended_seasonal[:steps]
-
-            # Generar residuos extendidos
-            distribution_name = list(distribution.keys())[0]
-            distribution_params = distribution[distribution_name]
-            if distribution_name == "norm":
-                extended_residual = norm.rvs(
-                    loc=distribution_params["loc"], scale=distribution_params["scale"], size=steps
-                )
-            elif distribution_name == "lognorm":
-                extended_residual = lognorm.rvs(
-                    s=distribution_params["s"], loc=distribution_params["loc"], scale=distribution_params["scale"], size=steps
-                )
-            elif distribution_name == "expon":
-                extended_residual = expon.rvs(
-                    loc=distribution_params["loc"], scale=distribution_params["scale"], size=steps
-                )
-            elif distribution_name == "uniform":
-                extended_residual = uniform.rvs(
-                    loc=distribution_params["loc"], scale=distribution_params["scale"], size=steps
-                )
-            else:
-                raise ValueError(f"Distribución '{distribution_name}' no soportada para simulación.")
-
+        for column, model in self.models.items():
             # Recombinar los componentes
-            simulated_series[column] = (
-                np.array(extended_trend) + np.array(extended_seasonal) + np.array(extended_residual)
-            )
+            simulated_series[column] = self.extend_components(model, steps) + self.draw_residuals(model["distribution"], steps, rng)
 
-        return pd.DataFrame(simulated_series)
\ No newline at end of file
+        return pd.DataFrame(simulated_series)
+
+    def simulate_ensemble(self, n_paths, steps=500, rng=None, dtype=np.float64):
+        """
+        Genera ``n_paths`` escenarios Monte Carlo de la extensión hacia adelante en una sola llamada:
+        tendencia y estacionalidad se calculan una vez y se suman por broadcasting. Cada escenario usa
+        su propio generador, rng.spawn(n_paths)[k], y extrae los residuos igual que simulate_forward, así
+        que los escenarios son independientes, reproducibles con la semilla raíz y el escenario k coincide
+        con simulate_forward(steps, rng.spawn(n_paths)[k]) sobre la misma semilla.
+        La memoria es la del resultado, n_paths * steps * n_series * itemsize(dtype).
+        :param n_paths: Número de escenarios.
+        :param steps: Número de pasos a generar hacia adelante.
+        :param rng: numpy.random.Generator raíz (por defecto uno nuevo sin semilla).
+        :param dtype: Tipo del resultado (np.float32 reduce la memoria a la mitad).
+        :return: Array (n_paths, steps, n_series), con las series en el orden de las columnas.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        if not self.models:
+            self.build_models()
+
+        models = list(self.models.values())
+        components = [self.extend_components(model, steps) for model in models]
+        ensemble = np.empty((n_paths, steps, len(models)), dtype=dtype)
+        for k, member in enumerate(rng.spawn(n_paths)):
+            for i, model in enumerate(models):
+                ensemble[k, :, i] = components[i] + self.draw_residuals(model["distribution"], steps, member)
+        return ensemble
+
+
+class IncrementalDecomposer:
+    def __init__(self, columns, period=12):
+        """
+        Descomposición incremental (tendencia lineal + perfil estacional + residuo) que aprende de
+        bloques de minutos a medida que llegan, sin guardar el histórico. Por cada fase estacional
+        acumula conteo, medias y co-momentos de (t, y), que se combinan con cada bloque en O(bloque)
+        (fórmulas de Chan et al.). Con ellos el modelo es exacto en cualquier momento:
+        pendiente común dentro de fases (MCO con efectos de fase), perfil estacional centrado y
+        suma de cuadrados de los residuos.
+        :param columns: Nombres de las series (p. ej. ['Serie_1', 'Serie_2']).
+        :param period: Periodo estacional en minutos.
+        """
+        self.columns = list(columns)
+        self.period = period
+        self.origin = None
+        self.last_t = None
+        self.last_timestamp = None
+        n_series = len(self.columns)
+        self.n = np.zeros(period)
+        self.mean_t = np.zeros(period)
+        self.mean_y = np.zeros((period, n_series))
+        self.c_tt = np.zeros(period)
+        self.c_ty = np.zeros((period, n_series))
+        self.c_yy = np.zeros((period, n_series))
+
+    @property
+    def n_points(self):
+        return int(self.n.sum())
+
+    @property
+    def ready(self):
+        """
+        True cuando cada fase tiene al menos dos puntos y el modelo está identificado.
+        """
+        return bool(self.n.min() >= 2)
+
+    def update(self, minutes, values):
+        """
+        Incorpora un bloque de observaciones.
+        :param minutes: Array int64 de minutos desde epoch, crecientes y posteriores al último bloque.
+        :param values: Array (n, n_series) con los valores de cada serie.
+        """
+        minutes = np.asarray(minutes, dtype=np.int64)
+        values = np.asarray(values, dtype=float).reshape(len(minutes), len(self.columns))
+        if len(minutes) == 0:
+            return
+        if self.origin is None:
+            self.origin = int(minutes[0])
+
+        offsets = minutes - self.origin
+        phase = offsets % self.period
+        t = offsets.astype(float)
+
+        # Estadísticos del bloque por fase
+        counts = np.bincount(phase, minlength=self.period).astype(float)
+        safe_counts = np.where(counts > 0, counts, 1)
+        batch_mean_t = np.bincount(phase, t, minlength=self.period) / safe_counts
+        batch_mean_y = np.column_stack([np.bincount(phase, values[:, j], minlength=self.period) for j in range(values.shape[1])]) / safe_counts[:, None]
+        dt = t - batch_mean_t[phase]
+        dy = values - batch_mean_y[phase]
+        batch_c_tt = np.bincount(phase, dt * dt, minlength=self.period)
+        batch_c_ty = np.column_stack([np.bincount(phase, dt * dy[:, j], minlength=self.period) for j in range(values.shape[1])])
+        batch_c_yy = np.column_stack([np.bincount(phase, dy[:, j] ** 2, minlength=self.period) for j in range(values.shape[1])])
+
+        # Combinar con lo acumulado
+        total = self.n + counts
+        safe_total = np.where(total > 0, total, 1)
+        weight = self.n * counts / safe_total
+        fraction = counts / safe_total
+        delta_t = batch_mean_t - self.mean_t
+        delta_y = batch_mean_y - self.mean_y
+        self.c_tt += batch_c_tt + weight * delta_t ** 2
+        self.c_ty += batch_c_ty + (weight * delta_t)[:, None] * delta_y
+        self.c_yy += batch_c_yy + weight[:, None] * delta_y ** 2
+        self.mean_t += fraction * delta_t
+        self.mean_y += fraction[:, None] * delta_y
+        self.n = total
+        self.last_t = int(offsets[-1]) if self.last_t is None else max(self.last_t, int(offsets[-1]))
+
+    def refresh(self, db_ops, session, table_name, id_plc, limit=50000):
+        """
+        Aprende las filas nuevas de un PLC en la base de datos (velocidad y temperatura como
+        Serie_1 y Serie_2), por bloques de ``limit`` filas desde el último timestamp visto.
+        :return: Número de filas incorporadas.
+        """
+        learned = 0
+        while True:
+            rows = db_ops.get_series_after(session, table_name, id_plc, self.last_timestamp, limit)
+            if not rows:
+                break
+            minutes = np.array([row[0] for row in rows], dtype="datetime64[m]").astype(np.int64)
+            self.update(minutes, np.array([row[1:] for row in rows], dtype=float))
+            self.last_timestamp = rows[-1][0]
+            learned += len(rows)
+            if len(rows) < limit:
+                break
+        return learned
+
+    def to_model(self):
+        """
+        Modelo actual en el formato de TimeSeriesAnalyzer.to_model, con el perfil estacional alineado
+        para que el primer paso simulado siga al último minuto observado y residuos normales con la
+        desviación típica de máxima verosimilitud.
+        """
+        if self.origin is None:
+            raise ValueError("El descomponedor incremental todavía no ha recibido datos.")
+
+        observed = self.n > 0
+        c_tt = self.c_tt.sum()
+        slope = self.c_ty.sum(axis=0) / c_tt if c_tt > 0 else np.zeros(len(self.columns))
+        level = self.mean_y - self.mean_t[:, None] * slope
+        intercept = level[observed].mean(axis=0)
+        seasonal = np.where(observed[:, None], level - intercept, 0.0)
+        sse = (self.c_yy - 2 * slope * self.c_ty + slope ** 2 * self.c_tt[:, None]).sum(axis=0)
+        scale = np.sqrt(np.maximum(sse, 0) / self.n.sum())
+        profile = np.roll(seasonal, -((self.last_t + 1) % self.period), axis=0)
+
+        series = {}
+        for j, column in enumerate(self.columns):
+            series[column] = {
+                "trend_last": float(intercept[j] + slope[j] * self.last_t),
+                "trend_slope": float(slope[j]),
+                "seasonal_profile": [float(value) for value in profile[:, j]],
+                "distribution": {"norm": {"loc": 0.0, "scale": float(scale[j])}},
+            }
+        return {"period": self.period, "columns": list(self.columns), "series": series}
+
+    def analyzer(self):
+        """
+        TimeSeriesAnalyzer con el modelo actual, listo para simulate_forward o simulate_ensemble.
+        """
+        return TimeSeriesAnalyzer.from_model(self.to_model())
@@ -1,15 +1,74 @@
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.arima_process import ArmaProcess
+from scipy.signal import lfilter
+
+# Claves de la configuración que determinan un plan compilado; n_points no forma parte del plan,
+# así que las ejecuciones y tramos de distinta longitud comparten el mismo plan
+PLAN_KEYS = ("n_series", "ar_params", "ma_params", "means", "stds", "corr_matrix",
+             "factor_loadings", "idiosyncratic_vars", "n_factors",
+             "trend_slopes", "seasonality_periods", "seasonality_amplitudes")
+PLAN_CACHE_SIZE = 16
+
+class ArmaFilterBank:
+    def __init__(self, ar_params, ma_params):
+        """
+        Banco de filtros ARMA para filtrar varias series en bloque. Las series con los mismos
+        coeficientes comparten una sola llamada a lfilter sobre su sub-matriz.
+        :param ar_params: Lista de coeficientes AR por serie.
+        :param ma_params: Lista de coeficientes MA por serie.
+        """
+        groups = {}
+        for i, (ar_coefs, ma_coefs) in enumerate(zip(ar_params, ma_params)):
+            key = (tuple(np.atleast_1d(ar_coefs).astype(float)), tuple(np.atleast_1d(ma_coefs).astype(float)))
+            groups.setdefault(key, []).append(i)
+
+        self.filters = []
+        for (ar_coefs, ma_coefs), columns in groups.items():
+            a = np.r_[1, -np.array(ar_coefs)]
+            b = np.r_[1, np.array(ma_coefs)]
+            for array in (a, b):
+                array.flags.writeable = False
+            self.filters.append((b, a, np.array(columns)))
+
+    def filter(self, innovations, axis=0, state=None):
+        """
+        Filtra las innovaciones (series en el último eje) a lo largo de ``axis``.
+        :param innovations: Array con las series en el último eje.
+        :param axis: Eje temporal.
+        :param state: Estado devuelto por una llamada anterior (continuación sin cortes) o None.
+        :return: Tupla (series filtradas, estado final).
+        """
+        output = np.empty_like(innovations)
+        new_state = []
+        for k, (b, a, columns) in enumerate(self.filters):
+            block = innovations[..., columns]
+            if state is None:
+                zi_shape = list(block.shape)
+                zi_shape[axis] = max(len(a), len(b)) - 1
+                zi = np.zeros(zi_shape)
+            else:
+                zi = state[k]
+            output[..., columns], zf = lfilter(b, a, block, axis=axis, zi=zi)
+            new_state.append(zf)
+        return output, new_state
+
 
 class TimeSeriesSimulator:
-    def __init__(self, config):
+    def __init__(self, config, rng=None, plan=None):
         """
         Inicializa el generador con una configuración.
         :param config: Diccionario de configuración con parámetros para generar las series.
+        :param rng: numpy.random.Generator propio de esta simulación (por defecto uno nuevo sin semilla).
+        :param plan: SimulationPlan ya compilado; por defecto se obtiene de la caché con compile_plan(config).
         """
         self.config = config
-        self.n_series = config.get("n_series", 1)
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.plan = plan if plan is not None else compile_plan(config)
+        self.n_series = self.plan.n_series
         self.n_points = config.get("n_points", 100)
 
     @staticmethod
@@ -25,54 +84,136 @@ class TimeSeriesSimulator:
 
     def generate_noise(self):
         """
-        Genera ruido basado en una matriz de correlación y desviaciones estándar.
+        Genera ruido basado en una matriz de correlación y desviaciones estándar
+        (con el modelo de ruido del plan, sin factorizar en cada llamada).
+        """
+        return self.plan.draw_noise(self.rng, (self.n_points,))
+
+    @staticmethod
+    def cov_factor(cov_matrix):
+        """
+        Factor L con L @ L.T = cov_matrix (Cholesky; si la matriz es solo semidefinida, raíz por autovalores).
+        """
+        try:
+            return np.linalg.cholesky(cov_matrix)
+        except np.linalg.LinAlgError:
+            eigvals, eigvecs = np.linalg.eigh(cov_matrix)
+            return eigvecs * np.sqrt(np.clip(eigvals, 0, None))
+
+    @staticmethod
+    def stationary_gain(ar_coefs, ma_coefs, tol=1e-12, max_len=1 << 20):
+        """
+        Desviación estándar estacionaria de un ARMA con innovaciones de varianza 1: sqrt(sum psi_k^2),
+        con psi la respuesta al impulso del filtro. Devuelve None si la parte AR no es estacionaria.
         """
-        corr_matrix = self.config.get("corr_matrix", np.eye(self.n_series))
-        stds = self.config.get("stds", [1] * self.n_series)
-        cov_matrix = self.corr_to_cov(corr_matrix, stds)
+        a = np.r_[1, -np.atleast_1d(ar_coefs).astype(float)]
+        b = np.r_[1, np.atleast_1d(ma_coefs).astype(float)]
+        if len(a) > 1 and np.any(np.abs(np.roots(a)) >= 1):
+            return None
+
+        length = 256
+        while True:
+            impulse = np.zeros(length)
+            impulse[0] = 1
+            psi = lfilter(b, a, impulse)
+            if np.abs(psi[-32:]).max() < tol or length >= max_len:
+                return float(np.sqrt(np.sum(psi ** 2)))
+            length *= 4
+
+    def generate_stream(self, chunk_minutes):
+        """
+        Genera las series en bloques consecutivos de ``chunk_minutes`` filas con memoria constante.
+        El estado de los filtros ARMA, el desplazamiento de la tendencia y la fase estacional se
+        arrastran entre bloques, y el escalado usa la varianza estacionaria analítica en lugar de la
+        media y desviación de la muestra completa (si el AR no es estacionario, se estima con el primer bloque).
+        :param chunk_minutes: Filas por bloque.
+        :return: Generador de DataFrames (columnas Serie_i) que en conjunto suman n_points filas.
+        """
+        plan = self.plan
+        gains = plan.gains.copy()
+        columns = [f"Serie_{i+1}" for i in range(self.n_series)]
+
+        state = None
+        offset = 0
+        while offset < self.n_points:
+            n = min(chunk_minutes, self.n_points - offset)
+            noise = plan.draw_noise(self.rng, (n,))
+            filtered, state = plan.bank.filter(noise, state=state)
+
+            unknown = np.isnan(gains)
+            if unknown.any():
+                gains[unknown] = filtered[:, unknown].std(axis=0) / plan.stds[unknown]
 
-        # print("Matriz de covarianza calculada:", cov_matrix)
+            # Equivalente a estandarizar (varianza stds^2 * gain^2) y reescalar por stds
+            values = np.where(plan.white, noise * plan.stds, filtered / gains) + plan.means
+            values += plan.deterministic(offset, n)
 
-        return np.random.multivariate_normal(np.zeros(self.n_series), cov_matrix, size=self.n_points)
+            offset += n
+            yield pd.DataFrame(values, columns=columns)
+
+    def generate_noise_batch(self, rngs):
+        """
+        Genera ruido correlacionado para un lote de PLC: cada PLC sortea su bloque con su propio
+        generador (lo mismo que generate_noise), de modo que su serie no depende del resto del lote.
+        :param rngs: Lista con un numpy.random.Generator por PLC.
+        :return: Array (n_plc, n_points, n_series).
+        """
+        return np.stack([self.plan.draw_noise(rng, (self.n_points,)) for rng in rngs])
 
     def generate_arma_series(self):
         """
         Genera series ARMA multivariadas con las configuraciones proporcionadas.
         """
-        ar_params = self.config.get("ar_params", [[0]] * self.n_series)
-        ma_params = self.config.get("ma_params", [[0]] * self.n_series)
-        means = self.config.get("means", [0] * self.n_series)
-        stds = self.config.get("stds", [1] * self.n_series)
-
+        plan = self.plan
         noise = self.generate_noise()
-        # print("Ruido generado (primeras filas):\n", noise[:5])
-        # print("Correlación del ruido:\n", np.corrcoef(noise, rowvar=False))
+
+        # Filtra toda la matriz de innovaciones correlacionadas por los filtros AR/MA en bloque
+        filtered, _ = plan.bank.filter(noise)
 
         series = []
         for i in range(self.n_series):
-            ar = np.r_[1, -np.array(ar_params[i])]
-            ma = np.r_[1, np.array(ma_params[i])]
-            arma_process = ArmaProcess(ar, ma)
-            serie = arma_process.generate_sample(nsample=self.n_points) + noise[:, i]
-            # print("Correlación antes de normalizar:\n", np.corrcoef(noise, rowvar=False))
             # Si AR y MA son cero, usar el ruido directamente
-            if np.all(np.array(ar_params[i]) == 0) and np.all(np.array(ma_params[i]) == 0):
-                serie = noise[:, i] * stds[i] + means[i]  # Escalar y ajustar media
+            if plan.white[i]:
+                serie = noise[:, i] * plan.stds[i] + plan.means[i]  # Escalar y ajustar media
             else:
+                serie = filtered[:, i]
                 serie = (serie - np.mean(serie)) / np.std(serie)  # Estandarizar
-                serie = serie * stds[i] + means[i]  # Escalar y ajustar media
-            # print("Correlación despues de normalizar:\n", np.corrcoef(noise, rowvar=False))
+                serie = serie * plan.stds[i] + plan.means[i]  # Escalar y ajustar media
             series.append(serie)
 
         self.series = pd.DataFrame(np.array(series).T, columns=[f"Serie_{i+1}" for i in range(self.n_series)])
         return self.series
 
+    def generate_arma_batch(self, rngs):
+        """
+        Versión por lotes de generate_arma_series: mismas reglas de escalado, pero para varios PLC
+        a la vez y sin DataFrames intermedios.
+        :param rngs: Lista con un numpy.random.Generator por PLC.
+        :return: Array (n_plc, n_points, n_series).
+        """
+        plan = self.plan
+        noise = self.generate_noise_batch(rngs)
+        batch, _ = plan.bank.filter(noise, axis=1)
+
+        # Las series ARMA se estandarizan por PLC; las de ruido blanco usan el ruido directamente
+        batch[..., plan.white] = noise[..., plan.white]
+        arma = ~plan.white
+        if arma.any():
+            block = batch[..., arma]
+            batch[..., arma] = (block - block.mean(axis=1, keepdims=True)) / block.std(axis=1, keepdims=True)
+
+        batch *= plan.stds
+        batch += plan.means
+        self.batch = batch
+        return self.batch
+
     def add_trend(self, slopes):
         if slopes is None:
             print("Advertencia: 'trend_slopes' es nulo. No se agregará tendencia a las series.")
         else:
+            ramp = self.plan.ramp(0, len(self.series))
             for i, slope in enumerate(slopes):
-                self.series[f"Serie_{i+1}"] += slope * np.arange(len(self.series))
+                self.series[f"Serie_{i+1}"] += slope * ramp
         return self.series
 
     def add_seasonality(self, periods, amplitudes):
@@ -80,5 +221,290 @@ class TimeSeriesSimulator:
             print("Advertencia: 'seasonality_periods' o 'seasonality_amplitudes' son nulos. No se agregará estacionalidad a las series.")
         else:
             for i, (period, amplitude) in enumerate(zip(periods, amplitudes)):
-                self.series[f"Serie_{i+1}"] += amplitude * np.sin(2 * np.pi * np.arange(len(self.series)) / period)
-        return self.series
\ No newline at end of file
+                self.series[f"Serie_{i+1}"] += self.plan.seasonal(period, amplitude, 0, len(self.series))
+        return self.series
+
+    def add_trend_batch(self, slopes):
+        if slopes is None:
+            print("Advertencia: 'trend_slopes' es nulo. No se agregará tendencia a las series.")
+        else:
+            slopes = np.asarray(slopes, dtype=float)
+            self.batch[..., :len(slopes)] += self.plan.ramp(0, self.n_points)[:, None] * slopes
+        return self.batch
+
+    def add_seasonality_batch(self, periods, amplitudes):
+        if periods is None or amplitudes is None:
+            print("Advertencia: 'seasonality_periods' o 'seasonality_amplitudes' son nulos. No se agregará estacionalidad a las series.")
+        else:
+            # Perfil (n_points, n_series) común a todos los PLC, sumado por broadcasting
+            seasonal = np.zeros((self.n_points, self.n_series))
+            for i, (period, amplitude) in enumerate(zip(periods, amplitudes)):
+                seasonal[:, i] = self.plan.seasonal(period, amplitude, 0, self.n_points)
+            self.batch += seasonal
+        return self.batch
+
+
+class SimulationPlan:
+    def __init__(self, config):
+        """
+        Plan compilado e inmutable de una configuración: todo lo que no depende de la semilla se
+        calcula una sola vez (factor de Cholesky, filtros ARMA, escalas estacionarias, tablas
+        estacionales de un periodo) y se comparte entre PLC, tramos y ejecuciones. No depende de la
+        longitud de la simulación (n_points).
+        Usar compile_plan(config) para obtenerlo de la caché.
+
+        Modelo de ruido: 'dense' (Cholesky de la covarianza completa) o 'factor', de rango bajo
+        (corr = L L^T + diag(psi)), si la configuración trae 'factor_loadings' (y opcionalmente
+        'idiosyncratic_vars') o 'n_factors' para ajustarlo desde 'corr_matrix'.
+        :param config: Diccionario de configuración.
+        """
+        self.n_series = config.get("n_series", 1)
+        ar_params = config.get("ar_params", [[0]] * self.n_series)
+        ma_params = config.get("ma_params", [[0]] * self.n_series)
+        self.means = np.asarray(config.get("means", [0] * self.n_series), dtype=float)
+        self.stds = np.asarray(config.get("stds", [1] * self.n_series), dtype=float)
+        self.loadings = None
+        self.idio_stds = None
+        self.factor = None
+        if config.get("factor_loadings") is not None or config.get("n_factors"):
+            self.noise_model = "factor"
+            if config.get("factor_loadings") is not None:
+                loadings = np.asarray(config["factor_loadings"], dtype=float)
+                psi = config.get("idiosyncratic_vars")
+                psi = 1 - np.sum(loadings ** 2, axis=1) if psi is None else np.asarray(psi, dtype=float)
+            else:
+                loadings, psi = self.fit_factor_model(config["corr_matrix"], int(config["n_factors"]))
+            # Cargas e idiosincrasias escaladas por stds: cov = (stds L)(stds L)^T + diag((stds sqrt(psi))^2)
+            self.loadings = loadings * self.stds[:, None]
+            self.idio_stds = np.sqrt(np.clip(psi, 0, None)) * self.stds
+        else:
+            self.noise_model = "dense"
+            corr_matrix = config.get("corr_matrix", np.eye(self.n_series))
+            self.factor = TimeSeriesSimulator.cov_factor(TimeSeriesSimulator.corr_to_cov(corr_matrix, self.stds))
+
+        self.bank = ArmaFilterBank(ar_params, ma_params)
+        self.white = np.array([np.all(np.array(ar) == 0) and np.all(np.array(ma) == 0) for ar, ma in zip(ar_params, ma_params)])
+        gains_by_filter = {}
+        for b, a, columns in self.bank.filters:
+            gains_by_filter[tuple(columns)] = TimeSeriesSimulator.stationary_gain(-a[1:], b[1:]) or np.nan
+        self.gains = np.ones(self.n_series)
+        for columns, gain in gains_by_filter.items():
+            self.gains[list(columns)] = gain
+        self.gains[self.white] = 1.0
+
+        # Coeficientes b/a por serie rellenados a un orden común (para el avance minuto a minuto)
+        filters = [(np.r_[1, np.atleast_1d(ma).astype(float)], np.r_[1, -np.atleast_1d(ar).astype(float)]) for ar, ma in zip(ar_params, ma_params)]
+        order = max(max(len(b), len(a)) for b, a in filters)
+        self.b = np.zeros((self.n_series, order))
+        self.a = np.zeros((self.n_series, order))
+        for i, (b, a) in enumerate(filters):
+            self.b[i, :len(b)] = b
+            self.a[i, :len(a)] = a
+
+        self.slopes = np.zeros(self.n_series)
+        slopes = config.get("trend_slopes")
+        if slopes is not None:
+            self.slopes[:len(slopes)] = slopes
+
+        # Tablas de un periodo por (periodo, amplitud); los periodos no enteros se calculan al vuelo
+        self.seasonality = []
+        self._seasonal_tables = {}
+        periods, amplitudes = config.get("seasonality_periods"), config.get("seasonality_amplitudes")
+        if periods is not None and amplitudes is not None:
+            for i, (period, amplitude) in enumerate(zip(periods, amplitudes)):
+                self.seasonality.append((i, period, amplitude))
+                if float(period).is_integer():
+                    table = amplitude * np.sin(2 * np.pi * np.arange(int(period)) / period)
+                    table.flags.writeable = False
+                    self._seasonal_tables[(period, amplitude)] = table
+
+        for array in (self.means, self.stds, self.factor, self.loadings, self.idio_stds, self.white, self.gains, self.b, self.a, self.slopes):
+            if array is not None:
+                array.flags.writeable = False
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("SimulationPlan es inmutable.")
+        super().__setattr__(name, value)
+
+    @staticmethod
+    def fit_factor_model(corr_matrix, n_factors, max_iter=100, tol=1e-6):
+        """
+        Ajusta un modelo de factores corr ≈ L L^T + diag(psi) por factorización de ejes principales
+        (se itera reemplazando la diagonal por las comunalidades). Se calcula una vez por plan.
+        :param corr_matrix: Matriz de correlación n_series x n_series.
+        :param n_factors: Número de factores k.
+        :return: Tupla (cargas L de n_series x k, varianzas idiosincráticas psi).
+        """
+        corr = np.asarray(corr_matrix, dtype=float)
+        communalities = np.ones(len(corr))
+        for _ in range(max_iter):
+            reduced = corr.copy()
+            np.fill_diagonal(reduced, communalities)
+            eigvals, eigvecs = np.linalg.eigh(reduced)
+            loadings = eigvecs[:, -n_factors:] * np.sqrt(np.clip(eigvals[-n_factors:], 0, None))
+            updated = np.clip(np.sum(loadings ** 2, axis=1), 0, 1)
+            if np.max(np.abs(updated - communalities)) < tol:
+                break
+            communalities = updated
+        return loadings, 1 - np.sum(loadings ** 2, axis=1).clip(None, 1)
+
+    def draw_noise(self, rng, shape):
+        """
+        Innovaciones correlacionadas con forma (*shape, n_series). En el modelo de factores el coste
+        por minuto es O(n_series * k) en lugar de O(n_series^2).
+        """
+        if self.noise_model == "factor":
+            k = self.loadings.shape[1]
+            z = rng.standard_normal((*shape, k + self.n_series))
+            return z[..., :k] @ self.loadings.T + z[..., k:] * self.idio_stds
+        return rng.standard_normal((*shape, self.n_series)) @ self.factor.T
+
+    @staticmethod
+    def ramp(start, n):
+        """
+        Índices de tiempo [start, start + n) como float, calculados para cada tramo.
+        """
+        return np.arange(start, start + n, dtype=float)
+
+    def seasonal(self, period, amplitude, start, n):
+        """
+        amplitude * sin(2π t / period) para t en [start, start + n), leído de la tabla de un periodo.
+        """
+        table = self._seasonal_tables.get((period, amplitude))
+        t = np.arange(start, start + n)
+        if table is None:
+            return amplitude * np.sin(2 * np.pi * (t % period) / period)
+        return table[t % len(table)]
+
+    def deterministic(self, start, n):
+        """
+        Tendencia más estacionalidad de la configuración para t en [start, start + n).
+        :return: Array (n, n_series).
+        """
+        values = self.ramp(start, n)[:, None] * self.slopes
+        for i, period, amplitude in self.seasonality:
+            values[:, i] += self.seasonal(period, amplitude, start, n)
+        return values
+
+
+_plan_cache = OrderedDict()
+_plan_cache_lock = Lock()
+
+def config_hash(config):
+    """
+    Hash estable de las claves de la configuración que determinan el plan.
+    """
+    canonical = json.dumps({key: config.get(key) for key in PLAN_KEYS}, sort_keys=True,
+                           default=lambda value: np.asarray(value).tolist())
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+def compile_plan(config):
+    """
+    Devuelve el SimulationPlan de la configuración desde una caché LRU (por proceso) indexada por config_hash.
+    """
+    key = config_hash(config)
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan
+
+    plan = SimulationPlan(config)
+    with _plan_cache_lock:
+        _plan_cache[key] = plan
+        while len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    return plan
+
+
+class OnlineStepper:
+    def __init__(self, config, rng=None, state=None):
+        """
+        Generador en línea de un PLC: produce el minuto siguiente en O(1) guardando solo el estado de
+        los filtros ARMA, el índice de tiempo (tendencia y fase estacional) y el estado del generador.
+        Las anomalías se repiten con ciclo n_points (el tramo que antes se regeneraba de una vez).
+        Sigue el mismo modelo que generate_stream, pero no reproduce sus valores exactos: la recursión
+        minuto a minuto redondea distinto que lfilter (diferencias del orden de 1e-15) y los valores
+        atípicos se sortean minuto a minuto, no por tramo, así que consumen otros números aleatorios.
+        :param config: Diccionario de configuración (mismo formato que TimeSeriesSimulator).
+        :param rng: numpy.random.Generator de la serie (se ignora si se pasa ``state``).
+        :param state: Estado devuelto por state() para continuar una serie tras un reinicio.
+        """
+        plan = compile_plan(config)
+        self.plan = plan
+        self.n_series = plan.n_series
+        self.cycle = max(int(config.get("n_points", 100)), 1)
+        self.means, self.stds, self.white = plan.means, plan.stds, plan.white
+        self.b, self.a = plan.b, plan.a
+        self.slopes = plan.slopes
+
+        self.gains = plan.gains.copy()
+        for i in np.flatnonzero(np.isnan(self.gains)):
+            # AR no estacionario: escala estimada con una muestra piloto determinista
+            self.gains[i] = float(np.std(lfilter(plan.b[i], plan.a[i], np.random.default_rng(0).standard_normal(10000))))
+
+        anomalies = config.get("anomalies", {})
+        self.anomalies = anomalies if isinstance(anomalies, dict) else {}
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.t = 0
+        self.z = np.zeros((self.n_series, self.b.shape[1] - 1))
+        if state is not None:
+            self.restore(state)
+
+    def step(self):
+        """
+        Avanza un minuto.
+        :return: Tupla (array con un valor por serie, bool de anomalía).
+        """
+        x = self.plan.draw_noise(self.rng, ())
+        if self.z.shape[1]:
+            y = self.b[:, 0] * x + self.z[:, 0]
+            self.z = self.b[:, 1:] * x[:, None] - self.a[:, 1:] * y[:, None] + np.c_[self.z[:, 1:], np.zeros(self.n_series)]
+        else:
+            y = self.b[:, 0] * x
+
+        t = self.t
+        values = np.where(self.white, x * self.stds, y / self.gains) + self.means
+        values += self.slopes * t
+        for i, period, amplitude in self.plan.seasonality:
+            values[i] += self.plan.seasonal(period, amplitude, t, 1)[0]
+
+        anomaly = False
+        phase = t % self.cycle
+        for anomaly_type, params in self.anomalies.items():
+            series_ids = params.get("series", [])
+            if anomaly_type == "anomaly_outliers":
+                probability = params.get("count", 1) / self.cycle
+                for series_id in series_ids:
+                    if self.rng.random() < probability:
+                        values[series_id] += self.rng.choice([-1, 1]) * params.get("magnitude", 1) * self.stds[series_id]
+                        anomaly = True
+            elif anomaly_type in ("anomaly_drift", "anomaly_std_change") and series_ids:
+                start_point = params.get("start_point", 0)
+                if phase >= start_point:
+                    for series_id in series_ids:
+                        if anomaly_type == "anomaly_drift":
+                            values[series_id] += params.get("slope", 0) * (phase - start_point)
+                        else:
+                            values[series_id] += params.get("n_std", 1) * self.stds[series_id]
+                    anomaly = True
+
+        self.t += 1
+        return values, anomaly
+
+    def state(self):
+        """
+        Estado serializable (JSON) suficiente para continuar la serie exactamente donde quedó.
+        """
+        return {"t": self.t, "z": self.z.tolist(), "rng": self.rng.bit_generator.state}
+
+    def restore(self, state):
+        z = np.asarray(state["z"], dtype=float).reshape(-1, self.z.shape[1]) if self.z.shape[1] else np.zeros((self.n_series, 0))
+        if z.shape != self.z.shape:
+            raise ValueError("El estado guardado no corresponde a la configuración actual (orden ARMA o número de series).")
+        self.t = int(state["t"])
+        self.z = z
+        self.rng.bit_generator.state = state["rng"]